@@ -1,13 +1,99 @@
+"""
+Admin for the library models, built for tables with millions of rows:
+
+- changelists run a fixed number of queries per page: books_count is a
+  correlated subquery (evaluated only for the rows shown, no GROUP BY over
+  the table) and a book's author comes from list_select_related;
+- the unfiltered total comes from EstimatedCountPaginator instead of
+  COUNT(*), and show_full_result_count is off, so a filtered page does not
+  count the whole table a second time;
+- the author of a book is picked with an autocomplete widget, not a
+  <select> of every author;
+- search goes through the full-text index over all languages (search.py),
+  like ?search= on the API.
+
+AdminQueryCountTests (tests.py) pins the query count of each page.
+"""
+from django.conf import settings
 from django.contrib import admin
-from .models import Author, Book
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F
+from django.utils.functional import cached_property
+
+from . import search
+from .models import AUTHOR_NAME_KEY, Author, Book, LibraryStatistic, TranslationJob, TranslationMemory
+from .services import statistics
+from .services.counters import books_count_subquery
+
+# Counters maintained by signals (services/statistics.py) that give a table's size for free
+STATISTIC_COUNTS = {Author: statistics.TOTAL_AUTHORS, Book: statistics.TOTAL_BOOKS}
+
+
+def estimated_count(queryset):
+    """
+    Number of rows of an unfiltered model queryset without COUNT(*): the
+    statistics counter where there is one, else the planner's estimate on
+    PostgreSQL. None when neither is available.
+    """
+    key = STATISTIC_COUNTS.get(queryset.model)
+    if key is not None:
+        value = LibraryStatistic.objects.using(queryset.db).filter(key=key).values_list('value', flat=True).first()
+        if value is not None:
+            return value
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # -1 (or 0) until the table has been analyzed
+        if row and row[0] > 0:
+            return row[0]
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the size of an unfiltered changelist; filtered ones are counted."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset)
+            if estimate is not None:
+                return estimate
+        return super().count
+
+
+class LibraryModelAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class IndexedSearchMixin:
+    """Changelist and autocomplete search through the full-text index (see search.py)."""
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        # Only the matching keys: the changelist applies its own ordering, so
+        # the relevance rank would be computed for every match for nothing.
+        matches = search.search(queryset.model.objects.all(), search_term).values('pk')
+        return queryset.filter(pk__in=matches), False
 
 
 @admin.register(Author)
-class AuthorAdmin(admin.ModelAdmin):
+class AuthorAdmin(IndexedSearchMixin, LibraryModelAdmin):
     list_display = ['full_name', 'email', 'books_count', 'created_at']
     list_filter = ['created_at', 'birth_date']
     search_fields = ['first_name', 'last_name', 'email']
     readonly_fields = ['created_at', 'updated_at', 'books_count']
+    # Total order matching author_name_cursor_idx: the English names (modeltranslation
+    # would rewrite last_name to the active language's column), COALESCE'd as in the index.
+    ordering = [*AUTHOR_NAME_KEY.values(), 'id']
     
     fieldsets = (
         ('Personal Information', {
@@ -22,14 +108,32 @@ class AuthorAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if getattr(settings, 'LIBRARY_DENORMALIZED_BOOKS_COUNT', False):
+            return queryset.annotate(annotated_books_count=F('cached_books_count'))
+        return queryset.annotate(annotated_books_count=books_count_subquery())
+
+    def full_name(self, obj):
+        return obj.full_name
+    full_name.short_description = 'Full name'
+    full_name.admin_order_field = 'last_name'
+
+    def books_count(self, obj):
+        return obj.books_count
+    books_count.short_description = 'Books count'
+    books_count.admin_order_field = 'annotated_books_count'
+
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
+class BookAdmin(IndexedSearchMixin, LibraryModelAdmin):
     list_display = ['title', 'author_name', 'genre', 'publication_date', 'price', 'is_available']
     list_filter = ['genre', 'is_available', 'publication_date', 'created_at']
+    list_select_related = ['author']
     search_fields = ['title', 'author__first_name', 'author__last_name', 'isbn']
     readonly_fields = ['created_at', 'updated_at']
     list_editable = ['is_available', 'price']
+    autocomplete_fields = ['author']
     
     fieldsets = (
         ('Book Information', {
@@ -49,4 +153,21 @@ class BookAdmin(admin.ModelAdmin):
     
     def author_name(self, obj):
         return obj.author.full_name
-    author_name.short_description = 'Author'
\ No newline at end of file
+    author_name.short_description = 'Author'
+    author_name.admin_order_field = 'author__last_name'
+
+
+@admin.register(TranslationJob)
+class TranslationJobAdmin(LibraryModelAdmin):
+    list_display = ['model_label', 'object_id', 'field', 'language', 'status', 'attempts', 'updated_at']
+    list_filter = ['status', 'model_label', 'language']
+    search_fields = ['source_text', 'last_error']
+    readonly_fields = ['created_at', 'updated_at', 'locked_by', 'locked_at']
+
+
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(LibraryModelAdmin):
+    list_display = ['source_text', 'target_lang', 'translated_text', 'created_at']
+    list_filter = ['source_lang', 'target_lang']
+    search_fields = ['source_text', 'translated_text']
+    readonly_fields = ['key', 'created_at']
@@ -6,4 +6,5 @@ class LibraryConfig(AppConfig):
     name = 'apps.library'
 
     def ready(self):
-        import apps.library.signals
\ No newline at end of file
+        import apps.library.signals
+        import config.database  # SQLite pragmas on every new connection
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Async read endpoints for ASGI deployments (see config/asgi.py).
+
+    GET /api/async/books/               GET /api/async/authors/
+    GET /api/async/books/<pk>/          GET /api/async/authors/<pk>/
+    GET /api/async/books/statistics/
+
+They return the same JSON as the default GET of the DRF endpoints, with
+the same filters (?search=, ?genre=, ...) and page-number pagination
+(?page=), but are coroutines using the async ORM (acount, aiterator,
+aget): under ASGI a request waiting for the database does not hold a
+worker thread, so one process serves many concurrent, slow clients. Lists
+are built by the values() serializers; details by the regular serializers,
+on instances loaded with everything they read so serialization runs no
+query on the event loop.
+
+?fields=/?expand=, cursor pagination, ?count=false and the response cache
+are only on the DRF endpoints. Under WSGI these views still work, through
+an event loop per request.
+"""
+from functools import wraps
+from math import ceil
+
+from django.conf import settings
+from django.db.models import Count, Prefetch
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .filters import AuthorFilter, BookFilter
+from .models import Author, Book
+from .serializers import AuthorListValuesSerializer, AuthorSerializer, BookListValuesSerializer, BookSerializer
+from .services import statistics as library_statistics
+from .views import LOCALIZED_QUERYSETS, AuthorViewSet, BookViewSet
+
+PAGE_QUERY_PARAM = 'page'
+
+
+def read_only(view):
+    """require_GET for coroutine views (Django's decorators are sync-only before 5.0)."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def json_response(data, status=200):
+    """Rendered like DRF's Response, so the bytes match the sync endpoints."""
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def _localize(queryset):
+    return queryset.localized() if LOCALIZED_QUERYSETS else queryset
+
+
+def _with_books_count(authors):
+    if getattr(settings, 'LIBRARY_DENORMALIZED_BOOKS_COUNT', False):
+        return authors
+    return authors.annotate(annotated_books_count=Count('books'))
+
+
+def _page_link(request, page_number):
+    url = request.build_absolute_uri()
+    if page_number == 1:
+        return remove_query_param(url, PAGE_QUERY_PARAM)
+    return replace_query_param(url, PAGE_QUERY_PARAM, page_number)
+
+
+async def _list(request, queryset, filterset_class, values_serializer_class):
+    """
+    A page of the filtered queryset (the viewset's, so the same order), as
+    LibraryPagination and ValuesListMixin.list() build it.
+    """
+    filterset = filterset_class(request.GET, queryset=queryset)
+    if not filterset.is_valid():
+        return json_response(filterset.errors, status=400)
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page_number = int(request.GET.get(PAGE_QUERY_PARAM, 1))
+    except ValueError:
+        page_number = 0
+    count = await filterset.qs.acount()
+    if not 1 <= page_number <= max(1, ceil(count / page_size)):
+        return json_response({'detail': 'Invalid page.'}, status=404)
+
+    serializer = values_serializer_class()
+    offset = (page_number - 1) * page_size
+    rows = serializer.select(filterset.qs)[offset:offset + page_size]
+    results = serializer.to_representation([row async for row in rows.aiterator()])
+    return json_response({
+        'count': count,
+        'next': _page_link(request, page_number + 1) if offset + page_size < count else None,
+        'previous': _page_link(request, page_number - 1) if page_number > 1 else None,
+        'results': results,
+    })
+
+
+async def _detail(queryset, pk, serializer_class):
+    try:
+        instance = await queryset.aget(pk=pk)
+    except queryset.model.DoesNotExist:
+        return json_response({'detail': 'Not found.'}, status=404)
+    return json_response(serializer_class(instance).data)
+
+
+@read_only
+async def book_list(request):
+    return await _list(request, BookViewSet.queryset.all(), BookFilter, BookListValuesSerializer)
+
+
+@read_only
+async def book_detail(request, pk):
+    # The author (with its books_count) in the same aget(), not lazily while serializing
+    authors = _localize(_with_books_count(Author.objects.all()))
+    queryset = _localize(Book.objects.all()).prefetch_related(Prefetch('author', queryset=authors))
+    return await _detail(queryset, pk, BookSerializer)
+
+
+@read_only
+async def book_statistics(request):
+    return json_response(await library_statistics.asnapshot())
+
+
+@read_only
+async def author_list(request):
+    return await _list(request, AuthorViewSet.queryset.all(), AuthorFilter, AuthorListValuesSerializer)
+
+
+@read_only
+async def author_detail(request, pk):
+    return await _detail(_localize(_with_books_count(Author.objects.all())), pk, AuthorSerializer)
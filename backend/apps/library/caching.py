@@ -0,0 +1,206 @@
+"""
+Language-aware response cache for the library API.
+
+List and detail responses are cached per (path, normalized query params,
+active language). Keys embed version stamps instead of being deleted one by
+one: every write bumps the stamps of what it touched (signals call
+invalidate()), so stale entries are simply never read again and expire.
+
+Namespaces:
+    'book', 'author'            any change in the table (used by lists)
+    'book:<pk>', 'author:<pk>'  a single object (used by detail views; a
+                                lookup that is not an integer pk is not cached)
+
+The same stamps give every cached response a strong ETag and a
+Last-Modified date, so conditional GETs (If-None-Match / If-Modified-Since)
+are answered with 304 after the stamp lookup, before any other query or
+serialization runs.
+
+The stamps live in the database (CacheStamp), not in the cache: every
+process, including the translation worker and management commands, bumps
+and reads the same ones, so with the default per-process locmem cache a
+write is still seen by every process. A bump made inside a transaction
+becomes visible with the data it describes. Only the cached responses are
+per process with locmem; a shared cache backend (Redis, Memcached, file)
+lets processes share them.
+
+A response read from a replica shortly after a write (config/routers.py)
+may predate the write; it is served but neither cached nor given an ETag
+under the new stamps, or it would outlive the replica's lag.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from config import routers
+
+from .models import CacheStamp
+from .services.bulk import parse_pk
+
+API_CACHE_ENABLED = getattr(settings, 'API_CACHE_ENABLED', True)
+API_CACHE_ALIAS = getattr(settings, 'API_CACHE_ALIAS', 'default')
+API_CACHE_TIMEOUT = getattr(settings, 'API_CACHE_TIMEOUT', 300)
+API_CONDITIONAL_GET_ENABLED = getattr(settings, 'API_CONDITIONAL_GET_ENABLED', True)
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def _cache():
+    return caches[API_CACHE_ALIAS]
+
+
+def get_stamps(namespaces):
+    """
+    Return {namespace: stamp}. A stamp is the time.time_ns() of the last
+    change, 0 for namespaces never bumped: reads never write, only bump()
+    does. Read from the primary: a replica's stamps may lag behind its writes.
+    """
+    stamps = CacheStamp.objects.using(DEFAULT_DB_ALIAS).filter(namespace__in=namespaces)
+    found = dict(stamps.values_list('namespace', 'value'))
+    return {ns: found.get(ns, 0) for ns in namespaces}
+
+
+def bump(*namespaces):
+    """Mark namespaces as changed now."""
+    now = time.time_ns()
+    CacheStamp.objects.bulk_create(
+        [CacheStamp(namespace=ns, value=now) for ns in dict.fromkeys(namespaces)],
+        update_conflicts=True, unique_fields=['namespace'], update_fields=['value'],
+    )
+
+
+def invalidate(model, pks=(), related=()):
+    """
+    Bump the stamps of a model table and of the given objects.
+
+    model: model class or 'library.book' style label.
+    related: extra namespaces to bump, e.g. ('author:3',) when a book
+    changes the books_count of its author.
+    """
+    label = model if isinstance(model, str) else model._meta.label_lower
+    name = label.split('.')[-1]
+    bump(name, *(f'{name}:{pk}' for pk in pks), *related)
+
+
+def _count(namespace, outcome):
+    with _lock:
+        counters = _stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+        counters[outcome] += 1
+
+
+def stats():
+    """Per-namespace hit/miss counters of this process."""
+    with _lock:
+        return {
+            namespace: dict(counters, hit_ratio=round(
+                counters['hits'] / (counters['hits'] + counters['misses']), 3
+            ) if counters['hits'] + counters['misses'] else None)
+            for namespace, counters in _stats.items()
+        }
+
+
+def request_fingerprint(request):
+    """Hash of the host, path, normalized query params and active language."""
+    params = sorted(
+        (key, value) for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw = f'{request.get_host()}{request.path}?{params!r}#{translation.get_language()}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class CachedResponseMixin:
+    """
+    Cache list/retrieve responses of a ModelViewSet.
+
+    cache_namespace: the model namespace, e.g. 'book'.
+    cache_list_dependencies: namespaces whose changes invalidate list pages.
+    cache_detail_dependencies: table namespaces whose changes invalidate a
+        detail response, in addition to the object's own namespace.
+    """
+    cache_namespace = None
+    cache_list_dependencies = ()
+    cache_detail_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, 'list', lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, 'detail', lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+    def cache_dependencies(self, kind):
+        """The namespaces of the response, or None when it is not cached (a lookup that is no pk)."""
+        if kind == 'list':
+            return self.cache_list_dependencies
+        pk = parse_pk(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+        if pk is None:
+            return None
+        return (f'{self.cache_namespace}:{pk}', *self.cache_detail_dependencies)
+
+    def cached_response(self, request, kind, build):
+        if not API_CACHE_ENABLED and not API_CONDITIONAL_GET_ENABLED:
+            return build()
+        dependencies = self.cache_dependencies(kind)
+        if dependencies is None:
+            return build()
+        stamps = get_stamps(dependencies)
+        version = '.'.join(str(stamps[ns]) for ns in dependencies)
+        fingerprint = request_fingerprint(request)
+        # The rendered bytes also depend on the negotiated renderer (JSON vs browsable API).
+        etag = '"%s"' % hashlib.sha1(
+            f'{fingerprint}:{version}:{request.META.get("HTTP_ACCEPT", "")}'.encode('utf-8')
+        ).hexdigest()
+        changed_at = max(stamps.values())
+        # Last-Modified counts whole seconds: the stamp is rounded up, and only
+        # sent once that second is over, or a change later in the same second
+        # would still match it. The ETag has no such limit.
+        last_modified = -(-changed_at // 1_000_000_000) or None
+        send_last_modified = last_modified is not None and last_modified * 1_000_000_000 <= time.time_ns()
+        cacheable = not routers.replica_may_lag(changed_at)
+
+        if API_CONDITIONAL_GET_ENABLED:
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                if response.status_code == 304:
+                    response['ETag'] = etag
+                    if send_last_modified:
+                        response['Last-Modified'] = http_date(last_modified)
+                patch_vary_headers(response, ['Accept', 'Accept-Language'])
+                return response
+
+        if API_CACHE_ENABLED:
+            key = f'library:response:{self.cache_namespace}:{kind}:{fingerprint}:{version}'
+            cache = _cache()
+            data = cache.get(key)
+            if data is not None:
+                _count(self.cache_namespace, 'hits')
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+            else:
+                _count(self.cache_namespace, 'misses')
+                response = build()
+                if response.status_code == 200 and cacheable:
+                    cache.set(key, response.data, timeout=API_CACHE_TIMEOUT)
+                response['X-Cache'] = 'MISS'
+        else:
+            response = build()
+
+        if API_CONDITIONAL_GET_ENABLED and response.status_code == 200 and cacheable:
+            response['ETag'] = etag
+            if send_last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept', 'Accept-Language'])
+        return response
@@ -0,0 +1,44 @@
+"""
+Custom signals for batch writes, which bypass post_save/post_delete or stand in for them.
+
+QuerySet.update(), bulk_create() and bulk_update() (translation worker,
+fill_missing_translations, backfill, the bulk API) do not send model
+signals; they send these instead so caches, counters, statistics and the
+search index stay in sync. A batch QuerySet.delete() does send post_delete
+for every row: run it in batch_delete() and send rows_deleted, and the
+post_delete receivers leave its rows to rows_deleted. Receivers live in
+signals.py.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.dispatch import Signal
+
+# sender=<model class>, pks=<list of primary keys whose columns were updated>,
+# optionally objs=<the updated instances>; Author and Book instances keep the pre-update
+# values in _loaded_values (see LoadedValuesMixin), so receivers can tell what moved.
+rows_updated = Signal()
+
+# sender=<model class>, objs=<list of created instances, primary keys set>
+rows_created = Signal()
+
+# sender=<model class>, objs=<list of deleted instances, as loaded before the delete>
+rows_deleted = Signal()
+
+# (model, pk) of the rows the current batch_delete() removes
+_batch_deleted = ContextVar('batch_deleted', default=frozenset())
+
+
+@contextmanager
+def batch_delete(model, pks):
+    """Mark the model rows pks as deleted in a batch whose rows_deleted the caller sends."""
+    token = _batch_deleted.set(frozenset((model, pk) for pk in pks))
+    try:
+        yield
+    finally:
+        _batch_deleted.reset(token)
+
+
+def in_batch_delete(instance):
+    """True when a post_delete of instance is covered by a rows_deleted (see batch_delete())."""
+    return (type(instance), instance.pk) in _batch_deleted.get()
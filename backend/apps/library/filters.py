@@ -1,7 +1,7 @@
 import django_filters
-from django.db.models import Q
 
-from .models import Author, Book
+from . import search
+from .models import Author, Book, TranslationJob
 
 
 class AuthorFilter(django_filters.FilterSet):
@@ -15,11 +15,8 @@ class AuthorFilter(django_filters.FilterSet):
     def filter_search(self, queryset, name, value):
         if not value:
             return queryset
-        return queryset.filter(
-            Q(first_name__icontains=value) |
-            Q(last_name__icontains=value) |
-            Q(email__icontains=value)
-        )
+        # Names (all languages), email and bio via the search index; best match first
+        return search.search(queryset, value)
 
 
 class BookFilter(django_filters.FilterSet):
@@ -36,14 +33,19 @@ class BookFilter(django_filters.FilterSet):
     def filter_search(self, queryset, name, value):
         if not value:
             return queryset
-        return queryset.filter(
-            Q(title__icontains=value) |
-            Q(author__first_name__icontains=value) |
-            Q(author__last_name__icontains=value) |
-            Q(isbn__icontains=value)
-        )
+        # Title/description (all languages), author names and isbn via the search index; best match first
+        return search.search(queryset, value)
 
     def filter_available(self, queryset, name, value):
         if value in (True, 'true', '1'):
             return queryset.filter(is_available=True)
         return queryset
+
+
+class TranslationJobFilter(django_filters.FilterSet):
+    """FilterSet for TranslationJob model - e.g. ?model_label=library.book&object_id=3"""
+    status = django_filters.ChoiceFilter(choices=TranslationJob.STATUS_CHOICES)
+
+    class Meta:
+        model = TranslationJob
+        fields = ['model_label', 'object_id', 'field', 'language', 'status']
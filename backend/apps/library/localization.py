@@ -0,0 +1,175 @@
+"""
+SQL versions of the modeltranslation field descriptors.
+
+Reading ``book.title`` makes modeltranslation walk the fallback languages in
+Python for every row. localized() builds the same lookup as a database
+expression, e.g. for title in Hindi:
+
+    COALESCE(NULLIF(title_hi, ''), NULLIF(title_en, ''), NULLIF(title_ta, ''), '')
+
+An empty value falls through to the next language only where the descriptor
+does the same: for fields whose default is '' (title, first_name, ...), but
+not for nullable fields (description, bio), where only NULL is "undefined".
+The values() list serializers (ValuesSerializer) select these expressions too.
+
+LocalizedQuerySet.localized() loads model instances that way: the resolved
+values are selected instead of the per-language columns, and
+LocalizedFieldDescriptor (installed over modeltranslation's descriptors in
+translation.py) returns them without looking at those columns.
+"""
+from django.conf import settings
+from django.db import models
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.db.models.query import ModelIterable
+from modeltranslation.fields import NONE, TranslationFieldDescriptor
+from modeltranslation.translator import NotRegistered, translator
+from modeltranslation.utils import build_localized_fieldname, get_language, resolution_order
+
+
+def fallback_chain(model, name, lang):
+    """
+    (columns, undefined, default) for model.<name> in lang: the translation
+    columns in resolution order, the value that makes a column fall through
+    and the value when all do.
+    """
+    descriptor = model.__dict__[name]
+    default = model._meta.get_field(name).get_default()
+    undefined = default if descriptor.fallback_undefined is NONE else descriptor.fallback_undefined
+    columns = [f'{name}_{code}' for code in resolution_order(lang, descriptor.fallback_languages)]
+    return columns, undefined, default
+
+
+def localized(model, name, lang, prefix=''):
+    """
+    Expression for the value of model.<name> in lang, with fallbacks.
+
+    prefix: lookup path to model from the queried model, e.g. 'author__'
+    to localize Author.first_name in a Book query.
+    """
+    columns, undefined, default = fallback_chain(model, name, lang)
+    expressions = []
+    for column in columns:
+        column = F(f'{prefix}{column}')
+        if undefined is not None:
+            column = NullIf(column, Value(undefined), output_field=TextField())
+        expressions.append(column)
+    if default is not None:
+        expressions.append(Value(default))
+    if len(expressions) == 1:
+        return expressions[0]
+    return Coalesce(*expressions, output_field=TextField())
+
+
+def translated_fields(model):
+    """Names of the model's translated fields (empty when not registered)."""
+    try:
+        return list(translator.get_options_for_model(model).fields)
+    except NotRegistered:
+        return []
+
+
+class LocalizedFieldDescriptor(TranslationFieldDescriptor):
+    """
+    modeltranslation's descriptor, returning the value resolved by
+    LocalizedQuerySet.localized() when the instance was loaded that way
+    for the active language.
+    """
+
+    def __get__(self, instance, owner):
+        if instance is not None:
+            resolved = instance.__dict__.get('_localized_values', {}).get(self.field.name)
+            if resolved is not None and resolved[0] == get_language():
+                return resolved[1]
+        return super().__get__(instance, owner)
+
+    def __set__(self, instance, value):
+        instance.__dict__.get('_localized_values', {}).pop(self.field.name, None)
+        super().__set__(instance, value)
+
+
+def install_descriptors(model):
+    """Replace the descriptors modeltranslation set on a registered model."""
+    for name in translated_fields(model):
+        descriptor = model.__dict__[name]
+        setattr(model, name, LocalizedFieldDescriptor(
+            descriptor.field,
+            fallback_languages=descriptor.fallback_languages,
+            fallback_value=descriptor.fallback_value,
+            fallback_undefined=descriptor.fallback_undefined,
+        ))
+
+
+def _related_paths(model, select_related, path=()):
+    """(path, model) for the model and every relation followed by select_related()."""
+    yield path, model
+    if isinstance(select_related, dict):
+        for name, nested in select_related.items():
+            yield from _related_paths(model._meta.get_field(name).related_model, nested, (*path, name))
+
+
+class LocalizedModelIterable(ModelIterable):
+    """Hands the values selected by localized() over to their instances."""
+
+    def __iter__(self):
+        lang, targets = self.queryset._localized
+        for obj in super().__iter__():
+            for alias, path, name in targets:
+                value = obj.__dict__.pop(alias)
+                target = obj
+                for step in path:
+                    target = getattr(target, step)
+                    if target is None:
+                        break
+                else:
+                    target.__dict__.setdefault('_localized_values', {})[name] = (lang, value)
+            yield obj
+
+
+def _loads(query, lookup):
+    """Whether only()/defer() leave the field at lookup ('name' or 'relation__name') to be loaded."""
+    names, defer = query.deferred_loading
+    if defer:
+        return lookup not in names
+    prefix = lookup.rpartition('__')[0]
+    if lookup in names or not prefix:
+        return lookup in names
+    # only() naming a relation but none of its fields loads all of them
+    return not any(name.startswith(f'{prefix}__') for name in names)
+
+
+class LocalizedQuerySet(models.QuerySet):
+    _localized = None
+
+    def localized(self, lang=None, keep=()):
+        """
+        Resolve the translated fields for lang (default: the active language)
+        in SQL, for the model and the relations followed by select_related(),
+        and defer their per-language columns, except those in keep (e.g. a
+        cursor pagination key). Fields left out by only()/defer() are skipped.
+        Call it after select_related() and only().
+        """
+        lang = lang or get_language()
+        annotations, targets, deferred = {}, [], []
+        for path, model in _related_paths(self.model, self.query.select_related):
+            prefix = ''.join(f'{step}__' for step in path)
+            for name in translated_fields(model):
+                if not _loads(self.query, f'{prefix}{name}'):
+                    continue
+                alias = f'localized_{len(annotations)}'
+                annotations[alias] = localized(model, name, lang, prefix)
+                targets.append((alias, path, name))
+                deferred.append(f'{prefix}{name}')
+                deferred.extend(
+                    f'{prefix}{build_localized_fieldname(name, code)}' for code in settings.MODELTRANSLATION_LANGUAGES
+                )
+        clone = self.annotate(**annotations)
+        clone.query.add_deferred_loading([lookup for lookup in deferred if lookup not in keep])
+        clone._iterable_class = LocalizedModelIterable
+        clone._localized = (lang, targets)
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._localized = self._localized
+        return clone
@@ -3,11 +3,40 @@ One-time (or on-demand) backfill of hi/ta translations for existing records.
 
 Uses deep-translator to fill *_hi and *_ta from *_en where empty.
 Run after migration: python manage.py backfill_translations
+
+Only rows with an empty target column, or one a failed translation left in
+English, are read, in primary-key order and in chunks. Each chunk is
+translated by a thread pool (--workers), written back with one bulk_update
+(translations and their source fingerprints), and its last primary key is
+saved to a checkpoint file so an interrupted run can continue with --resume.
+Rows whose translation failed are retried by the next run, resumed or not.
 """
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from operator import or_
+from pathlib import Path
+
 from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
+from modeltranslation.translator import translator
 
+from apps.library import events
 from apps.library.models import Author, Book
-from apps.library.services.auto_translate import fill_missing_translations
+from apps.library.services import translation_memory
+from apps.library.services.auto_translate import (
+    FAILED_FINGERPRINT, SOURCE_LANG, SOURCES_FIELD, SUPPORTED_TARGETS, translate_missing,
+)
+
+
+def _translate_slice(items):
+    try:
+        return translate_missing(items)
+    finally:
+        # Worker threads open their own DB connections (translation memory).
+        connections.close_all()
 
 
 class Command(BaseCommand):
@@ -19,37 +48,129 @@ class Command(BaseCommand):
             action='store_true',
             help='Only show what would be translated, do not save.',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Rows read, translated and written per chunk (default: 200).',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Translation threads per chunk (default: 4).',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the last checkpointed primary key.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default='backfill_translations.checkpoint.json',
+            help='Checkpoint file (default: backfill_translations.checkpoint.json).',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         if dry_run:
             self.stdout.write('Dry run — no changes will be saved.')
 
-        count_a, count_b = 0, 0
-
-        for author in Author.objects.all():
-            fields_with_en = [
-                ('first_name', getattr(author, 'first_name_en', None) or author.first_name),
-                ('last_name', getattr(author, 'last_name_en', None) or author.last_name),
-                ('bio', getattr(author, 'bio_en', None) or author.bio),
-            ]
-            to_fill = [(n, v) for n, v in fields_with_en if v]
-            if to_fill:
-                if not dry_run:
-                    fill_missing_translations(author, to_fill)
-                count_a += 1
-
-        for book in Book.objects.all():
-            fields_with_en = [
-                ('title', getattr(book, 'title_en', None) or book.title),
-                ('description', getattr(book, 'description_en', None) or book.description),
-            ]
-            to_fill = [(n, v) for n, v in fields_with_en if v]
-            if to_fill:
-                if not dry_run:
-                    fill_missing_translations(book, to_fill)
-                count_b += 1
+        self.checkpoint_path = Path(options['checkpoint'])
+        self.checkpoint = {}
+        if options['resume'] and self.checkpoint_path.exists():
+            self.checkpoint = json.loads(self.checkpoint_path.read_text())
+            self.stdout.write(f'Resuming from checkpoint {self.checkpoint}')
+
+        counts = {}
+        for model in (Author, Book):
+            counts[model] = self.backfill_model(model, options, dry_run)
+
+        if not dry_run and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
 
+        memory = translation_memory.stats()
         self.stdout.write(self.style.SUCCESS(
-            f'Processed Authors: {count_a}, Books: {count_b}' + (' (dry run)' if dry_run else '')
+            f'Processed Authors: {counts[Author]}, Books: {counts[Book]}' + (' (dry run)' if dry_run else '')
         ))
+        self.stdout.write(
+            f'Translation memory hits: {memory["lru_hits"] + memory["db_hits"]}, misses: {memory["misses"]}'
+        )
+
+    def backfill_model(self, model, options, dry_run):
+        label = model._meta.label_lower
+        fields = translator.get_options_for_model(model).fields.keys()
+        source_attrs = [f'{name}_{SOURCE_LANG}' for name in fields]
+        target_attrs = [f'{name}_{lang}' for name in fields for lang in sorted(SUPPORTED_TARGETS)]
+
+        # Copies of the English text left by a failed translation (see auto_translate._updates)
+        failed = reduce(or_, [
+            Q(**{f'{SOURCES_FIELD}__{name}_{lang}': FAILED_FINGERPRINT})
+            for name in fields for lang in SUPPORTED_TARGETS
+        ])
+        needs_work = reduce(or_, [
+            (Q(**{f'{name}_{lang}__isnull': True}) | Q(**{f'{name}_{lang}': ''}))
+            & ~Q(**{f'{name}_{SOURCE_LANG}__isnull': True}) & ~Q(**{f'{name}_{SOURCE_LANG}': ''})
+            for name in fields for lang in SUPPORTED_TARGETS
+        ]) | failed
+        queryset = (
+            model.objects.filter(needs_work)
+            .only('pk', *source_attrs, *target_attrs, SOURCES_FIELD)
+            .order_by('pk')
+        )
+        checkpoint = self.checkpoint.get(label, 0)
+        if checkpoint:
+            # Rows up to the checkpoint are done, except where their translation failed
+            queryset = queryset.filter(Q(pk__gt=checkpoint) | failed)
+        last_pk = 0
+        total = queryset.count()
+        if dry_run or not total:
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {total} rows need translation.')
+            return total
+
+        chunk_size, workers = options['chunk_size'], max(options['workers'], 1)
+        processed, started = 0, time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                # Keyset pagination instead of one long-lived cursor: on SQLite an
+                # open cursor would observe the bulk_update writes of this loop.
+                chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+                if not chunk:
+                    break
+                items = [
+                    (obj, [(name, getattr(obj, f'{name}_{SOURCE_LANG}')) for name in fields])
+                    for obj in chunk
+                ]
+                step = -(-len(items) // workers)
+                slices = [items[i:i + step] for i in range(0, len(items), step)]
+                changed, changed_fields = [], set()
+                for results in executor.map(_translate_slice, slices):
+                    for obj, updates in results:
+                        if not updates:
+                            continue
+                        for attr, value in updates.items():
+                            setattr(obj, attr, value)
+                        changed.append(obj)
+                        changed_fields.update(updates)
+                if changed:
+                    model.objects.bulk_update(changed, sorted(changed_fields))
+                    events.rows_updated.send(sender=model, pks=[obj.pk for obj in changed])
+
+                last_pk = chunk[-1].pk
+                processed += len(chunk)
+                self.save_checkpoint(label, max(last_pk, checkpoint))
+                self.report_progress(model, processed, total, started)
+        return processed
+
+    def save_checkpoint(self, label, last_pk):
+        self.checkpoint[label] = last_pk
+        self.checkpoint_path.write_text(json.dumps(self.checkpoint))
+
+    def report_progress(self, model, processed, total, started):
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed else 0
+        eta = (total - processed) / rate if rate else 0
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {processed}/{total} rows, '
+            f'{rate:.1f} rows/s, ETA {eta:.0f}s'
+        )
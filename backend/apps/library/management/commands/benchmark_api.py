@@ -0,0 +1,257 @@
+"""
+Benchmark the API hot paths on synthetic catalogues of several sizes.
+
+For each size a fresh test database is created (as the test runner would:
+in memory for SQLite), filled by services/synthetic.py and measured through
+the Django test client, in each language, with the response cache off:
+
+    list        GET  /api/books/
+    detail      GET  /api/books/<id>/          (rotating over sampled books)
+    search      GET  /api/books/?search=<word in that language>
+    filter      GET  /api/books/?genre=history
+    statistics  GET  /api/books/statistics/
+    create      POST /api/books/
+
+Query counts and SQL time come from the Server-Timing header of the
+instrumentation middleware. Results are printed and, with --output, written
+as JSON; --compare prints the change against such a file (e.g. from the
+previous commit) and --max-regression fails when a p50 got slower by more
+than the given percentage:
+
+    python manage.py benchmark_api --sizes 1000,100000 --output before.json
+    python manage.py benchmark_api --sizes 1000,100000 --compare before.json --max-regression 15
+
+--read-model measures with LIBRARY_READ_MODEL on (documents built after
+seeding), e.g. against a run without it:
+
+    python manage.py benchmark_api --scenarios list,detail --output plain.json
+    python manage.py benchmark_api --scenarios list,detail --read-model --compare plain.json
+"""
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from apps.library import caching
+from apps.library.models import Author, Book
+from apps.library.services import read_model, synthetic
+from config import instrumentation, routers
+
+SCENARIOS = ('list', 'detail', 'search', 'filter', 'statistics', 'create')
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark list/detail/search/filter/statistics/create on synthetic catalogues (JSON output).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,100000,1000000',
+            help='Comma-separated catalogue sizes in books (default: 1000,100000,1000000).',
+        )
+        parser.add_argument(
+            '--languages',
+            default=','.join(settings.MODELTRANSLATION_LANGUAGES),
+            help='Comma-separated Accept-Language values (default: all).',
+        )
+        parser.add_argument(
+            '--scenarios',
+            default=','.join(SCENARIOS),
+            help=f'Comma-separated scenarios (default: {",".join(SCENARIOS)}).',
+        )
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per scenario (default: 20).')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario (default: 3).')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic catalogue (default: 0).')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='Results JSON of an earlier run to compare against.')
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            help='With --compare: fail if any p50 is slower by more than this percentage.',
+        )
+        parser.add_argument(
+            '--read-model',
+            action='store_true',
+            help='Serve book list/detail from the pre-rendered documents (LIBRARY_READ_MODEL).',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        languages = options['languages'].split(',')
+        scenarios = options['scenarios'].split(',')
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}.')
+        baseline = self.load(options['compare']) if options['compare'] else None
+
+        caching.API_CACHE_ENABLED = False
+        # Replicas would still point at the real database files, not the test database
+        routers.REPLICA_ALIASES = ()
+        caching.API_CONDITIONAL_GET_ENABLED = False
+        instrumentation.SAMPLE_RATE = 1.0
+        instrumentation.SERVER_TIMING = True
+        read_model.READ_MODEL_ENABLED = options['read_model']
+        self.client = Client(HTTP_HOST='localhost')
+        self.rng = random.Random(options['seed'])
+        self.isbn = 0
+
+        results = []
+        for size in sizes:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                # An in-memory SQLite test database outlives destroy_test_db() within the process
+                call_command('flush', interactive=False, verbosity=0)
+                started = time.monotonic()
+                synthetic.generate(size, seed=options['seed'])
+                self.stdout.write(f'Seeded {size} books in {time.monotonic() - started:.1f}s')
+                # Translations are queued, never made inside the request; DEBUG for
+                # the Server-Timing header, which anonymous clients get only then
+                with override_settings(AUTO_TRANSLATE_ASYNC=True, DEBUG=True):
+                    for lang in languages:
+                        for scenario in scenarios:
+                            result = self.run(scenario, size, lang, options['repeat'], options['warmup'])
+                            results.append(result)
+                            self.report(result, baseline)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = {'meta': self.meta(options), 'results': results}
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(output, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}.'))
+        if baseline is not None and options['max_regression'] is not None:
+            self.check_regressions(results, baseline, options['max_regression'])
+
+    def requests(self, scenario, lang):
+        """Endless (method, url, json body) for the scenario."""
+        book_ids = list(Book.objects.order_by('?').values_list('id', flat=True)[:100])
+        author_ids = list(Author.objects.values_list('id', flat=True)[:100])
+        while True:
+            if scenario == 'list':
+                yield 'get', '/api/books/', None
+            elif scenario == 'detail':
+                yield 'get', f'/api/books/{self.rng.choice(book_ids)}/', None
+            elif scenario == 'search':
+                yield 'get', f'/api/books/?search={self.rng.choice(synthetic.WORDS[lang])}', None
+            elif scenario == 'filter':
+                yield 'get', '/api/books/?genre=history', None
+            elif scenario == 'statistics':
+                yield 'get', '/api/books/statistics/', None
+            else:
+                self.isbn += 1
+                yield 'post', '/api/books/', {
+                    'title': f'Benchmark book {self.isbn}',
+                    'author': self.rng.choice(author_ids),
+                    'isbn': f'978{self.isbn:010d}',
+                    'genre': 'history',
+                    'publication_date': '2001-02-03',
+                    'pages': 250,
+                    'price': '12.50',
+                    'description': 'Written by the API benchmark.',
+                }
+
+    def run(self, scenario, size, lang, repeat, warmup):
+        requests = self.requests(scenario, lang)
+        latencies, queries, db_times = [], [], []
+        for index in range(warmup + repeat):
+            method, url, body = next(requests)
+            started = time.perf_counter()
+            if method == 'post':
+                response = self.client.post(url, body, content_type='application/json', HTTP_ACCEPT_LANGUAGE=lang)
+            else:
+                response = self.client.get(url, HTTP_ACCEPT_LANGUAGE=lang)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code >= 400:
+                raise CommandError(f'{method.upper()} {url} returned {response.status_code}: {response.content[:200]!r}')
+            if index < warmup:
+                continue
+            latencies.append(elapsed)
+            match = SERVER_TIMING_DB.search(response.get('Server-Timing', ''))
+            if match:
+                db_times.append(float(match.group(1)))
+                queries.append(int(match.group(2)))
+
+        latencies.sort()
+        return {
+            'size': size,
+            'language': lang,
+            'scenario': scenario,
+            'requests': len(latencies),
+            'mean_ms': round(statistics.mean(latencies), 2),
+            'p50_ms': round(self.percentile(latencies, 50), 2),
+            'p95_ms': round(self.percentile(latencies, 95), 2),
+            'max_ms': round(latencies[-1], 2),
+            'requests_per_second': round(len(latencies) / (sum(latencies) / 1000), 1),
+            'queries': statistics.median(queries) if queries else None,
+            'db_ms': round(statistics.median(db_times), 2) if db_times else None,
+        }
+
+    @staticmethod
+    def percentile(values, p):
+        return values[min(len(values) - 1, len(values) * p // 100)]
+
+    @staticmethod
+    def key(result):
+        return result['size'], result['language'], result['scenario']
+
+    def report(self, result, baseline):
+        line = (
+            f'{result["size"]:>8} {result["language"]:<3} {result["scenario"]:<11} '
+            f'p50 {result["p50_ms"]:>8.2f} ms  p95 {result["p95_ms"]:>8.2f} ms  '
+            f'{result["requests_per_second"]:>7.1f} req/s  {result["queries"]} queries'
+        )
+        previous = (baseline or {}).get(self.key(result))
+        if previous:
+            change = (result['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100
+            line += f'  ({change:+.1f}% p50)'
+        self.stdout.write(line)
+
+    def load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return {self.key(result): result for result in json.load(f)['results']}
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+    def check_regressions(self, results, baseline, limit):
+        slower = []
+        for result in results:
+            previous = baseline.get(self.key(result))
+            if previous and result['p50_ms'] > previous['p50_ms'] * (1 + limit / 100):
+                slower.append(f'{result["size"]}/{result["language"]}/{result["scenario"]}: '
+                              f'{previous["p50_ms"]} -> {result["p50_ms"]} ms')
+        if slower:
+            raise CommandError(f'p50 regressions over {limit}%:\n  ' + '\n  '.join(slower))
+        self.stdout.write(self.style.SUCCESS(f'No p50 regression over {limit}%.'))
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'seed': options['seed'],
+            'read_model': options['read_model'],
+        }
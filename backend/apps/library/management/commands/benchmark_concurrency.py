@@ -0,0 +1,167 @@
+"""
+Compare WSGI and ASGI under concurrent, slow clients on this machine, in
+one process and without a network server:
+
+    wsgi        config.wsgi.application called from --threads worker threads
+                (a threaded WSGI server), serving the DRF endpoints
+    asgi        config.asgi.application on one event loop, serving the async
+                endpoints under /api/async/
+    asgi-sync   the same ASGI application serving the DRF endpoints, which
+                Django runs in a thread
+
+Each of --clients concurrent clients sends requests back to back (book
+list, book detail, statistics, author list) and is slow to read the
+response: --client-delay ms pass while the body is written, holding a
+worker thread under WSGI and only an awaited send() under ASGI. The
+response cache is off. Prints requests per second and latency percentiles
+per mode and concurrency level:
+    python manage.py benchmark_concurrency --clients 1,10,50,200 --requests 400
+"""
+import asyncio
+import io
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.library import caching
+from apps.library.models import Author, Book
+from config.asgi import application as asgi_application
+from config.wsgi import application as wsgi_application
+
+MODES = ('wsgi', 'asgi', 'asgi-sync')
+HOST = 'localhost'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark WSGI (threads) vs ASGI (event loop) throughput and latency with concurrent slow clients.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', default='1,10,50,200', help='Comma-separated concurrency levels.')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per measurement (default: 400).')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads (default: 8).')
+        parser.add_argument(
+            '--client-delay', type=float, default=200,
+            help='Milliseconds each client takes to read a response (default: 200).',
+        )
+        parser.add_argument('--modes', default=','.join(MODES), help=f'Comma-separated, of {", ".join(MODES)}.')
+
+    def handle(self, *args, **options):
+        modes = options['modes'].split(',')
+        if set(modes) - set(MODES):
+            raise CommandError(f'Unknown modes: {", ".join(sorted(set(modes) - set(MODES)))}.')
+        book = Book.objects.order_by('pk').values_list('pk', flat=True).first()
+        if book is None or not Author.objects.exists():
+            raise CommandError('No books: run `python manage.py seed_catalogue` first.')
+        caching.API_CACHE_ENABLED = False
+        caching.API_CONDITIONAL_GET_ENABLED = False
+        self.paths = ['books/', f'books/{book}/', 'books/statistics/', 'authors/']
+        self.delay = options['client_delay'] / 1000
+
+        self.stdout.write(
+            f'{"mode":<10} {"clients":>7} {"req/s":>8} {"p50 ms":>9} {"p95 ms":>9} {"max ms":>9}'
+        )
+        for clients in [int(value) for value in options['clients'].split(',')]:
+            for mode in modes:
+                started = time.perf_counter()
+                if mode == 'wsgi':
+                    latencies = self.run_wsgi(clients, options['requests'], options['threads'])
+                else:
+                    prefix = '/api/async/' if mode == 'asgi' else '/api/'
+                    latencies = asyncio.run(self.run_asgi(clients, options['requests'], prefix))
+                elapsed = time.perf_counter() - started
+                latencies.sort()
+                self.stdout.write(
+                    f'{mode:<10} {clients:>7} {len(latencies) / elapsed:>8.1f} '
+                    f'{statistics.median(latencies):>9.1f} '
+                    f'{latencies[min(len(latencies) - 1, len(latencies) * 95 // 100)]:>9.1f} {latencies[-1]:>9.1f}'
+                )
+
+    def next_path(self, counter, prefix):
+        """Paths in rotation; None once the requests of the measurement are used up."""
+        with self.lock:
+            if counter[0] <= 0:
+                return None
+            counter[0] -= 1
+            return prefix + self.paths[counter[0] % len(self.paths)]
+
+    def run_wsgi(self, clients, requests, threads):
+        """Milliseconds per request, from being sent to being read by the client."""
+        self.lock, counter, latencies = threading.Lock(), [requests], []
+        pool = ThreadPoolExecutor(max_workers=threads)
+
+        def client():
+            while (path := self.next_path(counter, '/api/')) is not None:
+                started = time.perf_counter()
+                pool.submit(self.wsgi_request, path).result()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        client_threads = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in client_threads:
+            thread.start()
+        for thread in client_threads:
+            thread.join()
+        pool.shutdown()
+        return latencies
+
+    def wsgi_request(self, path):
+        url = urlsplit(path)
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': url.path, 'QUERY_STRING': url.query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': HOST, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': HOST,
+            'HTTP_ACCEPT': 'application/json', 'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+            'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+        status = []
+        body = wsgi_application(environ, lambda value, headers, exc_info=None: status.append(value))
+        try:
+            for _chunk in body:
+                # The worker thread is busy until the slow client has read the body
+                time.sleep(self.delay)
+        finally:
+            body.close()
+        if not status[0].startswith('200'):
+            raise CommandError(f'GET {path} returned {status[0]}')
+
+    async def run_asgi(self, clients, requests, prefix):
+        self.lock, counter, latencies = threading.Lock(), [requests], []
+
+        async def client():
+            while (path := self.next_path(counter, prefix)) is not None:
+                started = time.perf_counter()
+                await self.asgi_request(path)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return latencies
+
+    async def asgi_request(self, path):
+        url = urlsplit(path)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': url.path, 'raw_path': url.path.encode(), 'query_string': url.query.encode(), 'root_path': '',
+            'headers': [(b'host', HOST.encode()), (b'accept', b'application/json')],
+            'client': ('127.0.0.1', 0), 'server': (HOST, 80),
+        }
+        received, status = [], []
+
+        async def receive():
+            if not received:
+                received.append(True)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Future()  # no disconnect
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif message['type'] == 'http.response.body':
+                # Only this request waits for the slow client
+                await asyncio.sleep(self.delay)
+
+        await asgi_application(scope, receive, send)
+        if status[0] != 200:
+            raise CommandError(f'GET {path} returned {status[0]}')
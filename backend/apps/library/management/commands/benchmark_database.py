@@ -0,0 +1,167 @@
+"""
+Measure concurrent API reads and writes on SQLite with and without the
+connection tuning of config/database.py:
+
+    default   SQLite's defaults (rollback journal, synchronous=FULL, no busy
+              timeout beyond Python's) and a new connection per request
+    tuned     settings.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, busy_timeout,
+              cache/mmap sizes) and connections kept for DATABASE_CONN_MAX_AGE
+
+Each profile gets a fresh database file with a synthetic catalogue. Then
+--writers threads PATCH book titles (the save, its translation fill with
+the stub translator, search index and cache invalidation) while --readers
+threads GET book lists and details, for --seconds. Prints requests per
+second, latency percentiles and "database is locked" errors per role:
+
+    python manage.py benchmark_database --writers 4 --readers 8 --seconds 10
+
+With DATABASE_PROFILE=postgres only the "tuned" run is meaningful; it then
+measures the configured server (persistent connections, PgBouncer if set).
+"""
+import json
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+
+from apps.library import caching
+from apps.library.models import Book
+from apps.library.services import synthetic
+from config import routers
+
+PROFILES = ('default', 'tuned')
+STUB_BACKEND = 'apps.library.services.translators.StubTranslatorBackend'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent API reads/writes on SQLite: default settings vs WAL, pragmas and persistent connections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=2000, help='Catalogue size (default: 2000).')
+        parser.add_argument('--writers', type=int, default=4, help='Threads saving books (default: 4).')
+        parser.add_argument('--readers', type=int, default=8, help='Threads reading books (default: 8).')
+        parser.add_argument('--seconds', type=float, default=10, help='Duration per profile (default: 10).')
+        parser.add_argument('--profiles', default=','.join(PROFILES), help=f'Comma-separated, of {", ".join(PROFILES)}.')
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'].split(',')
+        if set(profiles) - set(PROFILES):
+            raise CommandError(f'Unknown profiles: {", ".join(sorted(set(profiles) - set(PROFILES)))}.')
+        caching.API_CACHE_ENABLED = False
+        # Replicas would still point at the real database files, not the test database
+        routers.REPLICA_ALIASES = ()
+        caching.API_CONDITIONAL_GET_ENABLED = False
+
+        self.stdout.write(
+            f'{"profile":<8} {"role":<7} {"req/s":>8} {"p50 ms":>9} {"p95 ms":>9} {"max ms":>9} {"locked":>7}'
+        )
+        for profile in profiles:
+            with override_settings(**self.profile_settings(profile)):
+                for role, result in self.run_profile(profile, options).items():
+                    self.stdout.write(
+                        f'{profile:<8} {role:<7} {result["requests"] / options["seconds"]:>8.1f} '
+                        f'{result["p50"]:>9.1f} {result["p95"]:>9.1f} {result["max"]:>9.1f} {result["locked"]:>7}'
+                    )
+
+    def profile_settings(self, profile):
+        values = {'AUTO_TRANSLATE_ASYNC': False, 'AUTO_TRANSLATE_BACKEND': STUB_BACKEND, 'ALLOWED_HOSTS': ['*']}
+        if profile == 'default':
+            values['SQLITE_PRAGMAS'] = {}
+        return values
+
+    def run_profile(self, profile, options):
+        directory = tempfile.mkdtemp(prefix='benchmark-database-')
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        previous = (test_settings.get('NAME'), connection.settings_dict['CONN_MAX_AGE'])
+        if connection.vendor == 'sqlite':
+            # A file, not the in-memory test database: journal modes and locking only matter on disk
+            test_settings['NAME'] = str(Path(directory) / 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            call_command('flush', interactive=False, verbosity=0)
+            synthetic.generate(options['books'])
+            connection.settings_dict['CONN_MAX_AGE'] = settings.DATABASE_CONN_MAX_AGE if profile == 'tuned' else 0
+            connection.close()
+            return self.run_clients(options)
+        finally:
+            connection.settings_dict['CONN_MAX_AGE'] = previous[1]
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = previous[0]
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def run_clients(self, options):
+        book_ids = list(Book.objects.values_list('pk', flat=True)[:500])
+        deadline = time.monotonic() + options['seconds']
+        results = {'write': [], 'read': []}
+        locked = {'write': 0, 'read': 0}
+        failures, lock = [], threading.Lock()
+
+        def client(role, index):
+            http = Client(HTTP_HOST='localhost')
+            latencies, errors, counter = [], 0, 0
+            try:
+                while time.monotonic() < deadline:
+                    counter += 1
+                    book = book_ids[(index * 7919 + counter) % len(book_ids)]
+                    started = time.perf_counter()
+                    try:
+                        if role == 'write':
+                            response = http.patch(
+                                f'/api/books/{book}/', json.dumps({'title': f'Benchmark {index}-{counter}'}),
+                                content_type='application/json',
+                            )
+                        elif counter % 2:
+                            response = http.get(f'/api/books/?page={counter % 20 + 1}')
+                        else:
+                            response = http.get(f'/api/books/{book}/')
+                    except OperationalError as error:
+                        if 'locked' not in str(error):
+                            raise
+                        errors += 1
+                        continue
+                    if response.status_code != 200:
+                        raise CommandError(f'{role} returned {response.status_code}: {response.content[:200]!r}')
+                    latencies.append((time.perf_counter() - started) * 1000)
+            except Exception as error:
+                failures.append(error)
+            finally:
+                connections.close_all()
+            with lock:
+                results[role].extend(latencies)
+                locked[role] += errors
+
+        threads = [
+            threading.Thread(target=client, args=(role, index))
+            for role, count in (('write', options['writers']), ('read', options['readers']))
+            for index in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if failures:
+            raise failures[0]
+        return {
+            role: {
+                'requests': len(latencies),
+                'p50': self.percentile(latencies, 50),
+                'p95': self.percentile(latencies, 95),
+                'max': self.percentile(latencies, 100),
+                'locked': locked[role],
+            }
+            for role, latencies in results.items()
+        }
+
+    @staticmethod
+    def percentile(values, p):
+        values = sorted(values)
+        return values[min(len(values) - 1, len(values) * p // 100)] if values else 0.0
@@ -0,0 +1,89 @@
+"""
+Measure language negotiation per request: the previous stack (Django's
+LocaleMiddleware followed by an uncached Accept-Language parse) against
+config.middleware.AcceptLanguageMiddleware alone, with its parse memoized,
+over a mix of typical browser headers. The view is a no-op, so the times
+are the middleware's own cost:
+    python manage.py benchmark_language --requests 20000
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.middleware.locale import LocaleMiddleware
+from django.test import RequestFactory
+from django.utils import translation
+
+from config import middleware
+
+HEADERS = [
+    'en-US,en;q=0.9',
+    'hi-IN,hi;q=0.9,en-US;q=0.8,en;q=0.7',
+    'ta-IN,ta;q=0.9,en-GB;q=0.8,en;q=0.7',
+    'en;q=0.1, hi;q=0.9',
+    'fr-FR,fr;q=0.9,ta;q=0.5,*;q=0.1',
+    '',
+]
+
+
+def _view(request):
+    return HttpResponse()
+
+
+class _UncachedLanguageMiddleware:
+    """AcceptLanguageMiddleware as it was run after LocaleMiddleware: the header parsed on every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        header = request.META.get('HTTP_ACCEPT_LANGUAGE', '')
+        translation.activate(middleware.parse_accept_language.__wrapped__(header) or middleware.DEFAULT_LANGUAGE)
+        response = self.get_response(request)
+        translation.deactivate()
+        return response
+
+
+class Command(BaseCommand):
+    help = 'Benchmark Accept-Language negotiation: LocaleMiddleware + uncached parse vs the memoized middleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000, help='Requests per run (default: 20000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement (default: 5).')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        requests = [
+            factory.get('/api/books/', HTTP_ACCEPT_LANGUAGE=HEADERS[index % len(HEADERS)])
+            for index in range(options['requests'])
+        ]
+        stacks = [
+            ('LocaleMiddleware + uncached parse', LocaleMiddleware(_UncachedLanguageMiddleware(_view))),
+            ('AcceptLanguageMiddleware', middleware.AcceptLanguageMiddleware(_view)),
+        ]
+        self.stdout.write(f'{"stack":<34} {"us/request":>11}')
+        results = []
+        for name, stack in stacks:
+            per_request = self.measure(stack, requests, options['repeat'])
+            results.append(per_request)
+            self.stdout.write(f'{name:<34} {per_request:>11.2f}')
+
+        parse = middleware.parse_accept_language
+        for label, function in (('parse (uncached)', parse.__wrapped__), ('parse (memoized)', parse)):
+            per_call = self.measure(lambda request: function(request.META['HTTP_ACCEPT_LANGUAGE']),
+                                    requests, options['repeat'])
+            self.stdout.write(f'{label:<34} {per_call:>11.2f}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{results[0] - results[1]:.2f} us saved per request ({results[0] / results[1]:.1f}x).'
+        ))
+
+    def measure(self, handler, requests, repeat):
+        """Median microseconds per request."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for request in requests:
+                handler(request)
+            timings.append((time.perf_counter() - start) * 1e6 / len(requests))
+        return statistics.median(timings)
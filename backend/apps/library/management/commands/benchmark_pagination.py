@@ -0,0 +1,72 @@
+"""
+Compare page-number and cursor pagination latency at increasing depth.
+
+Runs against the current database through the Django test client with the
+response cache disabled, e.g.:
+    python manage.py benchmark_pagination --endpoint books --depths 1,10,100,1000
+Page-number latency grows with the page (OFFSET scan + COUNT); cursor pages
+should stay flat.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from apps.library import caching
+
+
+class Command(BaseCommand):
+    help = 'Benchmark page-number vs ?count=false vs cursor pagination at several page depths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=['books', 'authors'], default='books')
+        parser.add_argument(
+            '--depths',
+            default='1,10,100,1000',
+            help='Comma-separated page numbers to measure (default: 1,10,100,1000).',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per measurement (default: 5).')
+
+    def handle(self, *args, **options):
+        caching.API_CACHE_ENABLED = False
+        caching.API_CONDITIONAL_GET_ENABLED = False
+        self.client = Client(HTTP_HOST='localhost')
+        url = f'/api/{options["endpoint"]}/'
+        depths = sorted(int(depth) for depth in options['depths'].split(','))
+        repeat = options['repeat']
+
+        cursor_urls = self.cursor_urls(url, depths)
+        self.stdout.write(f'{"page":>8} {"page-number ms":>15} {"count=false ms":>15} {"cursor ms":>10}')
+        for depth in depths:
+            if depth not in cursor_urls:
+                self.stdout.write(f'{depth:>8}  (beyond last page)')
+                continue
+            numbered = self.time_get(f'{url}?page={depth}', repeat)
+            uncounted = self.time_get(f'{url}?page={depth}&count=false', repeat)
+            cursor = self.time_get(cursor_urls[depth], repeat)
+            self.stdout.write(f'{depth:>8} {numbered:>15.2f} {uncounted:>15.2f} {cursor:>10.2f}')
+
+    def cursor_urls(self, url, depths):
+        """Follow the cursor chain once and remember the URL of each measured page."""
+        urls, next_url, page = {}, f'{url}?pagination=cursor', 1
+        while next_url and page <= depths[-1]:
+            if page in depths:
+                urls[page] = next_url
+            response = self.client.get(next_url)
+            if response.status_code != 200:
+                raise CommandError(f'{next_url} returned {response.status_code}')
+            next_url = response.json()['next']
+            page += 1
+        return urls
+
+    def time_get(self, url, repeat):
+        """Median latency in milliseconds."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = self.client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned {response.status_code}')
+        return statistics.median(timings)
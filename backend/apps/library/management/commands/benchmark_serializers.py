@@ -0,0 +1,71 @@
+"""
+Compare the ModelSerializer list path with the values() fast path.
+
+For each language, fetches --rows books and authors the way the list
+endpoints do, serializes and renders them with both paths, checks that the
+JSON is identical and prints the median time per 1,000 rows:
+    python manage.py benchmark_serializers --rows 1000 --repeat 5
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+
+from apps.library.models import Author, Book
+from apps.library.serializers import (
+    AuthorListSerializer, AuthorListValuesSerializer, BookListSerializer, BookListValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark list serialization: ModelSerializer vs values() rows (ms per 1,000 rows).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per run (default: 1000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement (default: 5).')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        # (name, serializer queryset, serializer, values queryset, values serializer), as the viewsets build them
+        books = Book.objects.select_related('author').order_by('pk')
+        cases = [
+            ('books', books, BookListSerializer, books, BookListValuesSerializer),
+            ('authors', Author.objects.annotate(annotated_books_count=Count('books')).order_by('pk'),
+             AuthorListSerializer, Author.objects.order_by('pk'), AuthorListValuesSerializer),
+        ]
+        self.stdout.write(
+            f'{"endpoint":<9} {"lang":<5} {"rows":>6} {"serializer ms":>14} {"values ms":>10} {"speedup":>8}'
+        )
+        for name, queryset, model_serializer, values_queryset, values_serializer in cases:
+            queryset, values_queryset = queryset[:rows], values_queryset[:rows]
+            for lang in settings.MODELTRANSLATION_LANGUAGES:
+                with translation.override(lang):
+                    slow_json, slow = self.measure(
+                        lambda: model_serializer(list(queryset.all()), many=True).data, repeat
+                    )
+                    fast_json, fast = self.measure(
+                        lambda: values_serializer().to_representation(list(values_serializer().select(values_queryset))),
+                        repeat,
+                    )
+                if slow_json != fast_json:
+                    raise CommandError(f'{name} ({lang}): values() output differs from {model_serializer.__name__}')
+                count = len(queryset)
+                per_thousand = 1000 / count if count else 0
+                self.stdout.write(
+                    f'{name:<9} {lang:<5} {count:>6} {slow * per_thousand:>14.2f} {fast * per_thousand:>10.2f} '
+                    f'{slow / fast if fast else 0:>7.1f}x'
+                )
+        self.stdout.write(self.style.SUCCESS('Outputs identical.'))
+
+    def measure(self, build, repeat):
+        """Rendered JSON and median milliseconds of fetching, serializing and rendering."""
+        renderer, timings = JSONRenderer(), []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            content = renderer.render(build())
+            timings.append((time.perf_counter() - start) * 1000)
+        return content, statistics.median(timings)
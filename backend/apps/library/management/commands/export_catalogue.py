@@ -0,0 +1,70 @@
+"""
+Dump the catalogue as NDJSON or CSV, streaming in constant memory.
+
+    python manage.py export_catalogue --format csv --lang hi --output books.csv
+    python manage.py export_catalogue --all-languages | gzip > books.ndjson.gz
+
+Same rows as GET /api/books/export/ (see services/export.py).
+"""
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.library.models import Book
+from apps.library.services import export
+
+
+class Command(BaseCommand):
+    help = 'Export all books as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=export.FORMATS, default='ndjson')
+        parser.add_argument(
+            '--lang',
+            choices=settings.MODELTRANSLATION_LANGUAGES,
+            default=settings.MODELTRANSLATION_DEFAULT_LANGUAGE,
+            help='Language of title, description and author name (default: %(default)s).',
+        )
+        parser.add_argument(
+            '--all-languages',
+            action='store_true',
+            help='Export title and description in every language side by side.',
+        )
+        parser.add_argument('--genre', choices=[choice[0] for choice in Book.GENRE_CHOICES])
+        parser.add_argument('--output', help='Output file (default: standard output).')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=export.CHUNK_SIZE,
+            help=f'Rows fetched from the database at a time (default: {export.CHUNK_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Book.objects.all()
+        if options['genre']:
+            queryset = queryset.filter(genre=options['genre'])
+        names, rows = export.export_rows(
+            queryset, lang=options['lang'], all_languages=options['all_languages'],
+            chunk_size=options['chunk_size'],
+        )
+        started = time.monotonic()
+        counted = self.count(rows)
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for block in export.render(options['format'], names, counted):
+                output.write(block)
+        finally:
+            if options['output']:
+                output.close()
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Exported {self.rows} books in {elapsed:.1f}s ({self.rows / elapsed if elapsed else 0:.0f} rows/s).'
+        ))
+
+    def count(self, rows):
+        self.rows = 0
+        for row in rows:
+            self.rows += 1
+            yield row
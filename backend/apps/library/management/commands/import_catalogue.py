@@ -0,0 +1,267 @@
+"""
+Import a catalogue feed (CSV or NDJSON) of any size.
+
+    python manage.py import_catalogue feed.csv
+    python manage.py import_catalogue feed.ndjson --chunk-size 5000
+    zcat feed.ndjson.gz | python manage.py import_catalogue - --format ndjson
+
+One record per row/line with the columns:
+    title, publication_date, pages, price, author_email   (required)
+    isbn, genre, description, is_available,
+    author_first_name, author_last_name                    (optional)
+    title_hi, title_ta, description_hi, description_ta     (optional)
+
+title and description are the English texts; title_en and description_en
+are accepted for them, so the output of export_catalogue --all-languages
+imports as it is. Translations given in the feed count as human-written:
+they are never replaced by machine ones.
+
+The file is read as a stream and processed in chunks, so memory stays
+constant: each chunk resolves its authors with one email__in query
+(creating unknown ones when their names are given) and upserts its books by
+ISBN with one bulk_create(update_conflicts) per batch. Save signals are not
+sent per row. Once all rows are loaded, one pass over the imported books
+queues their translations in batches and refreshes the search index and
+caches. books_count is then recomputed for the authors whose books were
+added or moved, and the statistics for the whole catalogue.
+"""
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.library import caching, events
+from apps.library.models import Author, Book
+from apps.library.services import statistics
+from apps.library.services.auto_translate import SOURCES_FIELD, SUPPORTED_TARGETS, source_texts
+from apps.library.services.counters import refresh_books_count
+from apps.library.services.translation_jobs import enqueue_translations_bulk
+
+BOOK_FIELDS = ['title', 'isbn', 'genre', 'publication_date', 'pages', 'price', 'description', 'is_available']
+TRANSLATED_FIELDS = ['title', 'description']
+TRANSLATION_COLUMNS = [f'{name}_{lang}' for name in TRANSLATED_FIELDS for lang in sorted(SUPPORTED_TARGETS)]
+BOOLEANS = {'true': True, 't': True, 'yes': True, 'y': True, '1': True,
+            'false': False, 'f': False, 'no': False, 'n': False, '0': False}
+MAX_REPORTED_ERRORS = 20
+
+
+def read_csv(stream):
+    for record in csv.DictReader(stream):
+        yield record
+
+
+def read_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = 'Import books (and their authors) from a CSV or NDJSON feed, upserting by ISBN.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Feed file, or - for standard input.')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ndjson'],
+            help='Feed format (default: from the file extension).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows validated and written per chunk (default: 2000).',
+        )
+        parser.add_argument(
+            '--no-translate',
+            action='store_true',
+            help='Do not queue Hindi/Tamil translations for the imported books.',
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('ndjson' if options['path'].endswith(('.ndjson', '.jsonl')) else 'csv')
+        reader = read_ndjson if fmt == 'ndjson' else read_csv
+        if options['path'] == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+        else:
+            try:
+                stream = open(options['path'], encoding='utf-8', newline='')
+            except OSError as e:
+                raise CommandError(e)
+
+        self.fields = {name: Book._meta.get_field(name) for name in BOOK_FIELDS}
+        self.totals = {'read': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'authors_created': 0}
+        # Authors whose books were added or moved: their books_count changes in finish()
+        self.author_ids = set()
+        self.errors_reported = 0
+        chunk_size = max(options['chunk_size'], 1)
+        started_at, started = timezone.now(), time.monotonic()
+
+        with stream:
+            records = enumerate(reader(stream), start=1)
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+                self.import_chunk(chunk)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{self.totals["read"]} rows, {self.totals["read"] / elapsed:.0f} rows/s '
+                    f'({self.totals["created"]} created, {self.totals["updated"]} updated, '
+                    f'{self.totals["skipped"]} skipped)'
+                )
+
+        load_seconds = time.monotonic() - started
+        queued = self.finish(started_at, chunk_size, translate=not options['no_translate'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.totals["read"] - self.totals["skipped"]} of {self.totals["read"]} rows '
+            f'in {load_seconds:.1f}s ({self.totals["read"] / load_seconds if load_seconds else 0:.0f} rows/s): '
+            f'{self.totals["created"]} books created, {self.totals["updated"]} updated, '
+            f'{self.totals["authors_created"]} authors created, {self.totals["skipped"]} rows skipped; '
+            f'{queued} translation jobs queued.'
+        ))
+
+    def import_chunk(self, chunk):
+        self.totals['read'] += len(chunk)
+        rows = []
+        for line, record in chunk:
+            try:
+                rows.append(self.parse(record))
+            except (ValidationError, ValueError, TypeError, AttributeError) as e:
+                self.skip(line, e)
+
+        authors = self.resolve_authors(rows)
+        books = {}
+        for book, translations, author_email, _names in rows:
+            author = authors.get(author_email)
+            if author is None:
+                self.skip(None, f'unknown author {author_email!r} (give author_first_name/author_last_name)')
+                continue
+            book.author = author
+            # A later row with the same ISBN wins; upserts cannot touch a row twice.
+            books[book.isbn or id(book)] = (book, translations)
+
+        isbns = [book.isbn for book, _translations in books.values() if book.isbn]
+        with transaction.atomic():
+            existing = {
+                isbn: (author_id, sources)
+                for isbn, author_id, sources in Book.objects.filter(isbn__in=isbns).values_list(
+                    'isbn', 'author_id', SOURCES_FIELD,
+                )
+            }
+            self.totals['updated'] += len(existing)
+            self.totals['created'] += len(books) - len(existing)
+
+            # Rows only overwrite the hi/ta columns they actually carry. Those
+            # become human-written: their machine-translation fingerprints are
+            # dropped, so the translation worker leaves them alone.
+            groups = {}
+            for book, translations in books.values():
+                previous_author_id, sources = existing.get(book.isbn, (None, None))
+                self.author_ids.update(pk for pk in (book.author_id, previous_author_id) if pk)
+                setattr(book, SOURCES_FIELD, {
+                    attr: value for attr, value in (sources or {}).items() if attr not in translations
+                })
+                columns = tuple(sorted(translations))
+                groups.setdefault(columns + (SOURCES_FIELD,) if columns else (), []).append(book)
+            for columns, group in groups.items():
+                Book.objects.bulk_create(
+                    group,
+                    update_conflicts=True,
+                    unique_fields=['isbn'],
+                    update_fields=[
+                        'title', 'title_en', 'author', 'genre', 'publication_date', 'pages', 'price',
+                        'description', 'description_en', 'is_available', 'updated_at', *columns,
+                    ],
+                )
+
+    def parse(self, record):
+        """Return (unsaved Book, {translation column: value}, author email, author names) or raise."""
+        record = {key: (value.strip() if isinstance(value, str) else value) for key, value in record.items()}
+        record = {key: value for key, value in record.items() if value not in ('', None)}
+        for name in TRANSLATED_FIELDS:
+            if f'{name}_en' in record:
+                record.setdefault(name, record.pop(f'{name}_en'))
+        if isinstance(record.get('is_available'), str):
+            record['is_available'] = BOOLEANS.get(record['is_available'].lower(), record['is_available'])
+        values = {}
+        for name, field in self.fields.items():
+            if name not in record and field.has_default():
+                continue
+            values[name] = field.clean(record.get(name), None)
+        translations = {column: record[column] for column in TRANSLATION_COLUMNS if column in record}
+        email = record.get('author_email')
+        if not email:
+            raise ValueError('author_email is required')
+        book = Book(
+            title_en=values.pop('title'),
+            description_en=values.pop('description', None),
+            **values,
+            **translations,
+        )
+        return book, translations, email, (record.get('author_first_name'), record.get('author_last_name'))
+
+    def resolve_authors(self, rows):
+        """{email: Author} for the chunk, creating authors that are new and named."""
+        emails = {email for _book, _translations, email, _names in rows}
+        authors = {author.email: author for author in Author.objects.filter(email__in=emails)}
+        new = {}
+        for _book, _translations, email, (first_name, last_name) in rows:
+            if email not in authors and email not in new and first_name and last_name:
+                new[email] = Author(first_name_en=first_name, last_name_en=last_name, email=email)
+        if new:
+            with transaction.atomic():
+                Author.objects.bulk_create(new.values())
+                events.rows_created.send(sender=Author, objs=list(new.values()))
+            authors.update(new)
+            self.totals['authors_created'] += len(new)
+        return authors
+
+    def skip(self, line, error):
+        self.totals['skipped'] += 1
+        if self.errors_reported < MAX_REPORTED_ERRORS:
+            messages = error.messages if isinstance(error, ValidationError) else [str(error)]
+            where = f'line {line}: ' if line else ''
+            self.stderr.write(f'Skipped {where}{"; ".join(messages)}')
+            self.errors_reported += 1
+            if self.errors_reported == MAX_REPORTED_ERRORS:
+                self.stderr.write('Further skipped rows are only counted.')
+
+    def finish(self, started_at, chunk_size, translate):
+        """Post-import pass over the books written since started_at, in primary-key chunks."""
+        imported = (
+            Book.objects.filter(updated_at__gte=started_at)
+            .only(
+                'pk', SOURCES_FIELD,
+                *(f'{name}_{lang}' for name in TRANSLATED_FIELDS for lang in ['en', *SUPPORTED_TARGETS]),
+            )
+            .order_by('pk')
+        )
+        queued, last_pk = 0, 0
+        while True:
+            chunk = list(imported.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            # Caches and search index of these rows (see signals.py)
+            events.rows_updated.send(sender=Book, pks=[book.pk for book in chunk])
+            if translate:
+                queued += enqueue_translations_bulk([
+                    (book, [(name, value) for name, value in source_texts(book) if value]) for book in chunk
+                ])
+            last_pk = chunk[-1].pk
+        # Only the authors whose books were added or moved, in chunks of primary keys
+        author_ids = sorted(self.author_ids)
+        for start in range(0, len(author_ids), chunk_size):
+            refresh_books_count(author_ids[start:start + chunk_size])
+        # The recount is a plain UPDATE: bump the cached author responses whose books_count moved
+        caching.invalidate(Author, author_ids)
+        statistics.reconcile()
+        return queued
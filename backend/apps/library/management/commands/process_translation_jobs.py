@@ -0,0 +1,63 @@
+"""
+Worker that drains the TranslationJob queue filled by the save signals.
+
+Run one or more of these next to the web server:
+    python manage.py process_translation_jobs
+Use --once to process everything currently due and exit (e.g. from cron).
+"""
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.library.services import translation_memory
+from apps.library.services.translation_jobs import process_jobs, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Process queued Hindi/Tamil auto-translation jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when no jobs are due instead of polling.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Number of jobs claimed per round (default: 50).',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty (default: 2).',
+        )
+
+    def handle(self, *args, **options):
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        total_ok, total_failed = 0, 0
+        self.stdout.write(f'Translation worker {worker_id} started.')
+        try:
+            while True:
+                requeue_stale_jobs()
+                succeeded, failed = process_jobs(options['batch_size'], worker_id=worker_id)
+                total_ok += succeeded
+                total_failed += failed
+                if succeeded or failed:
+                    self.stdout.write(f'Processed {succeeded} job(s), {failed} failed.')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        memory = translation_memory.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. Succeeded: {total_ok}, Failed: {total_failed}. '
+            f'Translation memory hits: {memory["lru_hits"] + memory["db_hits"]}, misses: {memory["misses"]}'
+        ))
@@ -0,0 +1,21 @@
+"""
+Evict old translation memory entries.
+
+Removes rows older than TRANSLATION_MEMORY_TTL and keeps at most
+TRANSLATION_MEMORY_MAX_ENTRIES of the newest rows. Safe to run from cron:
+    python manage.py prune_translation_memory
+"""
+from django.core.management.base import BaseCommand
+
+from apps.library.models import TranslationMemory
+from apps.library.services import translation_memory
+
+
+class Command(BaseCommand):
+    help = 'Delete expired and excess translation memory entries.'
+
+    def handle(self, *args, **options):
+        deleted = translation_memory.prune()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} entries, {TranslationMemory.objects.count()} remaining.'
+        ))
@@ -0,0 +1,27 @@
+"""
+Render every book into the read model (BookDocument, one row per book and
+language), see services/read_model.py.
+
+Signals keep the documents current while LIBRARY_READ_MODEL is on; run this
+after turning it on, or after writes that bypass the signals:
+python manage.py rebuild_read_model
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.library.services import read_model
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the pre-rendered book documents of the read model.'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        books = read_model.rebuild(
+            progress=lambda done: self.stdout.write(f'  {done} books rendered') if options['verbosity'] > 1 else None
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Read model rebuilt: {books} books in {len(read_model.languages())} languages '
+            f'in {time.monotonic() - started:.1f} s.'
+        ))
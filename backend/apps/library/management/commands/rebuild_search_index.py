@@ -0,0 +1,32 @@
+"""
+Rebuild the full-text search index from the authors and books tables.
+
+Signals keep the index current on every save/delete; run this after raw SQL
+or queryset.update() writes that bypass them, or after switching
+LIBRARY_SEARCH_BACKEND back from 'basic': python manage.py rebuild_search_index
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from apps.library import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index for Authors and Books.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database whose index to rebuild (default: "default").',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        backend = search.backend_for_vendor(connections[using].vendor)
+        with transaction.atomic(using=using):
+            counts = {label: backend.rebuild(label, using=using) for label in ('library.author', 'library.book')}
+        self.stdout.write(self.style.SUCCESS(
+            f'Search index ({backend.name}) rebuilt: {counts["library.author"]} authors, '
+            f'{counts["library.book"]} books.'
+        ))
@@ -0,0 +1,23 @@
+"""
+Recompute materialized counters from the authors and books tables.
+
+Signals keep the counters current on every save/delete; run this
+periodically (e.g. nightly from cron) and after bulk imports to repair any
+drift: python manage.py reconcile_statistics
+"""
+from django.core.management.base import BaseCommand
+
+from apps.library.services import statistics
+from apps.library.services.counters import refresh_books_count
+
+
+class Command(BaseCommand):
+    help = 'Recompute library statistics and Author.cached_books_count.'
+
+    def handle(self, *args, **options):
+        values = statistics.reconcile()
+        authors = refresh_books_count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Statistics reconciled ({values[statistics.TOTAL_BOOKS]} books, '
+            f'{values[statistics.TOTAL_AUTHORS]} authors); books_count refreshed for {authors} authors.'
+        ))
@@ -0,0 +1,54 @@
+"""
+Copy the SQLite primary database into the replica files of
+DATABASE_REPLICAS, to run the primary/replica routing (config/routers.py)
+locally without a replicating server:
+
+    DATABASE_REPLICAS=replica1.sqlite3,replica2.sqlite3 python manage.py sync_sqlite_replicas
+    DATABASE_REPLICAS=... python manage.py sync_sqlite_replicas --interval 5   # every 5 s, like replication lag
+
+Each copy is a consistent snapshot taken with SQLite's online backup API,
+so the primary keeps serving reads and writes meanwhile.
+"""
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite primary database into the SQLite replica files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Copy again every this many seconds until interrupted (default: copy once).',
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        replicas = [connections[alias] for alias in settings.DATABASE_REPLICA_ALIASES]
+        if primary.vendor != 'sqlite' or any(replica.vendor != 'sqlite' for replica in replicas):
+            raise CommandError('The primary and the replicas must be SQLite databases.')
+        if not replicas:
+            raise CommandError('No replicas: set DATABASE_REPLICAS to a comma-separated list of files.')
+
+        while True:
+            started = time.monotonic()
+            primary.ensure_connection()
+            for replica in replicas:
+                target = sqlite3.connect(replica.settings_dict['NAME'])
+                try:
+                    primary.connection.backup(target)
+                finally:
+                    target.close()
+            self.stdout.write(self.style.SUCCESS(
+                f'Copied {primary.settings_dict["NAME"]} to {len(replicas)} replicas '
+                f'in {(time.monotonic() - started) * 1000:.0f} ms.'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
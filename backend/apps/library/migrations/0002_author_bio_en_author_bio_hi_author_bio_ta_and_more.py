@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+def copy_to_en(apps, schema_editor):
+    """Copy existing values into *_en so no English data is lost."""
+    Author = apps.get_model('library', 'Author')
+    Book = apps.get_model('library', 'Book')
+    for author in Author.objects.all():
+        changed = []
+        for name in ('first_name', 'last_name', 'bio'):
+            if not getattr(author, f'{name}_en') and getattr(author, name):
+                setattr(author, f'{name}_en', getattr(author, name))
+                changed.append(f'{name}_en')
+        if changed:
+            author.save(update_fields=changed)
+    for book in Book.objects.all():
+        changed = []
+        for name in ('title', 'description'):
+            if not getattr(book, f'{name}_en') and getattr(book, name):
+                setattr(book, f'{name}_en', getattr(book, name))
+                changed.append(f'{name}_en')
+        if changed:
+            book.save(update_fields=changed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='bio_en',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='bio_hi',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='bio_ta',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='first_name_en',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='first_name_hi',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='first_name_ta',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='last_name_en',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='last_name_hi',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='last_name_ta',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='description_en',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='description_hi',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='description_ta',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_en',
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_hi',
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_ta',
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.RunPython(copy_to_en, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_cached_books_count(apps, schema_editor):
+    Author = apps.get_model('library', 'Author')
+    Book = apps.get_model('library', 'Book')
+    counts = (
+        Book.objects.filter(author=OuterRef('pk')).order_by()
+        .values('author').annotate(n=Count('pk')).values('n')
+    )
+    Author.objects.update(cached_books_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_translationmemory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='cached_books_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_cached_books_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_author_cached_books_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibraryStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('value', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Library statistic',
+                'verbose_name_plural': 'Library statistics',
+                'ordering': ['key'],
+            },
+        ),
+    ]
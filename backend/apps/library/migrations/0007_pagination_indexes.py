@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0006_librarystatistic'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['last_name_en', 'first_name_en', 'id'], name='author_name_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-created_at', '-id'], name='book_created_cursor_idx'),
+        ),
+    ]
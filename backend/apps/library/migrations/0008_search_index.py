@@ -0,0 +1,92 @@
+import sqlite3
+
+from django.db import migrations
+
+# The index as this migration creates it. Index tables are not Django models,
+# so their layout is frozen here; apps/library/search.py maintains them.
+LANGUAGES = ('en', 'hi', 'ta')
+
+
+def _translated(alias, name):
+    return [f'{alias}.{name}_{lang}' for lang in LANGUAGES]
+
+
+INDEXES = [
+    {
+        'table': 'library_book_search',
+        'source': 'library_book b JOIN library_author a ON a.id = b.author_id',
+        'pk': 'b.id',
+        'columns': [
+            ('title', _translated('b', 'title'), 'A'),
+            ('isbn', ['b.isbn'], 'A'),
+            ('author', _translated('a', 'first_name') + _translated('a', 'last_name'), 'B'),
+            ('description', _translated('b', 'description'), 'C'),
+        ],
+    },
+    {
+        'table': 'library_author_search',
+        'source': 'library_author a',
+        'pk': 'a.id',
+        'columns': [
+            ('name', _translated('a', 'first_name') + _translated('a', 'last_name'), 'A'),
+            ('email', ['a.email'], 'A'),
+            ('bio', _translated('a', 'bio'), 'C'),
+        ],
+    },
+]
+
+
+def sqlite_statements(index):
+    tokenize = 'trigram' if sqlite3.sqlite_version_info >= (3, 34, 0) else 'unicode61 remove_diacritics 2'
+    names = ', '.join(name for name, _sources, _weight in index['columns'])
+    values = ', '.join(
+        " || ' ' || ".join(f"COALESCE({source}, '')" for source in sources)
+        for _name, sources, _weight in index['columns']
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index['table']} USING fts5({names}, tokenize='{tokenize}')",
+        f"INSERT INTO {index['table']} (rowid, {names}) SELECT {index['pk']}, {values} FROM {index['source']}",
+    ]
+
+
+def postgresql_statements(index):
+    document = ' || '.join(
+        f"setweight(to_tsvector('simple', concat_ws(' ', {', '.join(sources)})), '{weight}')"
+        for _name, sources, weight in index['columns']
+    )
+    return [
+        f"CREATE TABLE IF NOT EXISTS {index['table']} (id bigint PRIMARY KEY, document tsvector NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS {index['table']}_document_idx ON {index['table']} USING GIN (document)",
+        f"INSERT INTO {index['table']} (id, document) SELECT {index['pk']}, {document} FROM {index['source']}",
+    ]
+
+
+STATEMENTS = {'sqlite': sqlite_statements, 'postgresql': postgresql_statements}
+
+
+def create_search_index(apps, schema_editor):
+    # Other databases search with icontains and have no index
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for index in INDEXES:
+        for sql in statements(index):
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor not in STATEMENTS:
+        return
+    for index in INDEXES:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {index['table']}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0007_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
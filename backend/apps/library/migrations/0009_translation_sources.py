@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='translation_sources',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='translation_sources',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
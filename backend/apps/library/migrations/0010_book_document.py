@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0009_translation_sources'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=10)),
+                ('list_json', models.TextField()),
+                ('detail_json', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('book', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='library.book')),
+            ],
+            options={
+                'verbose_name': 'Book document',
+                'verbose_name_plural': 'Book documents',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bookdocument',
+            constraint=models.UniqueConstraint(fields=('book', 'language'), name='unique_book_document'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0010_book_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheStamp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('namespace', models.CharField(max_length=100, unique=True)),
+                ('value', models.BigIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Cache stamp',
+                'verbose_name_plural': 'Cache stamps',
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:09
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0011_cache_stamp'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='author',
+            name='author_name_cursor_idx',
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('last_name_en', models.Value('')), django.db.models.functions.comparison.Coalesce('first_name_en', models.Value('')), models.F('id'), name='author_name_cursor_idx'),
+        ),
+    ]
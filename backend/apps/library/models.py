@@ -1,20 +1,63 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.core.validators import EmailValidator, MinValueValidator
+from django.utils import timezone
 
+from .localization import LocalizedQuerySet
 
-class Author(models.Model):
+
+class LoadedValuesMixin:
+    """Keep the values a row was loaded with in _loaded_values, so signals can tell what a save changed."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save receivers have seen the old values; the saved ones are current now.
+        self._loaded_values = {
+            f.attname: self.__dict__[f.attname]
+            for f in self._meta.concrete_fields if f.attname in self.__dict__
+        }
+
+
+# Language-independent sort key of authors (cursor pagination, admin): the English
+# names, '' where they are NULL (modeltranslation makes every language column nullable).
+AUTHOR_NAME_KEY = {
+    'name_key_last': Coalesce('last_name_en', Value('')),
+    'name_key_first': Coalesce('first_name_en', Value('')),
+}
+
+
+class Author(LoadedValuesMixin, models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     email = models.EmailField(unique=True, validators=[EmailValidator()])
     bio = models.TextField(blank=True, null=True)
     birth_date = models.DateField(blank=True, null=True)
+    # Denormalized number of books, kept up to date by signals (see books_count)
+    cached_books_count = models.PositiveIntegerField(default=0, editable=False)
+    # Fingerprint of the English text each machine translation (e.g. "bio_hi") was
+    # made from; see services/auto_translate.py. Columns without one are human-written.
+    translation_sources = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LocalizedQuerySet.as_manager()
+
     class Meta:
         ordering = ['last_name', 'first_name']
         verbose_name = 'Author'
         verbose_name_plural = 'Authors'
+        indexes = [
+            # Keyset (cursor) pagination order, see AuthorViewSet.cursor_ordering
+            models.Index(*AUTHOR_NAME_KEY.values(), F('id'), name='author_name_cursor_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -25,10 +68,16 @@ class Author(models.Model):
 
     @property
     def books_count(self):
+        # Prefer the value annotated by the queryset (Count('books')), then the
+        # denormalized column when enabled, and only then a COUNT query.
+        if hasattr(self, 'annotated_books_count'):
+            return self.annotated_books_count
+        if getattr(settings, 'LIBRARY_DENORMALIZED_BOOKS_COUNT', False):
+            return self.cached_books_count
         return self.books.count()
 
 
-class Book(models.Model):
+class Book(LoadedValuesMixin, models.Model):
     GENRE_CHOICES = [
         ('fiction', 'Fiction'),
         ('non_fiction', 'Non-Fiction'),
@@ -51,17 +100,160 @@ class Book(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     description = models.TextField(blank=True, null=True)
     is_available = models.BooleanField(default=True)
+    # Fingerprint of the English text each machine translation (e.g. "bio_hi") was
+    # made from; see services/auto_translate.py. Columns without one are human-written.
+    translation_sources = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LocalizedQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Book'
         verbose_name_plural = 'Books'
+        indexes = [
+            # Keyset (cursor) pagination order, see BookViewSet.cursor_ordering
+            models.Index(fields=['-created_at', '-id'], name='book_created_cursor_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author.full_name}"
 
     @property
     def author_name(self):
-        return self.author.full_name if self.author else "Unknown Author"
\ No newline at end of file
+        return self.author.full_name if self.author else "Unknown Author"
+
+
+class TranslationJob(models.Model):
+    """
+    One pending auto-translation of a single field into a single language.
+
+    Enqueued by the post_save signals and drained by the
+    ``process_translation_jobs`` worker, so saves never wait on the translator.
+    There is at most one job per (model, object, field, language).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    model_label = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=50)
+    language = models.CharField(max_length=10)
+    source_text = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    locked_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['available_at', 'id']
+        verbose_name = 'Translation job'
+        verbose_name_plural = 'Translation jobs'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_label', 'object_id', 'field', 'language'],
+                name='unique_translation_job',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='translation_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label}#{self.object_id}.{self.field}_{self.language} ({self.status})"
+
+
+class TranslationMemory(models.Model):
+    """
+    Previously produced machine translation, looked up before calling the
+    translator backend. ``key`` is the sha256 of (source_lang, target_lang,
+    source_text); see services/translation_memory.py.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    source_lang = models.CharField(max_length=10)
+    target_lang = models.CharField(max_length=10)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Translation memory entry'
+        verbose_name_plural = 'Translation memory'
+
+    def __str__(self):
+        return f"{self.source_lang}->{self.target_lang}: {self.source_text[:50]}"
+
+
+class LibraryStatistic(models.Model):
+    """
+    One materialized counter of the statistics endpoint, e.g. 'total_books'
+    or 'genre:fiction'. Adjusted incrementally by signals and recomputed by
+    the reconcile_statistics command; see services/statistics.py.
+    """
+    key = models.CharField(max_length=50, unique=True)
+    value = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['key']
+        verbose_name = 'Library statistic'
+        verbose_name_plural = 'Library statistics'
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+
+class BookDocument(models.Model):
+    """
+    Read model: a book rendered in one language, as BookListSerializer
+    (list_json) and BookSerializer (detail_json) return it. Maintained by
+    signals when LIBRARY_READ_MODEL is on; see services/read_model.py.
+    """
+    # No database constraint: bulk deletes of books remove documents through signals
+    book = models.ForeignKey(Book, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    language = models.CharField(max_length=10)
+    list_json = models.TextField()
+    detail_json = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Book document'
+        verbose_name_plural = 'Book documents'
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'language'], name='unique_book_document'),
+        ]
+
+    def __str__(self):
+        return f"Book #{self.book_id} ({self.language})"
+
+
+class CacheStamp(models.Model):
+    """
+    Version stamp of an API cache namespace, e.g. 'book' or 'author:3': the
+    time.time_ns() of its last change. Kept in the database rather than the
+    cache so every process (web workers, the translation worker, management
+    commands) sees the same stamps; see caching.py.
+    """
+    namespace = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField()
+
+    class Meta:
+        verbose_name = 'Cache stamp'
+        verbose_name_plural = 'Cache stamps'
+
+    def __str__(self):
+        return f"{self.namespace}: {self.value}"
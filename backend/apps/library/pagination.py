@@ -0,0 +1,90 @@
+"""
+Pagination for the library API.
+
+LibraryPagination is the default page-number pagination with two opt-ins:
+
+- ?count=false   skip the COUNT(*) query; the response has no "count" and
+                 "next" is known by fetching one extra row.
+- ?pagination=cursor (then follow "next"/"previous", which carry ?cursor=)
+                 keyset pagination over the view's ``cursor_ordering``, so
+                 deep pages cost the same as the first one.
+"""
+from django.core.paginator import InvalidPage
+from django.template import loader
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class LibraryPagination(PageNumberPagination):
+    count_query_param = 'count'
+    mode_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor_paginator = None
+        self.counted = True
+        if self.use_cursor(request, view):
+            self.cursor_paginator = CursorPagination()
+            self.cursor_paginator.ordering = view.cursor_ordering
+            self.cursor_paginator.page_size = self.get_page_size(request)
+            page = self.cursor_paginator.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor_paginator.display_page_controls
+            return page
+        if request.query_params.get(self.count_query_param, '').lower() in ('false', '0'):
+            self.counted = False
+            return self.paginate_without_count(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def use_cursor(self, request, view):
+        if not getattr(view, 'cursor_ordering', None):
+            return False
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or CursorPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise InvalidPage
+        except (TypeError, ValueError, InvalidPage):
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param), message='Invalid page.'
+            ))
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.display_page_controls = self.has_next or self.page_number > 1
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        if self.counted:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_uncounted_link(self.page_number + 1) if self.has_next else None,
+            'previous': self.get_uncounted_link(self.page_number - 1) if self.page_number > 1 else None,
+            'results': data,
+        })
+
+    def get_uncounted_link(self, page_number):
+        url = self.request.build_absolute_uri()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        if not self.counted:
+            template = loader.get_template(CursorPagination.template)
+            return template.render({
+                'previous_url': self.get_uncounted_link(self.page_number - 1) if self.page_number > 1 else None,
+                'next_url': self.get_uncounted_link(self.page_number + 1) if self.has_next else None,
+            })
+        return super().to_html()
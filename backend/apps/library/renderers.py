@@ -0,0 +1,59 @@
+"""
+JSON renderer that splices already-rendered JSON into a response.
+
+Response data may contain RawJSON values, e.g. the pre-rendered book
+documents of the read model (services/read_model.py). They are written out
+as they are instead of being decoded and encoded again, so a page of
+documents costs one join of strings.
+"""
+import re
+import secrets
+from functools import partial
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class RawJSON:
+    """A JSON text to insert as is. It must come from JSONRenderer, so it is escaped alike."""
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __reduce__(self):
+        # Response data is pickled into the response cache
+        return RawJSON, (self.text,)
+
+
+class RawJSONEncoder(JSONEncoder):
+    """Encode RawJSON as a marker string; LibraryJSONRenderer replaces the markers."""
+
+    def __init__(self, *args, fragments, marker, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fragments = fragments
+        self.marker = marker
+
+    def default(self, obj):
+        if isinstance(obj, RawJSON):
+            self.fragments.append(obj.text)
+            return f'{self.marker}:{len(self.fragments) - 1}'
+        return super().default(obj)
+
+
+class LibraryJSONRenderer(JSONRenderer):
+    """JSONRenderer that also renders RawJSON values (see module docstring)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, RawJSON):
+            return data.text.encode()
+        fragments = []
+        # Random per response, so no string in the data can pass for a marker
+        marker = secrets.token_hex(8)
+        self.encoder_class = partial(RawJSONEncoder, fragments=fragments, marker=marker)
+        rendered = super().render(data, accepted_media_type, renderer_context)
+        if not fragments:
+            return rendered
+        return re.sub(
+            rb'"%s:(\d+)"' % marker.encode(), lambda match: fragments[int(match.group(1))].encode(), rendered
+        )
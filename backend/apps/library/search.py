@@ -0,0 +1,227 @@
+"""
+Full-text search index over every language of the translated fields.
+
+modeltranslation rewrites ``title__icontains`` to the active-language column
+only, so the old filters could not find a Hindi title from an English
+request and always scanned the whole table. The index instead stores one
+document per row with the en/hi/ta values of each translated field (plus
+isbn, email and, for books, the author's names):
+
+- SQLite: an FTS5 virtual table per model (trigram tokenizer where
+  available, so matching stays substring-based like icontains), ranked
+  with bm25().
+- PostgreSQL: a table with a weighted tsvector column and a GIN index,
+  ranked with ts_rank().
+- Anything else, or LIBRARY_SEARCH_BACKEND = 'basic': the previous
+  icontains filters.
+
+The index covers more than the icontains filters did: ?search= also finds
+books by their description and authors by their bio, in every language.
+
+Documents are built in SQL (INSERT ... SELECT), so indexing one row, all
+books of an author, or the whole table is a single statement. Signals keep
+the index current; `python manage.py rebuild_search_index` rebuilds it. The
+index tables are created by migration 0008_search_index, which keeps its
+own copy of their layout.
+"""
+import sqlite3
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+LIBRARY_SEARCH_BACKEND = getattr(settings, 'LIBRARY_SEARCH_BACKEND', 'auto')
+
+FTS_TRIGRAM = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def _translated(alias, name):
+    return [f'{alias}.{name}_{lang}' for lang in settings.MODELTRANSLATION_LANGUAGES]
+
+
+def _index_specs():
+    """
+    Per model: index table, source FROM clause, pk expression and the
+    document columns as (name, [source expressions], weight).
+    """
+    return {
+        'library.book': {
+            'table': 'library_book_search',
+            'source': 'library_book b JOIN library_author a ON a.id = b.author_id',
+            'pk': 'b.id',
+            'filter_column': {'pk': 'b.id', 'author': 'b.author_id'},
+            'columns': [
+                ('title', _translated('b', 'title'), 'A'),
+                ('isbn', ['b.isbn'], 'A'),
+                ('author', _translated('a', 'first_name') + _translated('a', 'last_name'), 'B'),
+                ('description', _translated('b', 'description'), 'C'),
+            ],
+        },
+        'library.author': {
+            'table': 'library_author_search',
+            'source': 'library_author a',
+            'pk': 'a.id',
+            'filter_column': {'pk': 'a.id'},
+            'columns': [
+                ('name', _translated('a', 'first_name') + _translated('a', 'last_name'), 'A'),
+                ('email', ['a.email'], 'A'),
+                ('bio', _translated('a', 'bio'), 'C'),
+            ],
+        },
+    }
+
+
+def _label(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+class BasicSearchBackend:
+    """icontains over the active-language columns (no index)."""
+    name = 'basic'
+
+    lookups = {
+        'library.book': ['title', 'author__first_name', 'author__last_name', 'isbn'],
+        'library.author': ['first_name', 'last_name', 'email'],
+    }
+
+    def search(self, queryset, value):
+        return queryset.filter(reduce(or_, [
+            Q(**{f'{field}__icontains': value}) for field in self.lookups[_label(queryset.model)]
+        ]))
+
+    def reindex(self, model, pks=None, author_ids=None, using=DEFAULT_DB_ALIAS):
+        pass
+
+    def remove(self, model, pks, using=DEFAULT_DB_ALIAS):
+        pass
+
+    def rebuild(self, model, using=DEFAULT_DB_ALIAS):
+        return 0
+
+
+class SQLBackendMixin:
+    """Index maintenance shared by the SQL backends."""
+
+    def _where(self, spec, pks, author_ids):
+        if pks is not None:
+            return f'{spec["filter_column"]["pk"]} IN ({", ".join(["%s"] * len(pks))})', list(pks)
+        if author_ids is not None:
+            return f'{spec["filter_column"]["author"]} IN ({", ".join(["%s"] * len(author_ids))})', list(author_ids)
+        return '1 = 1', []
+
+    def reindex(self, model, pks=None, author_ids=None, using=DEFAULT_DB_ALIAS):
+        """Rebuild the documents of the given rows (or of all books of author_ids)."""
+        if (pks is not None and not pks) or (author_ids is not None and not author_ids):
+            return
+        spec = _index_specs()[_label(model)]
+        where, params = self._where(spec, pks, author_ids)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {spec["table"]} WHERE {self.rowid} IN '
+                f'(SELECT {spec["pk"]} FROM {spec["source"]} WHERE {where})',
+                params,
+            )
+            cursor.execute(self.insert_sql(spec, where), params)
+
+    def remove(self, model, pks, using=DEFAULT_DB_ALIAS):
+        if not pks:
+            return
+        spec = _index_specs()[_label(model)]
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {spec["table"]} WHERE {self.rowid} IN ({", ".join(["%s"] * len(pks))})',
+                list(pks),
+            )
+
+    def rebuild(self, model, using=DEFAULT_DB_ALIAS):
+        spec = _index_specs()[_label(model)]
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {spec["table"]}')
+            cursor.execute(self.insert_sql(spec, '1 = 1'), [])
+            return cursor.rowcount
+
+
+class SQLiteFTSBackend(SQLBackendMixin, BasicSearchBackend):
+    """SQLite FTS5 virtual tables, one column per document field."""
+    name = 'sqlite_fts5'
+    rowid = 'rowid'
+    weights = {'A': 10.0, 'B': 5.0, 'C': 1.0}
+
+    def insert_sql(self, spec, where):
+        names = ', '.join(name for name, _sources, _weight in spec['columns'])
+        values = ', '.join(
+            " || ' ' || ".join(f"COALESCE({source}, '')" for source in sources)
+            for _name, sources, _weight in spec['columns']
+        )
+        return f'INSERT INTO {spec["table"]} (rowid, {names}) SELECT {spec["pk"]}, {values} FROM {spec["source"]} WHERE {where}'
+
+    def search(self, queryset, value):
+        if FTS_TRIGRAM and len(value) < 3:
+            # Trigram indexes cannot match fewer than three characters.
+            return super().search(queryset, value)
+        spec = _index_specs()[_label(queryset.model)]
+        table = spec['table']
+        query = '"%s"' % value.replace('"', '""')
+        weights = ', '.join(str(self.weights[weight]) for _name, _sources, weight in spec['columns'])
+        pk_column = f'{queryset.model._meta.db_table}.id'
+        # bm25() only exists inside a MATCH query, so the ranks of all matches are
+        # computed by one; LIMIT keeps SQLite from pushing "rowid = <pk>" into it,
+        # which would run the MATCH again for every row.
+        ranks = (
+            f'SELECT rowid AS id, bm25({table}, {weights}) AS score FROM {table} WHERE {table} MATCH %s LIMIT -1'
+        )
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [query])
+        ).annotate(
+            search_rank=RawSQL(f'SELECT ranks.score FROM ({ranks}) ranks WHERE ranks.id = {pk_column}', [query])
+        ).order_by('search_rank', 'pk')
+
+
+class PostgresSearchBackend(SQLBackendMixin, BasicSearchBackend):
+    """Weighted tsvector documents with a GIN index."""
+    name = 'postgres_tsvector'
+    rowid = 'id'
+    config = 'simple'  # no stemming: the documents mix English, Hindi and Tamil
+
+    def insert_sql(self, spec, where):
+        document = ' || '.join(
+            f"setweight(to_tsvector('{self.config}', concat_ws(' ', {', '.join(sources)})), '{weight}')"
+            for _name, sources, weight in spec['columns']
+        )
+        return f'INSERT INTO {spec["table"]} (id, document) SELECT {spec["pk"]}, {document} FROM {spec["source"]} WHERE {where}'
+
+    def search(self, queryset, value):
+        spec = _index_specs()[_label(queryset.model)]
+        table = spec['table']
+        pk_column = f'{queryset.model._meta.db_table}.id'
+        tsquery = f"websearch_to_tsquery('{self.config}', %s)"
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT id FROM {table} WHERE document @@ {tsquery}', [value])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT ts_rank(document, {tsquery}) FROM {table} WHERE id = {pk_column}', [value]
+            )
+        ).order_by('-search_rank', 'pk')
+
+
+def backend_for_vendor(vendor):
+    if vendor == 'sqlite':
+        return SQLiteFTSBackend()
+    if vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return BasicSearchBackend()
+
+
+def get_backend():
+    """The search backend for the default database."""
+    if LIBRARY_SEARCH_BACKEND == 'basic':
+        return BasicSearchBackend()
+    return backend_for_vendor(connection.vendor)
+
+
+def search(queryset, value):
+    """Filter queryset to rows matching value, best match first."""
+    return get_backend().search(queryset, value)
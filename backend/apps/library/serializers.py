@@ -1,10 +1,52 @@
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import translation
 from rest_framework import serializers
-from .models import Author, Book
 
+from .localization import localized
+from .services.counters import books_count_subquery
+from .models import Author, Book, TranslationJob
+
+
+class SparseFieldsetMixin:
+    """
+    Output fields chosen by the request (see views.FieldsetMixin), for a
+    top-level serializer: context['expand'] adds the named expandable_fields
+    and context['fields'] keeps only the named fields (an expandable field
+    named there is expanded).
+    """
+    # {field name: function returning the serializer field}
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if parent is not None and not (isinstance(parent, serializers.ListSerializer) and parent.parent is None):
+            return fields
+        selected = self.context.get('fields')
+        for name in {*self.context.get('expand', ()), *(selected or ())}:
+            if name in self.expandable_fields and name not in fields:
+                fields[name] = self.expandable_fields[name]()
+        if selected is not None:
+            for name in [name for name in fields if name not in selected]:
+                del fields[name]
+        return fields
+
+
+class AuthorBookSerializer(serializers.ModelSerializer):
+    """Book summary for ?expand=books"""
 
-class AuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Book
+        fields = ['id', 'title']
+
+
+class AuthorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     books_count = serializers.ReadOnlyField()
+    expandable_fields = {'books': lambda: AuthorBookSerializer(many=True, read_only=True)}
 
     class Meta:
         model = Author
@@ -17,17 +59,18 @@ class AuthorSerializer(serializers.ModelSerializer):
 
     
 
-class AuthorListSerializer(serializers.ModelSerializer):
+class AuthorListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Simplified serializer for list views"""
     full_name = serializers.ReadOnlyField()
     books_count = serializers.ReadOnlyField()
+    expandable_fields = {'books': lambda: AuthorBookSerializer(many=True, read_only=True)}
 
     class Meta:
         model = Author
         fields = ['id', 'full_name', 'email', 'books_count']
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author_name = serializers.ReadOnlyField()
     author_details = AuthorListSerializer(source='author', read_only=True)
 
@@ -53,9 +96,10 @@ class BookSerializer(serializers.ModelSerializer):
         return value
 
 
-class BookListSerializer(serializers.ModelSerializer):
+class BookListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Simplified serializer for list views"""
     author_name = serializers.ReadOnlyField()
+    expandable_fields = {'author_details': lambda: AuthorListSerializer(source='author', read_only=True)}
 
     class Meta:
         model = Book
@@ -65,6 +109,120 @@ class BookListSerializer(serializers.ModelSerializer):
         ]
 
 
+class ValuesSerializer:
+    """
+    Read-only list serializer over .values() rows instead of model instances.
+
+    Each output key is a column: the values() lookups it reads and a
+    function of the row. select() fetches the lookups of the selected
+    columns (context['fields'], default all): translated fields come
+    resolved by the database with modeltranslation's fallbacks (see
+    localization.localized), dates and decimals are formatted with the same
+    DRF fields, so the output is identical to the ModelSerializer it replaces.
+    """
+    # {name: (model, translated field, lookup prefix)}, selected as values_<name>
+    translated = {}
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.lang = translation.get_language() or settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+        columns = self.get_columns()
+        selected = self.context.get('fields')
+        self.columns = columns if selected is None else {key: columns[key] for key in columns if key in selected}
+
+    def get_columns(self):
+        """{output key: (values() lookups, function of the row)}, in output order"""
+        raise NotImplementedError
+
+    def annotations(self, queryset):
+        """{alias: expression} read by the selected columns besides the model fields"""
+        return {}
+
+    def translated_annotations(self, lookups):
+        """localized() expressions of the translated fields among lookups"""
+        return {
+            f'values_{name}': localized(model, field, self.lang, prefix)
+            for name, (model, field, prefix) in self.translated.items()
+            if f'values_{name}' in lookups
+        }
+
+    def column(self, lookup, formatter=None):
+        if formatter is None:
+            return [lookup], itemgetter(lookup)
+        return [lookup], lambda row: None if row[lookup] is None else formatter(row[lookup])
+
+    def localized(self, name):
+        return self.column(f'values_{name}')
+
+    def full_name(self, first_name, last_name):
+        first, last = f'values_{first_name}', f'values_{last_name}'
+        return [first, last], lambda row: f'{row[first]} {row[last]}'
+
+    def select(self, queryset, extra=()):
+        """values() queryset with the needed columns (plus extra ones, e.g. cursor ordering)."""
+        lookups = [lookup for column_lookups, _get in self.columns.values() for lookup in column_lookups]
+        annotations = {**self.translated_annotations(lookups), **self.annotations(queryset)}
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        # raw_values() skips modeltranslation's values(), which selects every
+        # field and re-applies fallbacks through the descriptors row by row.
+        return queryset.raw_values(*dict.fromkeys([*extra, *lookups]))
+
+    def to_representation(self, rows):
+        columns = [(key, get) for key, (_lookups, get) in self.columns.items()]
+        return [{key: get(row) for key, get in columns} for row in rows]
+
+
+class AuthorListValuesSerializer(ValuesSerializer):
+    """AuthorListSerializer over values() rows"""
+    translated = {'first_name': (Author, 'first_name', ''), 'last_name': (Author, 'last_name', '')}
+
+    def get_columns(self):
+        return {
+            'id': self.column('id'),
+            'full_name': self.full_name('first_name', 'last_name'),
+            'email': self.column('email'),
+            'books_count': self.column('values_books_count'),
+        }
+
+    def annotations(self, queryset):
+        if 'books_count' not in self.columns:
+            return {}
+        if 'annotated_books_count' in queryset.query.annotations:
+            books_count = F('annotated_books_count')
+        elif getattr(settings, 'LIBRARY_DENORMALIZED_BOOKS_COUNT', False):
+            books_count = F('cached_books_count')
+        else:
+            # One indexed COUNT per author of the page, rather than joining all books
+            books_count = books_count_subquery()
+        return {'values_books_count': books_count}
+
+
+class BookListValuesSerializer(ValuesSerializer):
+    """BookListSerializer over values() rows"""
+    translated = {
+        'title': (Book, 'title', ''),
+        'description': (Book, 'description', ''),
+        'author_first_name': (Author, 'first_name', 'author__'),
+        'author_last_name': (Author, 'last_name', 'author__'),
+    }
+
+    def get_columns(self):
+        return {
+            'id': self.column('id'),
+            'title': self.localized('title'),
+            'author': self.column('author_id'),
+            'author_name': self.full_name('author_first_name', 'author_last_name'),
+            'genre': self.column('genre'),
+            'publication_date': self.column('publication_date', serializers.DateField().to_representation),
+            'price': self.column(
+                'price', serializers.DecimalField(max_digits=10, decimal_places=2).to_representation
+            ),
+            'is_available': self.column('is_available'),
+            'description': self.localized('description'),
+        }
+
+
 class BookCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for create/update operations"""
     
@@ -73,4 +231,54 @@ class BookCreateUpdateSerializer(serializers.ModelSerializer):
         fields = [
             'title', 'author', 'isbn', 'genre', 'publication_date',
             'pages', 'price', 'description', 'is_available'
-        ]
\ No newline at end of file
+        ]
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolve primary keys from the ``related_objects`` map the bulk service
+    prefetches (one pk__in query per batch) instead of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        related = self.context.get('related_objects', {}).get(self.field_name)
+        if related is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return related[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class AuthorBulkSerializer(serializers.ModelSerializer):
+    """Item serializer of /api/authors/bulk/; email uniqueness is checked per batch"""
+    bulk_unique_field = 'email'
+
+    class Meta:
+        model = Author
+        fields = ['first_name', 'last_name', 'email', 'bio', 'birth_date']
+        extra_kwargs = {'email': {'validators': []}}
+
+
+class BookBulkSerializer(BookCreateUpdateSerializer):
+    """Item serializer of /api/books/bulk/; isbn uniqueness is checked per batch"""
+    bulk_unique_field = 'isbn'
+    author = PrefetchedPrimaryKeyRelatedField(queryset=Author.objects.all())
+
+    class Meta(BookCreateUpdateSerializer.Meta):
+        extra_kwargs = {'isbn': {'validators': []}}
+
+
+class TranslationJobSerializer(serializers.ModelSerializer):
+    """Read-only view of a queued auto-translation"""
+
+    class Meta:
+        model = TranslationJob
+        fields = [
+            'id', 'model_label', 'object_id', 'field', 'language', 'status',
+            'attempts', 'last_error', 'available_at', 'created_at', 'updated_at'
+        ]
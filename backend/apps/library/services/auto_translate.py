@@ -2,19 +2,113 @@
 Auto-translate text from English to Hindi/Tamil using deep-translator.
 
 Used only on save (or one-time migration) — never on every API request.
-Fills *_hi and *_ta when *_en is set and the other is empty.
+Fills *_hi and *_ta when *_en is set and the other is empty, and refreshes
+machine translations whose English text has changed since: the row's
+translation_sources records, per target column, a fingerprint of the English
+text it was translated from. Columns without a fingerprint were written by a
+person and are never overwritten.
 """
+import asyncio
+import hashlib
 import logging
+from functools import lru_cache
+
+from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
+from django.utils.module_loading import import_string
+from modeltranslation.translator import translator
+
+from . import translation_memory
+from .. import events
 
 logger = logging.getLogger(__name__)
 
 # Optional: disable auto-translation via settings (e.g. in tests or if API key missing)
 AUTO_TRANSLATE_ENABLED = getattr(settings, 'AUTO_TRANSLATE_ENABLED', True)
 
+DEFAULT_BACKEND = 'apps.library.services.translators.GoogleTranslatorBackend'
+
 SUPPORTED_TARGETS = {'hi', 'ta'}
 SOURCE_LANG = 'en'
 
+SOURCES_FIELD = 'translation_sources'
+# Fingerprint of a failed translation (the English text was copied): never
+# matches, so the column is translated again the next time its field is saved.
+FAILED_FINGERPRINT = ''
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_translator():
+    """Return the translator backend configured by AUTO_TRANSLATE_BACKEND."""
+    return _load_backend(getattr(settings, 'AUTO_TRANSLATE_BACKEND', DEFAULT_BACKEND))
+
+
+def translate_or_raise(text, target_lang, source_lang=SOURCE_LANG):
+    """
+    Translate through the translation memory, calling the backend only on a miss.
+    Backend errors propagate (the job worker relies on this to retry).
+    """
+    return translate_many([text], target_lang, source_lang)[text]
+
+
+def translate_many(texts, target_lang, source_lang=SOURCE_LANG):
+    """
+    Translate many strings into one language with at most one backend call.
+
+    Returns {text: translation}. Texts already in the translation memory are
+    not sent to the backend; duplicates are sent once. Backend errors propagate.
+    """
+    texts = list(dict.fromkeys(texts))
+    found = translation_memory.lookup_many(texts, source_lang, target_lang)
+    pending = [text for text in texts if text not in found]
+    if pending:
+        translated = get_translator().translate_batch(pending, target_lang, source_lang)
+        if len(translated) != len(pending):
+            raise ValueError(f'translator returned {len(translated)} results for {len(pending)} texts')
+        fresh = dict(zip(pending, translated))
+        translation_memory.store_many(fresh, source_lang, target_lang)
+        found.update(fresh)
+    return found
+
+
+async def atranslate_many(texts, target_lang, source_lang=SOURCE_LANG):
+    """translate_many as a coroutine: the backend call does not block the event loop."""
+    texts = list(dict.fromkeys(texts))
+    found = await sync_to_async(translation_memory.lookup_many)(texts, source_lang, target_lang)
+    pending = [text for text in texts if text not in found]
+    if pending:
+        translated = await get_translator().atranslate_batch(pending, target_lang, source_lang)
+        if len(translated) != len(pending):
+            raise ValueError(f'translator returned {len(translated)} results for {len(pending)} texts')
+        fresh = dict(zip(pending, translated))
+        await sync_to_async(translation_memory.store_many)(fresh, source_lang, target_lang)
+        found.update(fresh)
+    return found
+
+
+def translate_languages(texts_by_lang, source_lang=SOURCE_LANG):
+    """
+    translate_many for several target languages at once: {lang: texts} ->
+    {lang: {text: translation}}, or {lang: exception} for a language whose
+    backend call failed. The calls run concurrently, so the wait is that of
+    the slowest language rather than the sum.
+    """
+    async def translate_all():
+        langs = list(texts_by_lang)
+        results = await asyncio.gather(
+            *(atranslate_many(texts_by_lang[lang], lang, source_lang) for lang in langs),
+            return_exceptions=True,
+        )
+        return dict(zip(langs, results))
+
+    if not texts_by_lang:
+        return {}
+    return async_to_sync(translate_all)()
+
 
 def translate_text(text, target_lang, source_lang=SOURCE_LANG):
     """
@@ -26,38 +120,163 @@ def translate_text(text, target_lang, source_lang=SOURCE_LANG):
     if target_lang not in SUPPORTED_TARGETS:
         return text
     try:
-        from deep_translator import GoogleTranslator
-        translator = GoogleTranslator(source=source_lang, target=target_lang)
-        return translator.translate(text)
+        return translate_or_raise(text, target_lang, source_lang)
     except Exception as e:
         logger.warning('auto_translate failed for %s -> %s: %s', source_lang, target_lang, e)
         return text
 
 
-def fill_missing_translations(instance, field_names_with_en):
+def source_texts(instance):
     """
-    For each (field_base_name, value_en), fill field_hi and field_ta if empty.
-    field_names_with_en: list of (base_name, value_en) e.g. [('title', 'Hello'), ('description', '...')]
-    Updates instance in DB with update() to avoid triggering save again.
+    (base_name, value_en) for every translated field of instance, as the
+    post_save signals build them: the English column, else the active-language value.
+    """
+    fields = translator.get_options_for_model(instance.__class__).fields
+    return [
+        (name, getattr(instance, f'{name}_{SOURCE_LANG}', None) or getattr(instance, name))
+        for name in fields
+    ]
+
+
+def fingerprint(text):
+    """Short, stable digest of an English source text."""
+    return hashlib.sha256(str(text).encode('utf-8')).hexdigest()[:16]
+
+
+def get_sources(instance):
+    """{attr: fingerprint} of the machine-translated columns of instance."""
+    return dict(getattr(instance, SOURCES_FIELD, None) or {})
+
+
+def changed_sources(instance, created=False, update_fields=None):
+    """
+    The (base_name, value_en) pairs of source_texts(instance) that a save may
+    have to translate: all of them for a new row, else only the fields with a
+    language column in update_fields or changed since the row was loaded
+    (LoadedValuesMixin). Saves of other fields (price, availability, ...)
+    return nothing.
+    """
+    loaded = getattr(instance, '_loaded_values', None)
+    result = []
+    for base_name, value_en in source_texts(instance):
+        if not value_en:
+            continue
+        if not created:
+            columns = [f'{base_name}_{lang}' for lang in (SOURCE_LANG, *sorted(SUPPORTED_TARGETS))]
+            if update_fields is not None and not set(update_fields) & {base_name, *columns}:
+                continue
+            if loaded is not None and not any(_changed(instance, loaded, column) for column in columns):
+                continue
+        result.append((base_name, value_en))
+    return result
+
+
+def edited_translations(instance):
+    """Machine-translated target columns of instance that were changed by hand since it was loaded."""
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None:
+        return []
+    return [attr for attr in get_sources(instance) if _changed(instance, loaded, attr)]
+
+
+def _changed(instance, loaded, attr):
+    return attr in instance.__dict__ and (attr not in loaded or loaded[attr] != instance.__dict__[attr])
+
+
+def missing_translations(instance, field_names_with_en):
+    """
+    Yield (base_name, lang, value_en) for every target column of instance
+    that is still empty, or machine-translated from an English text that has
+    changed since, and has English source text to translate from.
     """
-    if not AUTO_TRANSLATE_ENABLED:
-        return
     model_class = instance.__class__
-    updates = {}
+    sources = get_sources(instance)
     for base_name, value_en in field_names_with_en:
         if not value_en or not str(value_en).strip():
             continue
+        current_source = fingerprint(value_en)
         for lang in SUPPORTED_TARGETS:
             attr = f'{base_name}_{lang}'
             if not hasattr(model_class, attr):
                 continue
             current = getattr(instance, attr, None)
-            if current and str(current).strip():
+            if current and str(current).strip() and sources.get(attr, current_source) == current_source:
                 continue
-            translated = translate_text(str(value_en), lang)
-            if translated:
-                updates[attr] = translated
-    if updates:
-        model_class.objects.filter(pk=instance.pk).update(**updates)
+            yield base_name, lang, str(value_en)
+
+
+def translate_missing(items):
+    """
+    Translate every empty or stale target column of many instances in one pass.
+
+    items: iterable of (instance, field_names_with_en) as passed to
+    fill_missing_translations. Strings are grouped by target language so
+    each language costs a single batch call, however many instances and
+    fields are involved, and the languages are translated concurrently.
+    Returns a list of (instance, {attr: translated}); when anything was
+    translated the updates include the instance's new translation_sources.
+    On backend failure the English text is used, like translate_text.
+    """
+    results = []
+    by_lang = {}
+    for instance, field_names_with_en in items:
+        pending = list(missing_translations(instance, field_names_with_en))
+        results.append((instance, pending))
+        for _base_name, lang, value_en in pending:
+            by_lang.setdefault(lang, set()).add(value_en)
+
+    translated = translate_languages(by_lang)
+    for lang, result in translated.items():
+        if isinstance(result, Exception):
+            logger.warning('auto_translate batch failed for %s -> %s: %s', SOURCE_LANG, lang, result)
+            translated[lang] = {}
+
+    return [(instance, _updates(instance, pending, translated)) for instance, pending in results]
+
+
+def _updates(instance, pending, translated):
+    updates, sources = {}, get_sources(instance)
+    for base_name, lang, value_en in pending:
+        attr = f'{base_name}_{lang}'
+        value = translated[lang].get(value_en, value_en)
+        if value:
+            updates[attr] = value
+            sources[attr] = fingerprint(value_en) if value_en in translated[lang] else FAILED_FINGERPRINT
+    if updates and hasattr(instance.__class__, SOURCES_FIELD):
+        updates[SOURCES_FIELD] = sources
+    return updates
+
+
+def fill_missing_translations(instance, field_names_with_en):
+    """
+    For each (field_base_name, value_en), fill field_hi and field_ta if empty
+    or machine-translated from an older value_en.
+    field_names_with_en: list of (base_name, value_en) e.g. [('title', 'Hello'), ('description', '...')]
+    Updates instance in DB with update() to avoid triggering save again.
+    """
+    fill_missing_translations_bulk([(instance, field_names_with_en)])
+
+
+def fill_missing_translations_bulk(items):
+    """
+    fill_missing_translations for many instances: one batch translation call
+    per target language, then one update() per changed instance and one
+    rows_updated per model. Returns the number of instances updated.
+    """
+    if not AUTO_TRANSLATE_ENABLED:
+        return 0
+    updated = {}
+    for instance, updates in translate_missing(items):
+        if not updates:
+            continue
+        instance.__class__.objects.filter(pk=instance.pk).update(**updates)
+        loaded = getattr(instance, '_loaded_values', None)
         for k, v in updates.items():
             setattr(instance, k, v)
+            if loaded is not None:
+                # Written by us, not a change for the next save of this instance to act on
+                loaded[k] = v
+        updated.setdefault(instance.__class__, []).append(instance.pk)
+    for model_class, pks in updated.items():
+        events.rows_updated.send(sender=model_class, pks=pks)
+    return sum(len(pks) for pks in updated.values())
@@ -0,0 +1,164 @@
+"""
+Set-based create/update/delete for the bulk API endpoints.
+
+A batch is validated with a constant number of queries: related objects are
+prefetched with one pk__in query per relation and the unique field (isbn,
+email) is checked with one __in query, instead of the per-item lookups of
+the single-object serializers. Valid items are written with bulk_create /
+bulk_update / one DELETE in a single transaction, and the events.rows_*
+signals are sent once, so translation jobs, counters, statistics, caches and
+the search index are updated per batch rather than per row.
+
+Invalid items are skipped and reported as {'index': i, 'errors': {...}}
+(or {'id': pk, ...} for deletes).
+"""
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .. import events
+from ..serializers import PrefetchedPrimaryKeyRelatedField
+
+BATCH_SIZE = 500
+
+
+def parse_pk(value):
+    try:
+        return None if isinstance(value, bool) else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _related_objects(serializer, items):
+    """{field_name: {pk: obj}} for every prefetched relation referenced by items."""
+    related = {}
+    for name, field in serializer.fields.items():
+        if isinstance(field, PrefetchedPrimaryKeyRelatedField):
+            pks = {parse_pk(item.get(name)) for item in items if isinstance(item, dict)}
+            pks.discard(None)
+            related[name] = field.get_queryset().in_bulk(pks)
+    return related
+
+
+def validate(serializer_class, items, instances=None, partial=False):
+    """
+    Validate items with one shared serializer_class instance.
+
+    instances: optional list of model instances aligned with items (updates).
+    Returns (valid, errors) where valid is a list of (index, validated_data, instance).
+    """
+    child = serializer_class(partial=partial)
+    child.context['related_objects'] = _related_objects(child, items)
+    instances = instances or [None] * len(items)
+
+    valid, errors = [], []
+    for index, (item, instance) in enumerate(zip(items, instances)):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'errors': {'non_field_errors': ['Expected an object.']}})
+            continue
+        child.instance = instance
+        try:
+            valid.append((index, child.run_validation(item), instance))
+        except serializers.ValidationError as e:
+            errors.append({'index': index, 'errors': e.detail})
+    child.instance = None
+
+    unique_field = getattr(serializer_class, 'bulk_unique_field', None)
+    if unique_field:
+        valid, unique_errors = _check_unique(serializer_class.Meta.model, unique_field, valid)
+        errors = sorted(errors + unique_errors, key=lambda error: error['index'])
+    return valid, errors
+
+
+def _check_unique(model, field, valid):
+    """Reject values already used by another row or earlier in the batch (one query)."""
+    values = {data[field] for _index, data, _instance in valid if data.get(field) is not None}
+    taken = dict(model.objects.filter(**{f'{field}__in': values}).values_list(field, 'pk'))
+    message = f'{model._meta.verbose_name} with this {field} already exists.'
+    checked, errors = [], []
+    for index, data, instance in valid:
+        value = data.get(field)
+        owner = taken.get(value)
+        if value is not None and owner is not None and owner != getattr(instance, 'pk', None):
+            errors.append({'index': index, 'errors': {field: [message]}})
+            continue
+        if value is not None:
+            taken[value] = getattr(instance, 'pk', -1)
+        checked.append((index, data, instance))
+    return checked, errors
+
+
+def bulk_create(serializer_class, items):
+    """Create every valid item. Returns (created objects, errors)."""
+    model = serializer_class.Meta.model
+    valid, errors = validate(serializer_class, items)
+    objs = [model(**data) for _index, data, _instance in valid]
+    if objs:
+        with transaction.atomic():
+            model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+            events.rows_created.send(sender=model, objs=objs)
+    return objs, errors
+
+
+def bulk_update(serializer_class, items, partial=True):
+    """
+    Update existing rows; every item needs an "id". Returns (updated objects, errors).
+    Only the fields present in the batch are written.
+    """
+    model = serializer_class.Meta.model
+    ids = [parse_pk(item.get('id')) if isinstance(item, dict) else None for item in items]
+    found = model.objects.in_bulk({pk for pk in ids if pk is not None})
+
+    pending, instances, errors = [], [], []
+    for index, (item, pk) in enumerate(zip(items, ids)):
+        if pk not in found:
+            message = 'Not found.' if pk is not None else 'A valid "id" is required.'
+            errors.append({'index': index, 'errors': {'id': [message]}})
+            continue
+        pending.append({key: value for key, value in item.items() if key != 'id'})
+        instances.append(found[pk])
+
+    valid, item_errors = validate(serializer_class, pending, instances, partial=partial)
+    # validate() numbers items within pending; map back to the request positions.
+    positions = [index for index, pk in enumerate(ids) if pk in found]
+    errors = sorted(
+        errors + [dict(error, index=positions[error['index']]) for error in item_errors],
+        key=lambda error: error['index'],
+    )
+
+    objs, fields = [], set()
+    for _index, data, instance in valid:
+        for attr, value in data.items():
+            setattr(instance, attr, value)
+        fields.update(data)
+        objs.append(instance)
+    if objs:
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        with transaction.atomic():
+            model.objects.bulk_update(objs, sorted(fields | {'updated_at'}), batch_size=BATCH_SIZE)
+            events.rows_updated.send(sender=model, pks=[obj.pk for obj in objs], objs=objs)
+    return objs, errors
+
+
+def bulk_delete(model, ids, blocked=None):
+    """
+    Delete rows by primary key with QuerySet.delete(), which cascades as
+    usual. blocked: {pk: message} for rows the caller refuses to delete.
+    Returns (deleted objects, errors).
+    """
+    blocked = blocked or {}
+    pks = [parse_pk(pk) for pk in ids]
+    objs = list(model.objects.filter(pk__in={pk for pk in pks if pk is not None and pk not in blocked}))
+    deleted = {obj.pk for obj in objs}
+    errors = [
+        {'id': raw, 'errors': [blocked.get(pk, 'Not found.')]}
+        for pk, raw in zip(pks, ids) if pk not in deleted
+    ]
+    if objs:
+        # The post_delete receivers leave these rows to the one rows_deleted of the batch
+        with transaction.atomic(), events.batch_delete(model, deleted):
+            model.objects.filter(pk__in=deleted).delete()
+            events.rows_deleted.send(sender=model, objs=objs)
+    return objs, errors
@@ -0,0 +1,31 @@
+"""
+Denormalized Author.cached_books_count.
+
+Signals adjust the counter with F() expressions on every Book create, delete
+or author change; refresh_books_count() recomputes it from the books table
+(after bulk operations that bypass signals, or to repair drift).
+"""
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from ..models import Author, Book
+
+
+def adjust_books_count(author_id, delta):
+    if author_id:
+        Author.objects.filter(pk=author_id).update(cached_books_count=F('cached_books_count') + delta)
+
+
+def books_count_subquery():
+    """Correlated COUNT of an author's books, for Author querysets."""
+    counts = (
+        Book.objects.filter(author=OuterRef('pk')).order_by()
+        .values('author').annotate(n=Count('pk')).values('n')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def refresh_books_count(author_ids=None):
+    """Recompute cached_books_count for the given authors (all when None)."""
+    authors = Author.objects.all() if author_ids is None else Author.objects.filter(pk__in=author_ids)
+    return authors.update(cached_books_count=books_count_subquery())
@@ -0,0 +1,151 @@
+"""
+Materialized read model of the book API (LIBRARY_READ_MODEL).
+
+BookDocument keeps every book rendered in every language, as the list
+(BookListSerializer) and detail (BookSerializer) endpoints return it. The
+signals re-render a book when it changes, and all books of an author when
+the author's name or email (embedded in the documents) changes. BookViewSet
+then answers list and detail requests by fetching the documents of the page
+by primary key and splicing them into the response as they are (see
+renderers.RawJSON): no translation fallbacks, no serializers.
+
+The author's books_count changes with every book added or removed, so it is
+not stored: detail documents hold a placeholder that fragments() replaces
+with Author.cached_books_count (kept current by signals whatever
+LIBRARY_DENORMALIZED_BOOKS_COUNT says), fetched in the same query.
+
+Documents that are missing (the table was never built, or the book was saved
+while the read model was off) are rendered on the fly and not stored: reads
+never write. `python manage.py rebuild_read_model` builds the whole table.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, Value
+from django.utils import translation
+from modeltranslation.utils import build_localized_fieldname
+from rest_framework.renderers import JSONRenderer
+
+from ..models import Author, Book, BookDocument
+from ..renderers import RawJSON
+from ..serializers import BookListSerializer, BookSerializer
+
+READ_MODEL_ENABLED = getattr(settings, 'LIBRARY_READ_MODEL', False)
+CHUNK_SIZE = 500
+KINDS = ('list', 'detail')
+# Stored in place of the author's books_count. Quotes inside JSON strings are
+# escaped, so this text can only be the books_count key of author_details.
+BOOKS_COUNT_PLACEHOLDER = -1
+BOOKS_COUNT_TEXT = '"books_count":%s'
+
+
+def languages():
+    return tuple(settings.MODELTRANSLATION_LANGUAGES)
+
+
+def author_fields():
+    """The Author columns the documents embed (author_name, author_details)."""
+    return [
+        *(build_localized_fieldname(name, lang) for name in ('first_name', 'last_name') for lang in languages()),
+        'email',
+    ]
+
+
+def author_changed(author):
+    """True when a save of author changes what its books' documents show."""
+    loaded = getattr(author, '_loaded_values', None)
+    if loaded is None:
+        return True
+    return any(
+        attr in author.__dict__ and (attr not in loaded or loaded[attr] != author.__dict__[attr])
+        for attr in author_fields()
+    )
+
+
+def _books(book_ids, lang):
+    """The books loaded as the API loads them for lang, authors with the books_count placeholder."""
+    authors = Author.objects.annotate(annotated_books_count=Value(BOOKS_COUNT_PLACEHOLDER))
+    books = Book.objects.filter(pk__in=book_ids).prefetch_related(
+        Prefetch('author', queryset=authors.localized(lang))
+    )
+    return books.localized(lang)
+
+
+def render(book_ids, langs=None, kinds=KINDS):
+    """{(book id, language): {kind: JSON text}} for the existing books among book_ids."""
+    renderer = JSONRenderer()
+    serializers = {'list': BookListSerializer, 'detail': BookSerializer}
+    documents = {}
+    for lang in langs or languages():
+        with translation.override(lang):
+            books = list(_books(book_ids, lang))
+            for kind in kinds:
+                # One serializer for the chunk: its fields are built once, not per book
+                for book, data in zip(books, serializers[kind](books, many=True).data):
+                    documents.setdefault((book.pk, lang), {})[kind] = renderer.render(data).decode()
+    return documents
+
+
+def _book_ids(book_ids, author_ids):
+    book_ids = set(book_ids)
+    if author_ids:
+        book_ids.update(Book.objects.filter(author_id__in=author_ids).values_list('pk', flat=True))
+    return sorted(book_ids)
+
+
+def refresh(book_ids=(), author_ids=()):
+    """Re-render the given books and all books of the given authors; return the number of books."""
+    book_ids = _book_ids(book_ids, author_ids)
+    for start in range(0, len(book_ids), CHUNK_SIZE):
+        chunk = book_ids[start:start + CHUNK_SIZE]
+        documents = [
+            BookDocument(book_id=pk, language=lang, list_json=texts['list'], detail_json=texts['detail'])
+            for (pk, lang), texts in render(chunk).items()
+        ]
+        with transaction.atomic():
+            BookDocument.objects.bulk_create(
+                documents, batch_size=CHUNK_SIZE, update_conflicts=True, unique_fields=['book', 'language'],
+                update_fields=['list_json', 'detail_json', 'updated_at'],
+            )
+    return len(book_ids)
+
+
+def remove(book_ids):
+    BookDocument.objects.filter(book_id__in=list(book_ids)).delete()
+
+
+def rebuild(progress=None):
+    """Render every book from scratch; return the number of books."""
+    BookDocument.objects.all().delete()
+    book_ids = list(Book.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(book_ids), CHUNK_SIZE):
+        refresh(book_ids[start:start + CHUNK_SIZE])
+        if progress:
+            progress(min(start + CHUNK_SIZE, len(book_ids)))
+    return len(book_ids)
+
+
+def _with_books_count(text, books_count):
+    return text.replace(BOOKS_COUNT_TEXT % BOOKS_COUNT_PLACEHOLDER, BOOKS_COUNT_TEXT % books_count, 1)
+
+
+def fragments(book_ids, kind, lang=None):
+    """RawJSON documents of kind ('list' or 'detail') for book_ids, in that order; unknown books are left out."""
+    lang = lang or translation.get_language()
+    documents = BookDocument.objects.filter(book_id__in=book_ids, language=lang)
+    if kind == 'list':
+        found = dict(documents.values_list('book_id', 'list_json'))
+    else:
+        found = {
+            pk: _with_books_count(text, books_count)
+            for pk, text, books_count in documents.values_list(
+                'book_id', 'detail_json', 'book__author__cached_books_count'
+            )
+        }
+    missing = [pk for pk in book_ids if pk not in found]
+    if missing:
+        rendered = {pk: texts[kind] for (pk, _lang), texts in render(missing, [lang], [kind]).items()}
+        if kind == 'detail':
+            counts = dict(Book.objects.filter(pk__in=rendered).values_list('pk', 'author__cached_books_count'))
+            rendered = {pk: _with_books_count(text, counts[pk]) for pk, text in rendered.items()}
+        found.update(rendered)
+    return [RawJSON(found[pk]) for pk in book_ids if pk in found]
@@ -0,0 +1,106 @@
+"""
+Materialized library statistics.
+
+The statistics endpoint reads a handful of LibraryStatistic rows instead of
+aggregating the books table. Signals apply deltas with F() expressions as
+books and authors are created, changed or deleted; reconcile() recomputes
+everything from scratch (run `python manage.py reconcile_statistics`
+periodically, and after bulk operations that bypass signals).
+"""
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from ..models import Author, Book, LibraryStatistic
+
+TOTAL_AUTHORS = 'total_authors'
+TOTAL_BOOKS = 'total_books'
+AVAILABLE_BOOKS = 'available_books'
+GENRE_PREFIX = 'genre:'
+
+
+def genre_key(genre):
+    return f'{GENRE_PREFIX}{genre}'
+
+
+def book_deltas(book, sign):
+    """Counter deltas for adding (sign=1) or removing (sign=-1) book."""
+    deltas = {TOTAL_BOOKS: sign, genre_key(book['genre']): sign}
+    if book['is_available']:
+        deltas[AVAILABLE_BOOKS] = sign
+    return deltas
+
+
+def adjust(deltas):
+    """Apply {key: delta} to the counters."""
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        if not LibraryStatistic.objects.filter(key=key).update(value=F('value') + delta):
+            LibraryStatistic.objects.bulk_create([LibraryStatistic(key=key)], ignore_conflicts=True)
+            LibraryStatistic.objects.filter(key=key).update(value=F('value') + delta)
+
+
+def merge_deltas(*deltas):
+    merged = {}
+    for item in deltas:
+        for key, delta in item.items():
+            merged[key] = merged.get(key, 0) + delta
+    return merged
+
+
+@transaction.atomic
+def reconcile():
+    """Recompute every counter from the authors and books tables."""
+    book_stats = Book.objects.aggregate(
+        total=Count('id'),
+        available=Count('id', filter=Q(is_available=True)),
+    )
+    values = {
+        TOTAL_AUTHORS: Author.objects.count(),
+        TOTAL_BOOKS: book_stats['total'],
+        AVAILABLE_BOOKS: book_stats['available'],
+    }
+    for item in Book.objects.order_by().values('genre').annotate(count=Count('id')):
+        values[genre_key(item['genre'])] = item['count']
+
+    LibraryStatistic.objects.exclude(key__in=list(values)).delete()
+    LibraryStatistic.objects.bulk_create(
+        [LibraryStatistic(key=key, value=value) for key, value in values.items()],
+        update_conflicts=True,
+        unique_fields=['key'],
+        update_fields=['value', 'updated_at'],
+    )
+    return values
+
+
+def snapshot():
+    """Return the statistics payload, reconciling first if never materialized."""
+    values = dict(LibraryStatistic.objects.values_list('key', 'value'))
+    if TOTAL_BOOKS not in values:
+        values = reconcile()
+    return _payload(values)
+
+
+async def asnapshot():
+    """snapshot() for async views."""
+    values = {key: value async for key, value in LibraryStatistic.objects.values_list('key', 'value')}
+    if TOTAL_BOOKS not in values:
+        values = await sync_to_async(reconcile)()
+    return _payload(values)
+
+
+def _payload(values):
+    total = values.get(TOTAL_BOOKS, 0)
+    available = values.get(AVAILABLE_BOOKS, 0)
+    return {
+        'total_authors': values.get(TOTAL_AUTHORS, 0),
+        'total_books': total,
+        'available_books': available,
+        'unavailable_books': total - available,
+        'genres_distribution': {
+            key[len(GENRE_PREFIX):]: value
+            for key, value in values.items()
+            if key.startswith(GENRE_PREFIX) and value
+        },
+    }
@@ -0,0 +1,125 @@
+"""
+Synthetic catalogue generator for benchmarks and load testing.
+
+Adds authors and books with bulk_create in batches, every translated field
+filled in en/hi/ta (parallel vocabularies, so the three titles of a book
+say the same thing), reproducible for a given seed. No save signals are
+sent: books_count, the statistics, the search index and (when enabled) the
+read model are rebuilt once at the end, so a million books take minutes
+rather than hours. For realistic demo data use create_sample_data.py instead.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .. import search
+from ..models import Author, Book
+from . import read_model, statistics
+from .counters import refresh_books_count
+
+LANGUAGES = ('en', 'hi', 'ta')
+
+# Same meaning at the same index in every language
+WORDS = {
+    'en': ['silent', 'river', 'golden', 'night', 'forgotten', 'city', 'last', 'garden',
+           'secret', 'mountain', 'letters', 'storm', 'ancient', 'house', 'long', 'journey'],
+    'hi': ['खामोश', 'नदी', 'सुनहरी', 'रात', 'भूला', 'शहर', 'आखिरी', 'बगीचा',
+           'रहस्य', 'पहाड़', 'पत्र', 'तूफ़ान', 'प्राचीन', 'घर', 'लंबी', 'यात्रा'],
+    'ta': ['அமைதியான', 'நதி', 'தங்க', 'இரவு', 'மறந்த', 'நகரம்', 'கடைசி', 'தோட்டம்',
+           'ரகசியம்', 'மலை', 'கடிதங்கள்', 'புயல்', 'பழமையான', 'வீடு', 'நீண்ட', 'பயணம்'],
+}
+FIRST_NAMES = {
+    'en': ['Asha', 'Ravi', 'Meera', 'Arjun', 'Kavya', 'Vikram', 'Priya', 'Sanjay'],
+    'hi': ['आशा', 'रवि', 'मीरा', 'अर्जुन', 'काव्या', 'विक्रम', 'प्रिया', 'संजय'],
+    'ta': ['ஆஷா', 'ரவி', 'மீரா', 'அர்ஜுன்', 'காவ்யா', 'விக்ரம்', 'பிரியா', 'சஞ்சய்'],
+}
+LAST_NAMES = {
+    'en': ['Sharma', 'Iyer', 'Patel', 'Nair', 'Rao', 'Gupta', 'Menon', 'Das'],
+    'hi': ['शर्मा', 'अय्यर', 'पटेल', 'नायर', 'राव', 'गुप्ता', 'मेनन', 'दास'],
+    'ta': ['சர்மா', 'ஐயர்', 'படேல்', 'நாயர்', 'ராவ்', 'குப்தா', 'மேனன்', 'தாஸ்'],
+}
+GENRES = [value for value, _label in Book.GENRE_CHOICES]
+TITLE_WORDS = 3
+DESCRIPTION_WORDS = 24
+
+
+def _texts(rng, count):
+    """{lang: text} of count random words, the same words in every language."""
+    indexes = [rng.randrange(len(WORDS['en'])) for _ in range(count)]
+    return {lang: ' '.join(WORDS[lang][index] for index in indexes) for lang in LANGUAGES}
+
+
+def _author(rng, number):
+    first, last = rng.randrange(len(FIRST_NAMES['en'])), rng.randrange(len(LAST_NAMES['en']))
+    bio = _texts(rng, DESCRIPTION_WORDS)
+    fields = {}
+    for lang in LANGUAGES:
+        fields[f'first_name_{lang}'] = FIRST_NAMES[lang][first]
+        fields[f'last_name_{lang}'] = f'{LAST_NAMES[lang][last]} {number}'
+        fields[f'bio_{lang}'] = bio[lang]
+    return Author(
+        email=f'author{number}@synthetic.example',
+        birth_date=date(1940, 1, 1) + timedelta(days=rng.randrange(60 * 365)),
+        **fields,
+    )
+
+
+def _book(rng, number, author_id):
+    title, description = _texts(rng, TITLE_WORDS), _texts(rng, DESCRIPTION_WORDS)
+    fields = {}
+    for lang in LANGUAGES:
+        fields[f'title_{lang}'] = f'{title[lang]} {number}'
+        fields[f'description_{lang}'] = description[lang]
+    return Book(
+        author_id=author_id,
+        isbn=f'979{number:010d}',
+        genre=rng.choice(GENRES),
+        publication_date=date(1950, 1, 1) + timedelta(days=rng.randrange(75 * 365)),
+        pages=rng.randint(80, 900),
+        price=Decimal(rng.randint(199, 4999)) / 100,
+        is_available=rng.random() < 0.8,
+        **fields,
+    )
+
+
+def generate(books, authors=None, seed=0, batch_size=5000, progress=None):
+    """
+    Add books books and authors authors (default: one per 50 books) to the
+    database. progress, if given, is called with the number of books written
+    after each batch. Returns (authors created, books created).
+    """
+    rng = random.Random(seed)
+    authors = authors if authors is not None else max(1, books // 50)
+    # Continue numbering after earlier runs so emails and ISBNs stay unique
+    first_author = (Author.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+    first_book = (Book.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+    author_ids = []
+    for start in range(0, authors, batch_size):
+        batch = [_author(rng, first_author + n) for n in range(start, min(start + batch_size, authors))]
+        with transaction.atomic():
+            Author.objects.bulk_create(batch)
+        author_ids.extend(author.pk for author in batch)
+
+    for start in range(0, books, batch_size):
+        batch = [
+            _book(rng, first_book + n, rng.choice(author_ids))
+            for n in range(start, min(start + batch_size, books))
+        ]
+        with transaction.atomic():
+            Book.objects.bulk_create(batch)
+        if progress:
+            progress(start + len(batch))
+
+    refresh_books_count()
+    statistics.reconcile()
+    backend = search.backend_for_vendor(connection.vendor)
+    with transaction.atomic():
+        for label in ('library.author', 'library.book'):
+            backend.rebuild(label)
+    if read_model.READ_MODEL_ENABLED:
+        read_model.rebuild()
+    return authors, books
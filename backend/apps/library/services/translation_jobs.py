@@ -0,0 +1,188 @@
+"""
+DB-backed queue that moves auto-translation off the save path.
+
+Signals call enqueue_translations(); the process_translation_jobs management
+command claims pending jobs, translates them and writes *_hi / *_ta with
+update(). Any number of workers can run side by side: jobs are claimed with a
+conditional UPDATE, so each job is processed by one worker only.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .. import events
+from ..models import TranslationJob
+from .auto_translate import (
+    AUTO_TRANSLATE_ENABLED, SOURCES_FIELD, fingerprint, get_sources, missing_translations, translate_languages,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, 'TRANSLATION_JOB_MAX_ATTEMPTS', 5)
+# Jobs left 'running' longer than this are assumed orphaned by a dead worker.
+LOCK_TIMEOUT = timedelta(seconds=getattr(settings, 'TRANSLATION_JOB_LOCK_TIMEOUT', 300))
+MAX_RETRY_DELAY = 3600
+
+
+def enqueue_translations(instance, field_names_with_en):
+    """
+    Queue a job for every empty or stale *_hi / *_ta column of instance
+    (see missing_translations).
+
+    Idempotent per (model, pk, field, language): re-saving an object resets
+    its existing job to pending with the latest source text instead of
+    adding a duplicate. Returns the number of jobs queued.
+    """
+    return enqueue_translations_bulk([(instance, field_names_with_en)])
+
+
+def enqueue_translations_bulk(items, batch_size=1000):
+    """
+    enqueue_translations for many (instance, field_names_with_en) items,
+    written with one upsert per batch_size jobs.
+    """
+    if not AUTO_TRANSLATE_ENABLED:
+        return 0
+    now = timezone.now()
+    jobs = [
+        TranslationJob(
+            model_label=instance._meta.label_lower,
+            object_id=instance.pk,
+            field=base_name,
+            language=lang,
+            source_text=value_en,
+            status=TranslationJob.STATUS_PENDING,
+            attempts=0,
+            last_error='',
+            available_at=now,
+            locked_by='',
+            locked_at=None,
+        )
+        for instance, field_names_with_en in items
+        for base_name, lang, value_en in missing_translations(instance, field_names_with_en)
+    ]
+    if jobs:
+        TranslationJob.objects.bulk_create(
+            jobs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['model_label', 'object_id', 'field', 'language'],
+            update_fields=[
+                'source_text', 'status', 'attempts', 'last_error',
+                'available_at', 'locked_by', 'locked_at', 'updated_at',
+            ],
+        )
+    return len(jobs)
+
+
+def requeue_stale_jobs():
+    """Put jobs whose worker died mid-run back in the queue."""
+    return TranslationJob.objects.filter(
+        status=TranslationJob.STATUS_RUNNING,
+        locked_at__lt=timezone.now() - LOCK_TIMEOUT,
+    ).update(status=TranslationJob.STATUS_PENDING, locked_by='', locked_at=None)
+
+
+def claim_jobs(batch_size, worker_id=None):
+    """Atomically mark up to batch_size due jobs as running and return them."""
+    worker_id = worker_id or uuid.uuid4().hex
+    now = timezone.now()
+    due = TranslationJob.objects.filter(
+        status=TranslationJob.STATUS_PENDING, available_at__lte=now,
+    ).values_list('pk', flat=True)[:batch_size]
+    claimed = TranslationJob.objects.filter(
+        pk__in=list(due), status=TranslationJob.STATUS_PENDING,
+    ).update(
+        status=TranslationJob.STATUS_RUNNING,
+        locked_by=worker_id,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return []
+    return list(TranslationJob.objects.filter(
+        status=TranslationJob.STATUS_RUNNING, locked_by=worker_id, locked_at=now,
+    ))
+
+
+def process_jobs(batch_size=50, worker_id=None):
+    """
+    Claim and process one batch. Jobs are grouped by target language so the
+    whole batch costs one translator call per language, made concurrently,
+    and rows_updated is sent once per model for all the rows it changed.
+    Returns (succeeded, failed) counts.
+    """
+    by_lang = {}
+    for job in claim_jobs(batch_size, worker_id=worker_id):
+        by_lang.setdefault(job.language, []).append(job)
+
+    succeeded, failed = 0, 0
+    updated = {}
+    results = translate_languages({lang: [job.source_text for job in jobs] for lang, jobs in by_lang.items()})
+    for lang, jobs in by_lang.items():
+        translated = results[lang]
+        if isinstance(translated, Exception):
+            for job in jobs:
+                _fail(job, translated)
+            failed += len(jobs)
+            continue
+        for job in jobs:
+            row = _finish(job, translated.get(job.source_text))
+            if row is not None:
+                updated.setdefault(row.__class__, set()).add(row.pk)
+            succeeded += 1
+    # Caches, search index and read model of the whole batch (see signals.py)
+    for model_class, pks in updated.items():
+        events.rows_updated.send(sender=model_class, pks=sorted(pks))
+    return succeeded, failed
+
+
+def _finish(job, translated):
+    """
+    Store the translation of a claimed job, with the fingerprint of its source
+    text. The target column is only written if it is still empty or machine
+    translated (a person may have edited it since), and the job was not
+    re-queued with newer source text while we were translating. Returns the
+    updated row, or None.
+    """
+    model_class = apps.get_model(job.model_label)
+    attr = f'{job.field}_{job.language}'
+    with transaction.atomic():
+        finished = TranslationJob.objects.filter(
+            pk=job.pk, status=TranslationJob.STATUS_RUNNING,
+            locked_by=job.locked_by, source_text=job.source_text,
+        ).update(status=TranslationJob.STATUS_DONE, last_error='', locked_by='', locked_at=None)
+        if not (finished and translated):
+            return None
+        row = model_class.objects.select_for_update().only(attr, SOURCES_FIELD).filter(pk=job.object_id).first()
+        if row is None:
+            return None
+        sources = get_sources(row)
+        current = getattr(row, attr)
+        if current and str(current).strip() and attr not in sources:
+            return None
+        sources[attr] = fingerprint(job.source_text)
+        model_class.objects.filter(pk=row.pk).update(**{attr: translated, SOURCES_FIELD: sources})
+    return row
+
+
+def _fail(job, error):
+    """Reschedule a job with exponential backoff, or mark it failed after MAX_ATTEMPTS."""
+    logger.warning('translation job %s failed (attempt %s): %s', job.pk, job.attempts, error)
+    if job.attempts >= MAX_ATTEMPTS:
+        status, available_at = TranslationJob.STATUS_FAILED, timezone.now()
+    else:
+        delay = min(2 ** job.attempts, MAX_RETRY_DELAY)
+        status, available_at = TranslationJob.STATUS_PENDING, timezone.now() + timedelta(seconds=delay)
+    TranslationJob.objects.filter(
+        pk=job.pk, status=TranslationJob.STATUS_RUNNING, locked_by=job.locked_by,
+    ).update(
+        status=status, available_at=available_at, last_error=str(error)[:1000],
+        locked_by='', locked_at=None,
+    )
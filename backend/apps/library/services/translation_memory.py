@@ -0,0 +1,148 @@
+"""
+Translation memory: reuse earlier translations of identical source text.
+
+Lookups go through a bounded in-process LRU first, then the TranslationMemory
+table; only misses reach the translator backend. Entries older than
+TRANSLATION_MEMORY_TTL seconds are ignored (0 = keep forever) and removed by
+`python manage.py prune_translation_memory`, which also caps the table at
+TRANSLATION_MEMORY_MAX_ENTRIES rows.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import TranslationMemory
+
+TRANSLATION_MEMORY_ENABLED = getattr(settings, 'TRANSLATION_MEMORY_ENABLED', True)
+LRU_SIZE = getattr(settings, 'TRANSLATION_MEMORY_LRU_SIZE', 2048)
+TTL = getattr(settings, 'TRANSLATION_MEMORY_TTL', 0)
+MAX_ENTRIES = getattr(settings, 'TRANSLATION_MEMORY_MAX_ENTRIES', 0)
+
+_lock = threading.Lock()
+_lru = OrderedDict()
+_stats = {'lru_hits': 0, 'db_hits': 0, 'misses': 0, 'stores': 0}
+
+
+def make_key(text, source_lang, target_lang):
+    return hashlib.sha256(f'{source_lang}\0{target_lang}\0{text}'.encode('utf-8')).hexdigest()
+
+
+def _expiry_cutoff():
+    return timezone.now() - timedelta(seconds=TTL) if TTL else None
+
+
+def _remember(key, value):
+    expires_at = timezone.now() + timedelta(seconds=TTL) if TTL else None
+    with _lock:
+        _lru[key] = (value, expires_at)
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def lookup(text, source_lang, target_lang):
+    """Return the remembered translation of text or None."""
+    return lookup_many([text], source_lang, target_lang).get(text)
+
+
+def lookup_many(texts, source_lang, target_lang):
+    """
+    Return {text: translation} for every text found in memory.
+    Texts missing from the LRU are fetched from the table in one query.
+    """
+    if not TRANSLATION_MEMORY_ENABLED:
+        return {}
+    found, missing = {}, {}
+    now = timezone.now()
+    with _lock:
+        for text in texts:
+            key = make_key(text, source_lang, target_lang)
+            entry = _lru.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    _lru.move_to_end(key)
+                    _stats['lru_hits'] += 1
+                    found[text] = value
+                    continue
+                del _lru[key]
+            missing[key] = text
+    if not missing:
+        return found
+
+    queryset = TranslationMemory.objects.filter(key__in=list(missing))
+    cutoff = _expiry_cutoff()
+    if cutoff:
+        queryset = queryset.filter(created_at__gte=cutoff)
+    rows = dict(queryset.values_list('key', 'translated_text'))
+    for key, value in rows.items():
+        found[missing[key]] = value
+        _remember(key, value)
+    with _lock:
+        _stats['db_hits'] += len(rows)
+        _stats['misses'] += len(missing) - len(rows)
+    return found
+
+
+def store(text, source_lang, target_lang, translated):
+    """Remember a backend translation (insert or refresh)."""
+    store_many({text: translated}, source_lang, target_lang)
+
+
+def store_many(translations, source_lang, target_lang):
+    """Remember {text: translation} pairs with a single upsert."""
+    if not TRANSLATION_MEMORY_ENABLED:
+        return
+    entries = []
+    for text, translated in translations.items():
+        if not translated:
+            continue
+        key = make_key(text, source_lang, target_lang)
+        entries.append(TranslationMemory(
+            key=key, source_lang=source_lang, target_lang=target_lang,
+            source_text=text, translated_text=translated,
+        ))
+        _remember(key, translated)
+    if not entries:
+        return
+    TranslationMemory.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['key'],
+        update_fields=['translated_text', 'created_at'],
+    )
+    with _lock:
+        _stats['stores'] += len(entries)
+
+
+def prune():
+    """Delete expired entries and the oldest rows beyond MAX_ENTRIES. Returns rows deleted."""
+    deleted = 0
+    cutoff = _expiry_cutoff()
+    if cutoff:
+        deleted += TranslationMemory.objects.filter(created_at__lt=cutoff).delete()[0]
+    if MAX_ENTRIES:
+        oldest_kept = (
+            TranslationMemory.objects.order_by('-created_at')
+            .values_list('created_at', flat=True)[MAX_ENTRIES - 1:MAX_ENTRIES].first()
+        )
+        if oldest_kept is not None:
+            deleted += TranslationMemory.objects.filter(created_at__lt=oldest_kept).delete()[0]
+    clear_local()
+    return deleted
+
+
+def clear_local():
+    """Empty the in-process LRU (the table is left untouched)."""
+    with _lock:
+        _lru.clear()
+
+
+def stats():
+    """Hit/miss counters of this process plus the current LRU size."""
+    with _lock:
+        return dict(_stats, lru_size=len(_lru))
@@ -0,0 +1,71 @@
+"""
+Translator backends used by auto_translate.
+
+A backend subclasses TranslatorBackend and implements ``translate`` and,
+when the service supports it, a cheaper ``translate_batch``. Both return
+translated text and raise on failure. ``atranslate_batch`` is the coroutine
+version, by default translate_batch in a worker thread; a backend with an
+async HTTP client can override it. The active backend is chosen with the
+AUTO_TRANSLATE_BACKEND setting (dotted path).
+"""
+import threading
+
+from asgiref.sync import sync_to_async
+
+
+class TranslatorBackend:
+    """Base class for translator backends."""
+
+    def translate(self, text, target_lang, source_lang):
+        raise NotImplementedError
+
+    def translate_batch(self, texts, target_lang, source_lang):
+        """Translate a list of strings; returns a list in the same order."""
+        return [self.translate(text, target_lang, source_lang) for text in texts]
+
+    async def atranslate_batch(self, texts, target_lang, source_lang):
+        """translate_batch without blocking the event loop (the call runs in a thread)."""
+        return await sync_to_async(self.translate_batch, thread_sensitive=False)(texts, target_lang, source_lang)
+
+
+class GoogleTranslatorBackend(TranslatorBackend):
+    """Google Translate through deep-translator (needs network access)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _get(self, source_lang, target_lang):
+        # One deep-translator instance per language pair, reused across calls.
+        # Instances keep per-request state, so they are not shared between threads.
+        translators = self._local.__dict__.setdefault('translators', {})
+        key = (source_lang, target_lang)
+        if key not in translators:
+            from deep_translator import GoogleTranslator
+            translators[key] = GoogleTranslator(source=source_lang, target=target_lang)
+        return translators[key]
+
+    def translate(self, text, target_lang, source_lang):
+        return self._get(source_lang, target_lang).translate(text)
+
+    def translate_batch(self, texts, target_lang, source_lang):
+        return self._get(source_lang, target_lang).translate_batch(list(texts))
+
+
+class StubTranslatorBackend(TranslatorBackend):
+    """
+    Offline backend for tests and local development.
+    Returns the text prefixed with the target language, e.g. "[hi] Emma",
+    and records each call as (target_lang, [texts]) so tests can assert on
+    round trips.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, text, target_lang, source_lang):
+        self.calls.append((target_lang, [text]))
+        return f'[{target_lang}] {text}'
+
+    def translate_batch(self, texts, target_lang, source_lang):
+        self.calls.append((target_lang, list(texts)))
+        return [f'[{target_lang}] {text}' for text in texts]
@@ -1,32 +1,276 @@
 """
 Signals to auto-translate new or updated content into hi/ta using deep-translator.
 
-Runs only on save (create/update) — never on every request.
-Fills *_hi and *_ta from *_en when missing.
+Runs only on save (create/update) — never on every request — and only for
+the translated fields the save changed: a price or availability update does
+no translation work. Fills *_hi and *_ta from *_en when missing, or when they
+were machine-translated from an older *_en. With AUTO_TRANSLATE_ASYNC (the
+default) the work is queued as TranslationJob rows for the
+process_translation_jobs worker instead of blocking the save.
 """
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from . import caching, events, search
 from .models import Author, Book
-from .services.auto_translate import fill_missing_translations
+from .services.auto_translate import (
+    SOURCES_FIELD, changed_sources, edited_translations, fill_missing_translations_bulk, get_sources,
+)
+from .services import read_model, statistics
+from .services.counters import adjust_books_count, refresh_books_count
+from .services.translation_jobs import enqueue_translations_bulk
+
+
+def _translate(instance, field_names_with_en):
+    _translate_bulk([(instance, field_names_with_en)])
+
+
+def _translate_bulk(items):
+    if getattr(settings, 'AUTO_TRANSLATE_ASYNC', True):
+        enqueue_translations_bulk(items)
+    else:
+        fill_missing_translations_bulk(items)
+
+
+def _book_author_ids(books):
+    """Current and, for loaded books, previous author of each book."""
+    return {
+        pk for book in books
+        for pk in (book.author_id, getattr(book, '_loaded_values', {}).get('author_id')) if pk
+    }
+
+
+def _keep_edited_translations(instance):
+    """Drop the fingerprints of machine translations a person has edited, so they are never overwritten."""
+    edited = edited_translations(instance)
+    if edited:
+        sources = {attr: value for attr, value in get_sources(instance).items() if attr not in edited}
+        instance.__class__.objects.filter(pk=instance.pk).update(**{SOURCES_FIELD: sources})
+        setattr(instance, SOURCES_FIELD, sources)
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Book)
+def auto_translate_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """After an Author/Book save, translate the changed fields into hi/ta where empty or stale."""
+    _keep_edited_translations(instance)
+    _translate(instance, changed_sources(instance, created, update_fields))
+
+
+@receiver(events.rows_created)
+@receiver(events.rows_updated)
+def bulk_auto_translate(sender, objs=None, **kwargs):
+    """Queue the translations of a bulk create/update once for the whole batch."""
+    if sender not in (Author, Book) or not objs:
+        return
+    created = kwargs['signal'] is events.rows_created
+    if not created:
+        for obj in objs:
+            _keep_edited_translations(obj)
+    _translate_bulk([(obj, changed_sources(obj, created)) for obj in objs])
+
+
+@receiver(post_save, sender=Book)
+def book_count_on_save(sender, instance, created, **kwargs):
+    """Keep Author.cached_books_count in step when a book is added or moved to another author."""
+    loaded = getattr(instance, '_loaded_values', {})
+    if created:
+        adjust_books_count(instance.author_id, 1)
+    elif 'author_id' in loaded and loaded['author_id'] != instance.author_id:
+        adjust_books_count(loaded['author_id'], -1)
+        adjust_books_count(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Book)
+def book_count_on_delete(sender, instance, **kwargs):
+    if events.in_batch_delete(instance):
+        return
+    adjust_books_count(instance.author_id, -1)
+
+
+@receiver(events.rows_created)
+@receiver(events.rows_updated)
+@receiver(events.rows_deleted)
+def bulk_book_count(sender, objs=None, **kwargs):
+    """One recount per batch for the authors whose books were added, moved or removed."""
+    if sender is not Book or not objs:
+        return
+    if kwargs['signal'] is events.rows_updated:
+        objs = [obj for obj in objs if obj._loaded_values.get('author_id', obj.author_id) != obj.author_id]
+    refresh_books_count(_book_author_ids(objs))
+
+
+# Read model before the cache stamps, so a response cached under the new stamps has the new documents
+@receiver(post_save, sender=Author)
+def author_read_model(sender, instance, created, **kwargs):
+    """Book documents embed the author's name and email: re-render all their books when those change."""
+    if read_model.READ_MODEL_ENABLED and not created and read_model.author_changed(instance):
+        read_model.refresh(author_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Book)
+def book_read_model_on_save(sender, instance, **kwargs):
+    # The author's books_count is merged in at read time, so other books stay as they are
+    if read_model.READ_MODEL_ENABLED:
+        read_model.refresh([instance.pk])
+
+
+@receiver(post_delete, sender=Book)
+def book_read_model_on_delete(sender, instance, **kwargs):
+    if read_model.READ_MODEL_ENABLED and not events.in_batch_delete(instance):
+        read_model.remove([instance.pk])
+
+
+@receiver(events.rows_created)
+@receiver(events.rows_updated)
+@receiver(events.rows_deleted)
+def bulk_read_model(sender, pks=None, objs=None, **kwargs):
+    """Re-render (or remove) the documents of a whole batch at once."""
+    if not read_model.READ_MODEL_ENABLED or sender not in (Author, Book):
+        return
+    signal = kwargs['signal']
+    if sender is Author:
+        if signal is events.rows_updated:
+            # Without the instances (e.g. translation worker) it is unknown which columns changed
+            changed = pks if objs is None else [obj.pk for obj in objs if read_model.author_changed(obj)]
+            read_model.refresh(author_ids=changed)
+    elif signal is events.rows_deleted:
+        read_model.remove([obj.pk for obj in objs])
+    else:
+        read_model.refresh(pks if objs is None else [obj.pk for obj in objs])
 
 
 @receiver(post_save, sender=Author)
-def author_auto_translate(sender, instance, created, **kwargs):
-    """After Author save, fill first_name_hi/ta, last_name_hi/ta, bio_hi/ta from _en if empty."""
-    fields_with_en = [
-        ('first_name', getattr(instance, 'first_name_en', None) or instance.first_name),
-        ('last_name', getattr(instance, 'last_name_en', None) or instance.last_name),
-        ('bio', getattr(instance, 'bio_en', None) or instance.bio),
-    ]
-    fill_missing_translations(instance, [(n, v) for n, v in fields_with_en if v])
+@receiver(post_delete, sender=Author)
+def author_invalidate_cache(sender, instance, **kwargs):
+    if events.in_batch_delete(instance):
+        return
+    caching.invalidate(Author, [instance.pk])
 
 
 @receiver(post_save, sender=Book)
-def book_auto_translate(sender, instance, created, **kwargs):
-    """After Book save, fill title_hi/ta, description_hi/ta from _en if empty."""
-    fields_with_en = [
-        ('title', getattr(instance, 'title_en', None) or instance.title),
-        ('description', getattr(instance, 'description_en', None) or instance.description),
-    ]
-    fill_missing_translations(instance, [(n, v) for n, v in fields_with_en if v])
+@receiver(post_delete, sender=Book)
+def book_invalidate_cache(sender, instance, **kwargs):
+    """A book change also changes its author's books_count."""
+    if events.in_batch_delete(instance):
+        return
+    authors = {instance.author_id, getattr(instance, '_loaded_values', {}).get('author_id')}
+    caching.invalidate(Book, [instance.pk], related=[f'author:{pk}' for pk in authors if pk])
+
+
+@receiver(events.rows_updated)
+def rows_updated_invalidate_cache(sender, pks, objs=None, **kwargs):
+    related = [f'author:{pk}' for pk in _book_author_ids(objs)] if sender is Book and objs else ()
+    caching.invalidate(sender, pks, related=related)
+
+
+@receiver(events.rows_created)
+@receiver(events.rows_deleted)
+def bulk_invalidate_cache(sender, objs, **kwargs):
+    related = [f'author:{pk}' for pk in _book_author_ids(objs)] if sender is Book else ()
+    caching.invalidate(sender, [obj.pk for obj in objs], related=related)
+
+
+@receiver(post_save, sender=Author)
+def author_statistics_on_save(sender, instance, created, **kwargs):
+    if created:
+        statistics.adjust({statistics.TOTAL_AUTHORS: 1})
+
+
+@receiver(post_delete, sender=Author)
+def author_statistics_on_delete(sender, instance, **kwargs):
+    if events.in_batch_delete(instance):
+        return
+    statistics.adjust({statistics.TOTAL_AUTHORS: -1})
+
+
+def _book_statistics_deltas(instance, created):
+    """Move the book between genre/availability counters when those fields change."""
+    current = {'genre': instance.genre, 'is_available': instance.is_available}
+    if created:
+        return statistics.book_deltas(current, 1)
+    loaded = getattr(instance, '_loaded_values', {})
+    if 'genre' not in loaded or 'is_available' not in loaded:
+        return {}
+    previous = {'genre': loaded['genre'], 'is_available': loaded['is_available']}
+    if previous == current:
+        return {}
+    return statistics.merge_deltas(statistics.book_deltas(previous, -1), statistics.book_deltas(current, 1))
+
+
+@receiver(post_save, sender=Book)
+def book_statistics_on_save(sender, instance, created, **kwargs):
+    statistics.adjust(_book_statistics_deltas(instance, created))
+
+
+@receiver(post_delete, sender=Book)
+def book_statistics_on_delete(sender, instance, **kwargs):
+    if events.in_batch_delete(instance):
+        return
+    statistics.adjust(statistics.book_deltas(
+        {'genre': instance.genre, 'is_available': instance.is_available}, -1
+    ))
+
+
+@receiver(events.rows_created)
+@receiver(events.rows_updated)
+@receiver(events.rows_deleted)
+def bulk_statistics(sender, objs=None, **kwargs):
+    """Apply the counter deltas of a whole batch at once."""
+    if not objs:
+        return
+    signal = kwargs['signal']
+    sign = -1 if signal is events.rows_deleted else 1
+    if sender is Author and signal is not events.rows_updated:
+        statistics.adjust({statistics.TOTAL_AUTHORS: sign * len(objs)})
+    elif sender is Book and signal is events.rows_deleted:
+        statistics.adjust(statistics.merge_deltas(*(
+            statistics.book_deltas({'genre': obj.genre, 'is_available': obj.is_available}, -1) for obj in objs
+        )))
+    elif sender is Book:
+        created = signal is events.rows_created
+        statistics.adjust(statistics.merge_deltas(*(_book_statistics_deltas(obj, created) for obj in objs)))
+
+
+@receiver(post_save, sender=Author)
+def author_search_index(sender, instance, **kwargs):
+    """Re-index the author and, since book documents include author names, their books."""
+    backend = search.get_backend()
+    backend.reindex(Author, pks=[instance.pk])
+    backend.reindex(Book, author_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Book)
+def book_search_index(sender, instance, **kwargs):
+    search.get_backend().reindex(Book, pks=[instance.pk])
+
+
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Book)
+def search_index_remove(sender, instance, **kwargs):
+    if events.in_batch_delete(instance):
+        return
+    search.get_backend().remove(sender, [instance.pk])
+
+
+@receiver(events.rows_updated)
+def rows_updated_search_index(sender, pks, **kwargs):
+    if sender not in (Author, Book):
+        return
+    backend = search.get_backend()
+    backend.reindex(sender, pks=pks)
+    if sender is Author:
+        backend.reindex(Book, author_ids=pks)
+
+
+@receiver(events.rows_created)
+def rows_created_search_index(sender, objs, **kwargs):
+    if sender in (Author, Book):
+        search.get_backend().reindex(sender, pks=[obj.pk for obj in objs])
+
+
+@receiver(events.rows_deleted)
+def rows_deleted_search_index(sender, objs, **kwargs):
+    if sender in (Author, Book):
+        search.get_backend().remove(sender, [obj.pk for obj in objs])
@@ -0,0 +1,1343 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.pagination import PageNumberPagination
+
+from config import database, instrumentation, routers
+from config.middleware import parse_accept_language
+
+from . import caching, views
+from .models import (
+    AUTHOR_NAME_KEY, Author, Book, BookDocument, CacheStamp, LibraryStatistic, TranslationJob, TranslationMemory,
+)
+from .localization import localized
+from .services import export as catalogue_export
+from .services import read_model, statistics, synthetic, translation_memory
+from .services.auto_translate import get_translator, translate_many
+from .services.counters import refresh_books_count
+from .services.export import export_columns
+from .services.translation_jobs import process_jobs
+from .services.translators import StubTranslatorBackend
+
+STUB_BACKEND = 'apps.library.services.translators.StubTranslatorBackend'
+
+
+class CacheDisabledMixin:
+    """Test the endpoints themselves, without the response cache and conditional GETs."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.multiple(caching, API_CACHE_ENABLED=False, API_CONDITIONAL_GET_ENABLED=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+def drain_translation_jobs():
+    """Run the translation worker until the queue has nothing due."""
+    while any(process_jobs(batch_size=100)):
+        pass
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True)
+class ListQueryCountTests(CacheDisabledMixin, TestCase):
+    """The list endpoints run the same queries whatever the page size: no query per row."""
+    page_sizes = (5, 40)
+
+    @classmethod
+    def setUpTestData(cls):
+        # 200 books over 50 authors
+        authors = Author.objects.bulk_create(
+            Author(first_name=f'First{i}', last_name=f'Last{i}', email=f'author{i}@example.com')
+            for i in range(50)
+        )
+        Book.objects.bulk_create(
+            Book(
+                title=f'Book {i}', author=authors[i % len(authors)], isbn=f'{i:013d}',
+                publication_date=date(2000, 1, 1), pages=100, price='9.99',
+            )
+            for i in range(200)
+        )
+        cls.author = authors[0]
+
+    def assert_constant_queries(self, url, queries):
+        for page_size in self.page_sizes:
+            with self.subTest(url=url, page_size=page_size), \
+                    mock.patch.object(PageNumberPagination, 'page_size', page_size):
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['results']), page_size)
+
+    def test_author_list(self):
+        # COUNT(*), then the page with its books_count
+        self.assert_constant_queries('/api/authors/', 2)
+
+    def test_book_list(self):
+        # COUNT(*), then the page joined with its authors
+        self.assert_constant_queries('/api/books/', 2)
+
+    def test_author_detail(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/authors/{self.author.pk}/')
+        self.assertEqual(response.json()['books_count'], 4)
+
+    @override_settings(LIBRARY_DENORMALIZED_BOOKS_COUNT=True)
+    def test_denormalized_books_count(self):
+        # bulk_create sends no signals: start from a recount, then follow saves and deletes
+        refresh_books_count([self.author.pk])
+        book = Book.objects.create(
+            title='Another', author=self.author, publication_date=date(2001, 1, 1), pages=10, price='1.00',
+        )
+        self.assertEqual(self.client.get(f'/api/authors/{self.author.pk}/').json()['books_count'], 5)
+        book.delete()
+        self.assert_constant_queries('/api/authors/', 2)
+        self.assertEqual(self.client.get(f'/api/authors/{self.author.pk}/').json()['books_count'], 4)
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True)
+class AdminQueryCountTests(TestCase):
+    """
+    The admin pages run a fixed number of queries (see admin.py): none per
+    row, and no COUNT(*) over the table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        synthetic.generate(200, authors=40)
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'unused')
+        cls.author = Author.objects.order_by('pk').first()
+        cls.book = Book.objects.order_by('pk').first()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assert_page_queries(self, url, queries):
+        # The first request fills per-process caches (content types, permissions)
+        self.client.get(url)
+        with self.subTest(url=url), self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_author_changelist(self):
+        self.assert_page_queries('/admin/library/author/', 4)
+        self.assert_page_queries(f'/admin/library/author/?q={self.author.last_name}', 4)
+        # Sorted by books_count
+        self.assert_page_queries('/admin/library/author/?o=3', 4)
+
+    def test_author_change(self):
+        self.assert_page_queries(f'/admin/library/author/{self.author.pk}/change/', 5)
+
+    def test_book_changelist(self):
+        self.assert_page_queries('/admin/library/book/', 4)
+        self.assert_page_queries(f'/admin/library/book/?q={synthetic.WORDS["en"][0]}', 4)
+        self.assert_page_queries('/admin/library/book/?genre__exact=history', 4)
+
+    def test_book_change(self):
+        self.assert_page_queries(f'/admin/library/book/{self.book.pk}/change/', 7)
+        self.assert_page_queries('/admin/library/book/add/', 4)
+
+    def test_author_autocomplete(self):
+        self.assert_page_queries(
+            '/admin/autocomplete/?app_label=library&model_name=book&field_name=author&term=a', 4
+        )
+
+    def test_author_changelist_order_uses_index_columns(self):
+        # author_name_cursor_idx covers the English names, whatever the active language
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/admin/library/author/', HTTP_ACCEPT_LANGUAGE='hi')
+        page = [query['sql'] for query in queries if 'ORDER BY' in query['sql'] and 'library_author' in query['sql']]
+        self.assertTrue(page)
+        self.assertIn(
+            'COALESCE("library_author"."last_name_en", \'\') ASC, COALESCE("library_author"."first_name_en", \'\') ASC',
+            page[-1],
+        )
+
+
+class PaginationTests(CacheDisabledMixin, TestCase):
+    """?pagination=cursor and ?count=false (see pagination.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Author.objects.bulk_create(
+            Author(first_name=f'First{i}', last_name=f'Last{i % 4}', email=f'author{i}@example.com')
+            for i in range(12)
+        )
+        # No English names: they sort first, under the empty string
+        Author.objects.bulk_create(
+            Author(first_name_hi=f'पहला{i}', last_name_hi='अंतिम', email=f'hindi{i}@example.com')
+            for i in range(3)
+        )
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids += [row['id'] for row in data['results']]
+            url = data['next']
+        return ids
+
+    def test_author_cursor_visits_every_author_once(self):
+        expected = list(
+            Author.objects.order_by(*AUTHOR_NAME_KEY.values(), 'id').values_list('id', flat=True)
+        )
+        for page_size in (2, 5):
+            with self.subTest(page_size=page_size), \
+                    mock.patch.object(PageNumberPagination, 'page_size', page_size):
+                self.assertEqual(self.walk('/api/authors/?pagination=cursor'), expected)
+
+    def test_author_cursor_uses_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/authors/?pagination=cursor')
+        page = [query['sql'] for query in queries if 'ORDER BY' in query['sql']][-1]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {page}')
+                plan = ' '.join(str(row) for row in cursor.fetchall())
+            self.assertIn('author_name_cursor_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    @mock.patch.object(PageNumberPagination, 'page_size', 10)
+    def test_uncounted_pages(self):
+        # The page and one more row, no COUNT(*)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/authors/?count=false&fields=id')
+        data = response.json()
+        self.assertNotIn('count', data)
+        self.assertIsNone(data['previous'])
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(
+            sorted(self.walk('/api/authors/?count=false&fields=id')),
+            sorted(Author.objects.values_list('id', flat=True)),
+        )
+
+
+class FieldsetTests(CacheDisabledMixin, TestCase):
+    """?fields= and ?expand= on the list and detail endpoints (see views.FieldsetMixin)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        cls.book = Book.objects.create(
+            title='Engines', author=cls.author, publication_date=date(2000, 1, 1), pages=10, price='1.00',
+        )
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        return data['results'][0] if 'results' in data else data
+
+    def test_fields(self):
+        for url in ('/api/books/', f'/api/books/{self.book.pk}/'):
+            with self.subTest(url=url):
+                self.assertEqual(set(self.get(url, fields='id,title')), {'id', 'title'})
+                # An expandable field named in ?fields= is expanded
+                self.assertEqual(set(self.get(url, fields='id,author_details')), {'id', 'author_details'})
+        for url in ('/api/authors/', f'/api/authors/{self.author.pk}/'):
+            with self.subTest(url=url):
+                self.assertEqual(set(self.get(url, fields='email')), {'email'})
+
+    def test_expand(self):
+        self.assertIn('author_details', self.get('/api/books/', expand='author_details'))
+        # Already a field of the detail response: accepted, and the same response
+        self.assertEqual(
+            self.get(f'/api/books/{self.book.pk}/', expand='author_details'),
+            self.get(f'/api/books/{self.book.pk}/'),
+        )
+        self.assertEqual(self.client.get('/api/books/', {'expand': 'unknown'}).status_code, 400)
+
+    def test_expand_books_adds_one_query(self):
+        for url in ('/api/authors/', f'/api/authors/{self.author.pk}/'):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as plain:
+                    self.get(url)
+                with self.assertNumQueries(len(plain) + 1):
+                    expanded = self.get(url, expand='books')
+                self.assertEqual(expanded['books'], [{'id': self.book.pk, 'title': 'Engines'}])
+
+
+class AsyncEndpointTests(CacheDisabledMixin, TestCase):
+    """/api/async/ answers like the DRF endpoints (async_views.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # bulk_create: no translation jobs, the columns stay as given
+        authors = Author.objects.bulk_create(
+            Author(first_name_en=f'First{i}', last_name_en=f'Last{i}', first_name_hi=f'पहला{i}',
+                   email=f'author{i}@example.com')
+            for i in range(3)
+        )
+        Book.objects.bulk_create(
+            Book(
+                title_en=f'Book {i}', title_ta=f'நூல் {i}' if i % 2 else None, author=authors[i % 3],
+                genre='history' if i % 2 else 'fiction', publication_date=date(2000, 1, 1), pages=10, price='1.00',
+            )
+            for i in range(25)
+        )
+        refresh_books_count()
+        statistics.reconcile()
+        cls.book = Book.objects.order_by('pk').first()
+        cls.author = authors[0]
+
+    async def assert_same(self, path, lang='en'):
+        response = await self.async_client.get(f'/api/async{path}', headers={'accept-language': lang})
+        expected = await sync_to_async(self.client.get)(f'/api{path}', HTTP_ACCEPT_LANGUAGE=lang)
+        self.assertEqual(response.status_code, expected.status_code)
+        # Same bytes, but for the path of the page links
+        self.assertEqual(response.content.replace(b'/api/async/', b'/api/'), expected.content)
+        self.assertEqual(response['Content-Language'], lang)
+
+    async def test_parity(self):
+        paths = [
+            '/books/', '/books/?page=2', '/books/?genre=history', f'/books/{self.book.pk}/',
+            '/authors/', f'/authors/{self.author.pk}/', '/books/statistics/',
+        ]
+        for path in paths:
+            for lang in ('en', 'hi', 'ta'):
+                with self.subTest(path=path, lang=lang):
+                    await self.assert_same(path, lang)
+
+    async def test_errors(self):
+        # _detail's 404, an invalid page and an invalid filter
+        for path in ('/books/999999/', '/authors/999999/', '/books/?page=9', '/books/?genre=unknown'):
+            with self.subTest(path=path):
+                await self.assert_same(path)
+        response = await self.async_client.post('/api/async/books/')
+        self.assertEqual(response.status_code, 405)
+
+    async def test_export_streams_asynchronously(self):
+        response = await self.async_client.get('/api/books/export/', {'format': 'csv'})
+        self.assertTrue(response.is_async)
+        content = b''.join([block async for block in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 1 + await Book.objects.acount())
+
+
+class LocalizedListTests(CacheDisabledMixin, TestCase):
+    """
+    The values() list serializers and localized() querysets resolve
+    translations in SQL exactly like modeltranslation's descriptors.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # bulk_create: no translation jobs, the columns stay as given
+        hindi, english = Author.objects.bulk_create([
+            Author(first_name_en='Ada', last_name_en='Lovelace', first_name_hi='अदा', email='ada@example.com'),
+            Author(first_name_en='', last_name_en='Babbage', first_name_ta='சார்லஸ்', email='cb@example.com'),
+        ])
+        Book.objects.bulk_create([
+            Book(
+                title_en='Engines', title_hi='इंजन', description_ta='இயந்திரங்கள்', author=hindi,
+                publication_date=date(2000, 1, 1), pages=10, price='1.00',
+            ),
+            Book(
+                title_en='', title_ta='கணிதம்', description_en='', author=english,
+                publication_date=date(2001, 1, 1), pages=20, price='2.50',
+            ),
+        ])
+
+    def assert_same_as_descriptors(self, url):
+        for lang in ('en', 'hi', 'ta'):
+            with self.subTest(url=url, lang=lang):
+                responses = []
+                for values_rows, localized_querysets in ((True, True), (False, True), (False, False)):
+                    with mock.patch.object(views, 'VALUES_LIST_SERIALIZERS', values_rows), \
+                            mock.patch.object(views, 'LOCALIZED_QUERYSETS', localized_querysets):
+                        responses.append(self.client.get(url, HTTP_ACCEPT_LANGUAGE=lang).json())
+                # values() rows, localized() instances, then modeltranslation's own descriptors
+                self.assertEqual(responses[0], responses[2])
+                self.assertEqual(responses[1], responses[2])
+
+    def test_author_list(self):
+        self.assert_same_as_descriptors('/api/authors/')
+
+    def test_book_list(self):
+        self.assert_same_as_descriptors('/api/books/')
+
+    def test_book_list_expanded(self):
+        self.assert_same_as_descriptors('/api/books/?expand=author_details')
+
+    def test_translations_resolved_in_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/books/?fields=id,title', HTTP_ACCEPT_LANGUAGE='hi')
+        titles = {book['title'] for book in response.json()['results']}
+        self.assertEqual(titles, {'इंजन', 'கணிதம்'})
+        page = queries[-1]['sql']
+        self.assertIn('COALESCE', page)
+        self.assertNotIn('"description_en"', page)
+
+
+@override_settings(DEBUG=False)
+class InstrumentationAccessTests(TestCase):
+    """Metrics, cache stats and Server-Timing show traffic and query counts: staff only, unless DEBUG."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create_user('staff', 'staff@example.com', 'unused', is_staff=True)
+
+    def setUp(self):
+        # Every request measured, with the header enabled
+        for name, value in (('SAMPLE_RATE', 1.0), ('SERVER_TIMING', True)):
+            patcher = mock.patch.object(instrumentation, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_metrics_need_staff(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.client.force_login(self.staff)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('endpoints', response.json())
+
+    def test_cache_stats_need_staff(self):
+        self.assertEqual(self.client.get('/api/cache-stats/').status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/api/cache-stats/').status_code, 200)
+
+    def test_server_timing_only_for_staff(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/authors/'))
+        self.client.force_login(self.staff)
+        self.assertIn('Server-Timing', self.client.get('/api/authors/'))
+
+    def test_server_timing_in_debug(self):
+        with override_settings(DEBUG=True):
+            self.assertIn('Server-Timing', self.client.get('/api/authors/'))
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    """Read routing of config/routers.py, with a replica alias that is never connected to."""
+
+    def setUp(self):
+        patcher = mock.patch.object(routers, 'REPLICA_ALIASES', ('replica',))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = routers.PrimaryReplicaRouter()
+
+    def test_router(self):
+        self.assertEqual(self.router.db_for_read(Book), 'default')
+        with routers.read_from_replica():
+            self.assertEqual(self.router.db_for_read(Book), 'replica')
+            # Other apps, writes and transactions stay on the primary
+            self.assertEqual(self.router.db_for_read(get_user_model()), 'default')
+            self.assertEqual(self.router.db_for_write(Book), 'default')
+            with mock.patch.object(connections['default'], 'in_atomic_block', True):
+                self.assertEqual(self.router.db_for_read(Book), 'default')
+        self.assertIsNone(routers.current_replica())
+
+    def request(self, method, cookies=None):
+        """(replica the view read from, response) of a request through the middleware"""
+        seen = []
+
+        def view(request):
+            seen.append(routers.current_replica())
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method.lower())('/api/books/')
+        request.COOKIES.update(cookies or {})
+        response = routers.ReplicaRoutingMiddleware(view)(request)
+        self.assertIsNone(routers.current_replica())
+        return seen[0], response
+
+    def test_middleware(self):
+        self.assertEqual(self.request('GET')[0], 'replica')
+        replica, response = self.request('POST')
+        self.assertIsNone(replica)
+        # Writers read from the primary until the replicas have caught up
+        cookie = response.cookies[routers.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], routers.STICKY_SECONDS)
+        self.assertIsNone(self.request('GET', {routers.STICKY_COOKIE: '1'})[0])
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    """settings.SQLITE_PRAGMAS, applied to each new connection by config/database.py."""
+
+    def test_new_connection_is_tuned(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with tempfile.TemporaryDirectory() as directory:
+            # A connection of its own to a file: the test database may be in memory, which has no WAL
+            settings_dict = {**connection.settings_dict, 'NAME': os.path.join(directory, 'db.sqlite3')}
+            wrapper = connections['default'].__class__(settings_dict)
+            try:
+                with wrapper.cursor() as cursor:
+                    values = {}
+                    for name in ('journal_mode', 'synchronous', 'busy_timeout'):
+                        cursor.execute(f'PRAGMA {name}')
+                        values[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+        # synchronous=NORMAL reads back as 1
+        self.assertEqual(values, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000})
+
+    def test_invalid_pragmas_are_rejected(self):
+        self.assertIn(('journal_mode', 'wal'), database.sqlite_pragmas())
+        for pragmas in ({'journal_mode': 'wal; DROP TABLE library_book'}, {'cache size': 100}, {'synchronous': ''}):
+            with self.subTest(pragmas=pragmas), override_settings(SQLITE_PRAGMAS=pragmas):
+                with self.assertRaises(ImproperlyConfigured):
+                    database.sqlite_pragmas()
+
+
+class AcceptLanguageTests(TestCase):
+    """Language negotiation of AcceptLanguageMiddleware (config/middleware.py)."""
+
+    def test_parse(self):
+        cases = {
+            'hi-IN,hi;q=0.9,en;q=0.8': 'hi',
+            'ta;q=0.4, hi;q=0.8': 'hi',
+            # Ties keep the client's order
+            'hi;q=0.5, en;q=0.5': 'hi',
+            # The exact tag decides, not the first regional variant
+            'en-US;q=0.2, en;q=0.9, hi;q=0.5': 'en',
+            # '*' only weighs the languages no entry names; q=0 excludes
+            '*;q=0.5, ta;q=0.9': 'ta',
+            '*, en;q=0': 'hi',
+            'en;q=0, hi;q=0': None,
+            # An invalid q skips its entry
+            'ta;q=abc, hi;q=0.3': 'hi',
+            'fr, de': None,
+            '': None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_accept_language(header), expected)
+
+    def test_long_header_is_cut_at_an_entry(self):
+        header = ', '.join(['fr;q=0.9'] * 60 + ['ta'])
+        self.assertIsNone(parse_accept_language(header))
+        self.assertEqual(parse_accept_language('ta, ' + header), 'ta')
+
+    def test_response_headers(self):
+        response = self.client.get('/api/books/', HTTP_ACCEPT_LANGUAGE='ta-IN, en;q=0.5')
+        self.assertEqual(response['Content-Language'], 'ta')
+        self.assertIn('Accept-Language', response['Vary'])
+        # ?lang= wins over the header
+        response = self.client.get('/api/books/', {'lang': 'hi'}, HTTP_ACCEPT_LANGUAGE='ta')
+        self.assertEqual(response['Content-Language'], 'hi')
+        response = self.client.get('/api/books/', {'lang': 'fr'}, HTTP_ACCEPT_LANGUAGE='fr')
+        self.assertEqual(response['Content-Language'], 'en')
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True, AUTO_TRANSLATE_BACKEND=STUB_BACKEND)
+class ExportTests(TestCase):
+    """The catalogue export streams every book, localized like the API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # bulk_create: no translation jobs, the columns stay as given
+        ada, charles = Author.objects.bulk_create([
+            Author(first_name_en='Ada', last_name_en='Lovelace', first_name_hi='अदा', email='ada@example.com'),
+            Author(first_name_en='Charles', last_name_en='Babbage', email='cb@example.com'),
+        ])
+        Book.objects.bulk_create([
+            Book(
+                title_en=f'Book, "{i}"', title_hi=f'किताब {i}' if i % 2 else None, title_ta='நூல்' if i == 2 else None,
+                description_en=f'About {i}' if i % 3 else None, isbn=f'978000000{i:04d}',
+                author=ada if i % 2 else charles, genre='history', is_available=bool(i % 2),
+                publication_date=date(2000, 1, 1 + i), pages=10 + i, price=f'{i}.50',
+            )
+            for i in range(5)
+        ])
+        refresh_books_count()
+
+    def expected(self, lang):
+        return {
+            pk: (title, description)
+            for pk, title, description in Book.objects.annotate(
+                export_title=localized(Book, 'title', lang), export_description=localized(Book, 'description', lang),
+            ).values_list('pk', 'export_title', 'export_description')
+        }
+
+    def read(self, fmt, content):
+        if fmt == 'csv':
+            reader = csv.DictReader(io.StringIO(content))
+            return reader.fieldnames, list(reader)
+        rows = [json.loads(line) for line in content.splitlines()]
+        return list(rows[0]), rows
+
+    def test_endpoint(self):
+        header = [name for name, _expression in export_columns('en')]
+        for fmt in catalogue_export.FORMATS:
+            for lang in settings.MODELTRANSLATION_LANGUAGES:
+                with self.subTest(fmt=fmt, lang=lang):
+                    response = self.client.get('/api/books/export/', {'format': fmt, 'lang': lang})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertTrue(response.streaming)
+                    names, rows = self.read(fmt, b''.join(response.streaming_content).decode())
+                    self.assertEqual(names, header)
+                    self.assertEqual(len(rows), Book.objects.count())
+                    exported = {
+                        int(row['id']): (row['title'], row['description'] or None) for row in rows
+                    }
+                    self.assertEqual(exported, self.expected(lang))
+
+    def test_filters_and_errors(self):
+        response = self.client.get('/api/books/export/', {'available': 'true'})
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 2)
+        self.assertEqual(self.client.get('/api/books/export/', {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/books/export/', {'lang': 'fr'}).status_code, 400)
+
+    def test_command_round_trip(self):
+        columns = ['isbn', 'title_en', 'title_hi', 'title_ta', 'description_en', 'author_id',
+                   'genre', 'publication_date', 'pages', 'price', 'is_available']
+        before = sorted(Book.objects.values_list(*columns))
+        for fmt in catalogue_export.FORMATS:
+            with self.subTest(fmt=fmt), tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, f'books.{fmt}')
+                call_command(
+                    'export_catalogue', format=fmt, all_languages=True, output=path, stderr=StringIO(),
+                )
+                Book.objects.all().delete()
+                call_command('import_catalogue', path, format=fmt, no_translate=True,
+                             stdout=StringIO(), stderr=StringIO())
+                self.assertEqual(sorted(Book.objects.values_list(*columns)), before)
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True, AUTO_TRANSLATE_BACKEND=STUB_BACKEND)
+class ImportCatalogueTests(TestCase):
+
+    def setUp(self):
+        caching._cache().clear()
+        self.author = Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        self.book = Book.objects.create(
+            title='Old title', author=self.author, isbn='9780000000001',
+            publication_date=date(2000, 1, 1), pages=10, price='1.00',
+        )
+        drain_translation_jobs()
+
+    def import_csv(self, content):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as feed:
+            feed.write(content)
+        self.addCleanup(os.remove, feed.name)
+        call_command('import_catalogue', feed.name, stdout=StringIO(), stderr=StringIO())
+
+    def test_feed_translation_is_not_overwritten(self):
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title_hi, '[hi] Old title')
+        self.import_csv(
+            'title,title_hi,isbn,publication_date,pages,price,author_email\n'
+            'New title,Naya sheershak,9780000000001,2000-01-01,10,1.00,ada@example.com\n'
+        )
+        drain_translation_jobs()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title_en, 'New title')
+        self.assertEqual(self.book.title_hi, 'Naya sheershak')
+        self.assertEqual(self.book.title_ta, '[ta] New title')
+        self.assertNotIn('title_hi', self.book.translation_sources)
+
+    def test_author_responses_follow_books_count(self):
+        url = f'/api/authors/{self.author.pk}/'
+        before = self.client.get(url)
+        self.assertEqual(before.json()['books_count'], 1)
+        self.import_csv(
+            'title,isbn,publication_date,pages,price,author_email\n'
+            'Second,9780000000002,2001-01-01,20,2.00,ada@example.com\n'
+        )
+        after = self.client.get(url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.json()['books_count'], 2)
+
+    def test_only_touched_authors_are_recounted(self):
+        alan = Author.objects.create(first_name='Alan', last_name='Turing', email='alan@example.com')
+        other = Author.objects.create(first_name='Grace', last_name='Hopper', email='grace@example.com')
+        # A stale counter the import has no reason to touch
+        Author.objects.filter(pk=other.pk).update(cached_books_count=7)
+        self.import_csv(
+            'title,isbn,publication_date,pages,price,author_email\n'
+            'Old title,9780000000001,2000-01-01,10,1.00,alan@example.com\n'
+        )
+        counts = dict(Author.objects.values_list('pk', 'cached_books_count'))
+        self.assertEqual((counts[self.author.pk], counts[alan.pk], counts[other.pk]), (0, 1, 7))
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True, AUTO_TRANSLATE_BACKEND=STUB_BACKEND)
+class TranslationJobTests(TestCase):
+
+    def setUp(self):
+        # The rows of the translation memory roll back with each test; its per-process LRU does not
+        translation_memory.clear_local()
+        self.author = Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        drain_translation_jobs()
+
+    def create_book(self, **kwargs):
+        return Book.objects.create(**{
+            'title': 'Engines', 'author': self.author, 'publication_date': date(2000, 1, 1),
+            'pages': 10, 'price': '1.00', **kwargs,
+        })
+
+    def test_save_queues_jobs_for_the_worker(self):
+        book = self.create_book()
+        # The save itself translates nothing
+        self.assertIsNone(Book.objects.get(pk=book.pk).title_hi)
+        self.assertEqual(
+            set(TranslationJob.objects.filter(model_label='library.book').values_list('field', 'language')),
+            {('title', 'hi'), ('title', 'ta')},
+        )
+        drain_translation_jobs()
+        book.refresh_from_db()
+        self.assertEqual((book.title_hi, book.title_ta), ('[hi] Engines', '[ta] Engines'))
+        self.assertEqual(
+            set(TranslationJob.objects.values_list('status', flat=True)), {TranslationJob.STATUS_DONE},
+        )
+
+    def test_english_edit_is_translated_again(self):
+        book = self.create_book()
+        drain_translation_jobs()
+        book = Book.objects.get(pk=book.pk)
+        book.title_en = 'Analytical Engines'
+        book.save()
+        drain_translation_jobs()
+        book.refresh_from_db()
+        self.assertEqual((book.title_hi, book.title_ta), ('[hi] Analytical Engines', '[ta] Analytical Engines'))
+
+    def test_human_translation_is_kept(self):
+        book = self.create_book()
+        drain_translation_jobs()
+        book = Book.objects.get(pk=book.pk)
+        book.title_hi = 'Yantra'
+        book.save()
+        book = Book.objects.get(pk=book.pk)
+        book.title_en = 'Analytical Engines'
+        book.save()
+        drain_translation_jobs()
+        book.refresh_from_db()
+        self.assertEqual((book.title_hi, book.title_ta), ('Yantra', '[ta] Analytical Engines'))
+
+    def test_translation_written_while_queued_is_kept(self):
+        book = self.create_book()
+        book = Book.objects.get(pk=book.pk)
+        book.title_hi = 'Yantra'
+        book.save()
+        drain_translation_jobs()
+        book.refresh_from_db()
+        self.assertEqual((book.title_hi, book.title_ta), ('Yantra', '[ta] Engines'))
+
+    def pending_jobs(self):
+        return set(
+            TranslationJob.objects.filter(model_label='library.book', status=TranslationJob.STATUS_PENDING)
+            .values_list('field', 'language')
+        )
+
+    def test_untranslated_fields_queue_nothing(self):
+        book = self.create_book(description='About engines')
+        drain_translation_jobs()
+        with mock.patch.object(StubTranslatorBackend, 'translate_batch') as translate:
+            book = Book.objects.get(pk=book.pk)
+            book.price = '2.00'
+            book.is_available = False
+            book.save()
+            response = self.client.patch(
+                '/api/books/bulk/', [{'id': book.pk, 'price': '3.00'}], content_type='application/json',
+            )
+            self.assertEqual(response.json()['updated'], [book.pk])
+            drain_translation_jobs()
+        translate.assert_not_called()
+        self.assertEqual(self.pending_jobs(), set())
+
+    def test_only_the_edited_field_is_queued(self):
+        book = self.create_book(description='About engines')
+        drain_translation_jobs()
+        book = Book.objects.get(pk=book.pk)
+        self.assertEqual(set(book.translation_sources), {'title_hi', 'title_ta', 'description_hi', 'description_ta'})
+        book.title_en = 'Analytical Engines'
+        book.save()
+        self.assertEqual(self.pending_jobs(), {('title', 'hi'), ('title', 'ta')})
+
+    def test_failed_job_backs_off_then_retries(self):
+        book = self.create_book()
+        with mock.patch.object(StubTranslatorBackend, 'translate_batch', side_effect=RuntimeError('down')):
+            self.assertEqual(process_jobs(), (0, 2))
+        job = TranslationJob.objects.get(model_label='library.book', language='hi')
+        self.assertEqual((job.status, job.attempts, job.last_error), (TranslationJob.STATUS_PENDING, 1, 'down'))
+        self.assertGreater(job.available_at, timezone.now())
+        # Not due yet
+        self.assertEqual(process_jobs(), (0, 0))
+        TranslationJob.objects.update(available_at=timezone.now())
+        self.assertEqual(process_jobs(), (2, 0))
+        book.refresh_from_db()
+        self.assertEqual(book.title_hi, '[hi] Engines')
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True, AUTO_TRANSLATE_BACKEND=STUB_BACKEND)
+class ReadModelTests(CacheDisabledMixin, TestCase):
+    """The read model serves the same bytes as the serializers, and follows every write."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(read_model, 'READ_MODEL_ENABLED', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.author = Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        self.book = Book.objects.create(
+            title='Engines', author=self.author, publication_date=date(2000, 1, 1), pages=10, price='1.00',
+        )
+        drain_translation_jobs()
+
+    def assert_same_as_serializers(self):
+        for url in ('/api/books/', f'/api/books/{self.book.pk}/'):
+            for lang in ('en', 'hi'):
+                with self.subTest(url=url, lang=lang), \
+                        mock.patch.object(read_model, 'fragments', wraps=read_model.fragments) as fragments:
+                    served = self.client.get(url, HTTP_ACCEPT_LANGUAGE=lang).content
+                    fragments.assert_called_once()
+                    with mock.patch.object(read_model, 'READ_MODEL_ENABLED', False):
+                        self.assertEqual(served, self.client.get(url, HTTP_ACCEPT_LANGUAGE=lang).content)
+
+    def test_follows_writes(self):
+        self.assertEqual(BookDocument.objects.filter(book=self.book).count(), len(read_model.languages()))
+        self.assert_same_as_serializers()
+        # A rename is embedded in the documents of the author's books
+        author = Author.objects.get(pk=self.author.pk)
+        author.last_name = 'King'
+        author.save()
+        self.assert_same_as_serializers()
+        # books_count is merged in at read time
+        Book.objects.create(
+            title='Notes', author=self.author, publication_date=date(2001, 1, 1), pages=10, price='1.00',
+        )
+        self.assert_same_as_serializers()
+        self.assertEqual(
+            self.client.get(f'/api/books/{self.book.pk}/').json()['author_details']['books_count'], 2,
+        )
+        book_id = self.book.pk
+        self.book.delete()
+        self.assertFalse(BookDocument.objects.filter(book_id=book_id).exists())
+
+    def test_unrelated_author_edit_writes_nothing(self):
+        author = Author.objects.get(pk=self.author.pk)
+        author.birth_date = date(1815, 12, 10)
+        with mock.patch.object(read_model, 'refresh') as refresh:
+            author.save()
+        refresh.assert_not_called()
+
+    def test_missing_documents_are_rendered_not_stored(self):
+        BookDocument.objects.all().delete()
+        self.assert_same_as_serializers()
+        self.assertFalse(BookDocument.objects.exists())
+        read_model.rebuild()
+        self.assertEqual(BookDocument.objects.count(), len(read_model.languages()))
+
+
+@override_settings(AUTO_TRANSLATE_BACKEND=STUB_BACKEND)
+class TranslationMemoryTests(TestCase):
+    """Only texts missing from the LRU and the table reach the translator."""
+
+    def setUp(self):
+        translation_memory.clear_local()
+        self.backend = get_translator()
+        self.backend.calls.clear()
+
+    def counters(self):
+        stats = translation_memory.stats()
+        return {name: stats[name] for name in ('lru_hits', 'db_hits', 'misses', 'stores')}
+
+    def assert_counted(self, before, **deltas):
+        after = self.counters()
+        self.assertEqual({name: after[name] - before[name] for name in after}, {
+            'lru_hits': 0, 'db_hits': 0, 'misses': 0, 'stores': 0, **deltas,
+        })
+
+    def test_repeated_text_is_translated_once(self):
+        before = self.counters()
+        translate_many(['Hello', 'World', 'Hello'], 'hi')
+        self.assertEqual(self.backend.calls, [('hi', ['Hello', 'World'])])
+        self.assert_counted(before, misses=2, stores=2)
+
+        before = self.counters()
+        self.assertEqual(translate_many(['Hello', 'Again'], 'hi'), {'Hello': '[hi] Hello', 'Again': '[hi] Again'})
+        self.assertEqual(self.backend.calls[1:], [('hi', ['Again'])])
+        self.assert_counted(before, lru_hits=1, misses=1, stores=1)
+        # Another language is another entry
+        translate_many(['Hello'], 'ta')
+        self.assertEqual(self.backend.calls[2:], [('ta', ['Hello'])])
+
+    def test_table_after_an_lru_miss(self):
+        translate_many(['Hello', 'World'], 'hi')
+        # As in a fresh process: the LRU is empty, the table is not
+        translation_memory.clear_local()
+        before = self.counters()
+        with self.assertNumQueries(1):
+            found = translation_memory.lookup_many(['Hello', 'World', 'Unknown'], 'en', 'hi')
+        self.assertEqual(found, {'Hello': '[hi] Hello', 'World': '[hi] World'})
+        self.assert_counted(before, db_hits=2, misses=1)
+        # Remembered again in the LRU
+        before = self.counters()
+        with self.assertNumQueries(0):
+            translation_memory.lookup_many(['Hello', 'World'], 'en', 'hi')
+        self.assert_counted(before, lru_hits=2)
+        self.assertEqual(len(self.backend.calls), 1)
+
+    @mock.patch.object(translation_memory, 'LRU_SIZE', 2)
+    def test_lru_eviction(self):
+        translation_memory.store_many({'one': '1', 'two': '2'}, 'en', 'hi')
+        # 'one' is used, so 'two' is the least recently used entry when 'three' comes in
+        translation_memory.lookup_many(['one'], 'en', 'hi')
+        translation_memory.store_many({'three': '3'}, 'en', 'hi')
+        self.assertEqual(translation_memory.stats()['lru_size'], 2)
+        before = self.counters()
+        self.assertEqual(translation_memory.lookup_many(['one', 'two', 'three'], 'en', 'hi'),
+                         {'one': '1', 'two': '2', 'three': '3'})
+        self.assert_counted(before, lru_hits=2, db_hits=1)
+
+    @mock.patch.object(translation_memory, 'TTL', 60)
+    def test_ttl(self):
+        translation_memory.store_many({'old': 'O', 'new': 'N'}, 'en', 'hi')
+        TranslationMemory.objects.filter(source_text='old').update(
+            created_at=timezone.now() - timedelta(seconds=120),
+        )
+        # The table ignores expired rows
+        translation_memory.clear_local()
+        self.assertEqual(translation_memory.lookup_many(['old', 'new'], 'en', 'hi'), {'new': 'N'})
+        # and the LRU its expired entries
+        later = timezone.now() + timedelta(seconds=120)
+        with mock.patch.object(translation_memory.timezone, 'now', return_value=later):
+            self.assertEqual(translation_memory.lookup_many(['new'], 'en', 'hi'), {})
+        self.assertEqual(translation_memory.stats()['lru_size'], 0)
+        # prune removes expired rows
+        self.assertEqual(translation_memory.prune(), 1)
+        self.assertEqual(list(TranslationMemory.objects.values_list('source_text', flat=True)), ['new'])
+
+    @mock.patch.object(translation_memory, 'MAX_ENTRIES', 2)
+    def test_prune_keeps_the_newest_rows(self):
+        translation_memory.store_many({'a': 'A', 'b': 'B', 'c': 'C'}, 'en', 'hi')
+        for age, text in enumerate(['c', 'b', 'a']):
+            TranslationMemory.objects.filter(source_text=text).update(
+                created_at=timezone.now() - timedelta(minutes=age),
+            )
+        self.assertEqual(translation_memory.prune(), 1)
+        self.assertEqual(sorted(TranslationMemory.objects.values_list('source_text', flat=True)), ['b', 'c'])
+        self.assertEqual(translation_memory.stats()['lru_size'], 0)
+
+
+@override_settings(AUTO_TRANSLATE_BACKEND=STUB_BACKEND)
+class TranslationBatchTests(TestCase):
+    """However many rows and fields a write touches, each target language costs one backend call."""
+
+    def setUp(self):
+        translation_memory.clear_local()
+        self.author = Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        drain_translation_jobs()
+        self.backend = get_translator()
+        self.backend.calls.clear()
+
+    def book_items(self):
+        return [
+            {
+                'title': f'Book {i}', 'description': f'About {i}', 'author': self.author.pk,
+                'publication_date': '2001-01-01', 'pages': 10, 'price': '1.00',
+            }
+            for i in range(3)
+        ] + [{
+            # A text shared with another row is sent once
+            'title': 'Book 0', 'description': 'About 0', 'author': self.author.pk,
+            'publication_date': '2001-01-01', 'pages': 10, 'price': '1.00',
+        }]
+
+    def assert_one_call_per_language(self):
+        texts = sorted({f'Book {i}' for i in range(3)} | {f'About {i}' for i in range(3)})
+        self.assertEqual(sorted(lang for lang, _texts in self.backend.calls), ['hi', 'ta'])
+        for lang, batch in self.backend.calls:
+            self.assertEqual(sorted(batch), texts)
+        self.assertEqual(
+            set(Book.objects.values_list('title_hi', flat=True)), {f'[hi] Book {i}' for i in range(3)},
+        )
+
+    @override_settings(AUTO_TRANSLATE_ASYNC=False)
+    def test_bulk_write(self):
+        response = self.client.post('/api/books/bulk/', self.book_items(), content_type='application/json')
+        self.assertEqual(len(response.json()['created']), 4)
+        self.assert_one_call_per_language()
+
+    @override_settings(AUTO_TRANSLATE_ASYNC=True)
+    def test_worker(self):
+        for item in self.book_items():
+            Book.objects.create(**{**item, 'author': self.author})
+        self.assertEqual(self.backend.calls, [])
+        process_jobs(batch_size=100)
+        self.assert_one_call_per_language()
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True, AUTO_TRANSLATE_BACKEND=STUB_BACKEND)
+class ResponseCacheTests(TestCase):
+    """Writes, wherever they come from, retire cached responses and change ETags."""
+
+    def setUp(self):
+        caching._cache().clear()
+        translation_memory.clear_local()
+        self.author = Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        self.book = Book.objects.create(
+            title='Engines', author=self.author, publication_date=date(2000, 1, 1), pages=10, price='1.00',
+        )
+
+    def test_cached_until_written(self):
+        url = f'/api/books/{self.book.pk}/'
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/api/books/')['X-Cache'], 'MISS')
+
+        response = self.client.patch(url, {'price': '2.50'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second['X-Cache'], 'MISS')
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.json()['price'], '2.50')
+        self.assertEqual(self.client.get('/api/books/')['X-Cache'], 'MISS')
+
+    def test_translation_worker_retires_responses(self):
+        url = f'/api/books/{self.book.pk}/'
+        before = self.client.get(url, HTTP_ACCEPT_LANGUAGE='hi')
+        self.assertEqual(before.json()['title'], 'Engines')
+        # The worker only writes the database: the stamps it bumps are there for every process
+        with mock.patch.object(caching, '_cache', side_effect=AssertionError('worker used the cache')):
+            drain_translation_jobs()
+        after = self.client.get(url, HTTP_ACCEPT_LANGUAGE='hi', HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.json()['title'], '[hi] Engines')
+
+    def test_author_follows_its_books(self):
+        url = f'/api/authors/{self.author.pk}/'
+        before = self.client.get(url)
+        Book.objects.create(
+            title='Notes', author=self.author, publication_date=date(2001, 1, 1), pages=10, price='1.00',
+        )
+        after = self.client.get(url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.json()['books_count'], 2)
+
+    def test_change_within_the_second_of_last_modified(self):
+        url = f'/api/books/{self.book.pk}/'
+        second = 1_800_000_000
+
+        def at(offset):
+            return mock.patch('time.time_ns', return_value=int((second + offset) * 1_000_000_000))
+
+        with at(0.3):
+            caching.invalidate(Book, [self.book.pk])
+        # The second of the change is not over: no Last-Modified yet
+        with at(0.5):
+            self.assertNotIn('Last-Modified', self.client.get(url))
+            # What a floored stamp would have sent
+            stale = http_date(second)
+        with at(0.7):
+            Book.objects.filter(pk=self.book.pk).update(price='2.00')
+            caching.invalidate(Book, [self.book.pk])
+        with at(0.9):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=stale)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['price'], '2.00')
+
+        with at(2):
+            response = self.client.get(url)
+            self.assertEqual(response['Last-Modified'], http_date(second + 1))
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_reads_write_no_stamps(self):
+        stamps = CacheStamp.objects.count()
+        for url in ('/api/books/', f'/api/books/{self.book.pk}/', '/api/books/999999/',
+                    '/api/books/nonexistent/', f'/api/books/{"x" * 200}/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn(response.status_code, (200, 404))
+                self.assertEqual(CacheStamp.objects.count(), stamps)
+        # A lookup that is no pk is not cached
+        self.assertNotIn('X-Cache', self.client.get('/api/books/nonexistent/'))
+
+    def test_vary(self):
+        response = self.client.get(f'/api/books/{self.book.pk}/')
+        not_modified = self.client.get(f'/api/books/{self.book.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        for response in (response, not_modified):
+            vary = response['Vary'].replace(' ', '').split(',')
+            self.assertIn('Accept', vary)
+            self.assertIn('Accept-Language', vary)
+
+
+@override_settings(AUTO_TRANSLATE_BACKEND=STUB_BACKEND)
+class BackfillTranslationsTests(TransactionTestCase):
+    # Committed rows: the command translates in worker threads with their own connections
+
+    def setUp(self):
+        translation_memory.clear_local()
+        # bulk_create sends no signals: rows with English text only
+        author = Author.objects.bulk_create([
+            Author(first_name_en='Ada', last_name_en='Lovelace', email='ada@example.com'),
+        ])[0]
+        self.books = Book.objects.bulk_create(
+            Book(title_en=f'Book {i}', author=author, publication_date=date(2000, 1, 1), pages=10, price='1.00')
+            for i in range(5)
+        )
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+
+    def backfill(self, *args):
+        call_command(
+            'backfill_translations', '--workers', '1', '--chunk-size', '2', '--checkpoint', self.checkpoint,
+            *args, stdout=StringIO(),
+        )
+
+    def titles(self):
+        return list(Book.objects.order_by('pk').values_list('title_hi', flat=True))
+
+    def test_fills_empty_columns(self):
+        self.backfill()
+        self.assertEqual(self.titles(), [f'[hi] Book {i}' for i in range(5)])
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_failed_rows_are_retried(self):
+        with mock.patch.object(StubTranslatorBackend, 'translate_batch', side_effect=RuntimeError('down')):
+            self.backfill()
+        # The English text stands in, marked as failed
+        self.assertEqual(self.titles(), [f'Book {i}' for i in range(5)])
+        self.backfill()
+        self.assertEqual(self.titles(), [f'[hi] Book {i}' for i in range(5)])
+
+    def test_resume_retries_failed_rows_before_the_checkpoint(self):
+        with mock.patch.object(StubTranslatorBackend, 'translate_batch', side_effect=RuntimeError('down')):
+            self.backfill()
+        with open(self.checkpoint, 'w') as checkpoint:
+            checkpoint.write(f'{{"library.book": {self.books[-1].pk}}}')
+        self.backfill('--resume')
+        self.assertEqual(self.titles(), [f'[hi] Book {i}' for i in range(5)])
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True)
+class StatisticsTests(TestCase):
+    """The counters adjusted by signals always equal a full statistics.reconcile()."""
+
+    def setUp(self):
+        self.authors = [
+            Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com'),
+            Author.objects.create(first_name='Alan', last_name='Turing', email='alan@example.com'),
+        ]
+
+    def create_book(self, **kwargs):
+        return Book.objects.create(**{
+            'title': 'Engines', 'author': self.authors[0], 'publication_date': date(2000, 1, 1),
+            'pages': 10, 'price': '1.00', **kwargs,
+        })
+
+    def assert_reconciled(self):
+        counters = {key: value for key, value in LibraryStatistic.objects.values_list('key', 'value') if value}
+        self.assertEqual(counters, {key: value for key, value in statistics.reconcile().items() if value})
+
+    def test_saves_and_deletes(self):
+        book = self.create_book(genre='history')
+        self.create_book(genre='fiction', is_available=False)
+        self.assert_reconciled()
+        book = Book.objects.get(pk=book.pk)
+        book.genre = 'mystery'
+        book.is_available = False
+        book.save()
+        self.assert_reconciled()
+        # A save that touches neither genre nor availability
+        book = Book.objects.get(pk=book.pk)
+        book.price = '3.00'
+        book.save()
+        self.assert_reconciled()
+        book.delete()
+        self.authors[1].delete()
+        self.assert_reconciled()
+
+    def test_bulk_endpoints(self):
+        response = self.client.post('/api/books/bulk/', [
+            {'title': f'Book {i}', 'author': self.authors[i % 2].pk, 'genre': genre,
+             'publication_date': '2000-01-01', 'pages': 10, 'price': '1.00', 'is_available': i % 3 != 0}
+            for i, genre in enumerate(['history', 'fiction', 'fiction', 'sci_fi'])
+        ], content_type='application/json')
+        created = response.json()['created']
+        self.assertEqual(len(created), 4)
+        self.assert_reconciled()
+        self.client.patch('/api/books/bulk/', [
+            {'id': created[0], 'genre': 'fiction'}, {'id': created[1], 'is_available': False},
+        ], content_type='application/json')
+        self.assert_reconciled()
+        self.client.delete('/api/books/bulk/', {'ids': created[1:3]}, content_type='application/json')
+        self.assert_reconciled()
+        self.client.post('/api/authors/bulk/', [
+            {'first_name': 'Grace', 'last_name': 'Hopper', 'email': 'grace@example.com'},
+        ], content_type='application/json')
+        self.assert_reconciled()
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True)
+class SearchTests(TestCase):
+    """?search= goes through the full-text index, which follows every kind of write."""
+
+    def setUp(self):
+        self.author = Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        self.book = Book.objects.create(
+            title_en='Analytical Engines', title_hi='विश्लेषणात्मक इंजन', author=self.author,
+            publication_date=date(2000, 1, 1), pages=10, price='1.00',
+        )
+
+    def found(self, collection, term):
+        response = self.client.get(f'/api/{collection}/', {'search': term})
+        return [item['id'] for item in response.json()['results']]
+
+    def test_every_language(self):
+        self.assertEqual(self.found('books', 'analytical'), [self.book.pk])
+        # A Hindi title from an English request, and the other way round
+        self.assertEqual(self.found('books', 'विश्लेषण'), [self.book.pk])
+        self.assertEqual(
+            [item['id'] for item in self.client.get(
+                '/api/books/', {'search': 'engines'}, HTTP_ACCEPT_LANGUAGE='hi',
+            ).json()['results']],
+            [self.book.pk],
+        )
+        self.assertEqual(self.found('books', 'lovelace'), [self.book.pk])
+        self.assertEqual(self.found('authors', 'lovelace'), [self.author.pk])
+        self.assertEqual(self.found('books', 'difference'), [])
+
+    def test_saves_and_deletes(self):
+        book = Book.objects.get(pk=self.book.pk)
+        book.title_en = 'Difference Engines'
+        book.save()
+        self.assertEqual(self.found('books', 'difference'), [book.pk])
+        self.assertEqual(self.found('books', 'analytical'), [])
+        # Books are indexed with their author's name
+        author = Author.objects.get(pk=self.author.pk)
+        author.last_name_en = 'Byron'
+        author.save()
+        self.assertEqual(self.found('books', 'byron'), [book.pk])
+        self.assertEqual(self.found('authors', 'lovelace'), [])
+        book.delete()
+        self.assertEqual(self.found('books', 'difference'), [])
+
+    def test_bulk_writes(self):
+        response = self.client.post('/api/books/bulk/', [
+            {'title': 'Notes on Babbage', 'author': self.author.pk,
+             'publication_date': '2001-01-01', 'pages': 10, 'price': '1.00'},
+        ], content_type='application/json')
+        pk = response.json()['created'][0]
+        self.assertEqual(self.found('books', 'babbage'), [pk])
+        self.client.patch(
+            '/api/books/bulk/', [{'id': pk, 'title': 'Notes on the Engine'}], content_type='application/json',
+        )
+        self.assertEqual(self.found('books', 'babbage'), [])
+        self.assertEqual(self.found('books', 'notes on the'), [pk])
+        self.client.delete('/api/books/bulk/', {'ids': [pk]}, content_type='application/json')
+        self.assertEqual(self.found('books', 'notes'), [])
+
+
+@override_settings(AUTO_TRANSLATE_ASYNC=True)
+class BulkWriteTests(TestCase):
+    """The bulk endpoints validate per item, and keep everything signals maintain in step."""
+
+    def setUp(self):
+        self.authors = [
+            Author.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com'),
+            Author.objects.create(first_name='Alan', last_name='Turing', email='alan@example.com'),
+        ]
+        self.book = Book.objects.create(
+            title='Engines', author=self.authors[0], isbn='9780000000001',
+            publication_date=date(2000, 1, 1), pages=10, price='1.00',
+        )
+
+    def book_item(self, title, author=None, **kwargs):
+        return {
+            'title': title, 'author': (author or self.authors[0]).pk,
+            'publication_date': '2001-01-01', 'pages': 10, 'price': '1.00', **kwargs,
+        }
+
+    def send(self, method, data):
+        return getattr(self.client, method)('/api/books/bulk/', data, content_type='application/json')
+
+    def assert_consistent(self):
+        """books_count, its cached column, the statistics and the index all match the tables."""
+        for author in Author.objects.all():
+            count = author.books.count()
+            self.assertEqual(author.cached_books_count, count)
+            self.assertEqual(self.client.get(f'/api/authors/{author.pk}/').json()['books_count'], count)
+        counters = {key: value for key, value in LibraryStatistic.objects.values_list('key', 'value') if value}
+        self.assertEqual(counters, {key: value for key, value in statistics.reconcile().items() if value})
+        found = self.client.get('/api/books/', {'search': 'bulk'}).json()['results']
+        self.assertEqual(
+            sorted(item['id'] for item in found),
+            sorted(Book.objects.filter(title_en__icontains='bulk').values_list('pk', flat=True)),
+        )
+
+    def test_per_item_errors(self):
+        response = self.send('post', [
+            self.book_item('Bulk one', isbn='9780000000002'),
+            self.book_item('Bulk two', pages=0),
+            self.book_item('Bulk three', isbn='9780000000001'),  # taken by an existing book
+            self.book_item('Bulk four', isbn='9780000000002'),  # taken earlier in the batch
+            'not an object',
+            self.book_item('Bulk five', author=self.authors[1]),
+        ])
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(len(body['created']), 2)
+        self.assertEqual([error['index'] for error in body['errors']], [1, 2, 3, 4])
+        self.assertIn('pages', body['errors'][0]['errors'])
+        self.assertIn('isbn', body['errors'][1]['errors'])
+        self.assertIn('isbn', body['errors'][2]['errors'])
+        self.assert_consistent()
+
+    def test_nothing_valid_is_400(self):
+        response = self.send('post', [self.book_item('Bulk', pages=0)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_author_emails_are_unique_in_the_batch(self):
+        response = self.client.post('/api/authors/bulk/', [
+            {'first_name': 'Grace', 'last_name': 'Hopper', 'email': 'grace@example.com'},
+            {'first_name': 'Grace', 'last_name': 'Again', 'email': 'grace@example.com'},
+            {'first_name': 'Ada', 'last_name': 'Again', 'email': 'ada@example.com'},
+        ], content_type='application/json')
+        body = response.json()
+        self.assertEqual(len(body['created']), 1)
+        self.assertEqual([error['index'] for error in body['errors']], [1, 2])
+
+    def test_update_and_delete(self):
+        created = self.send('post', [
+            self.book_item(f'Bulk {i}', isbn=f'978000000001{i}') for i in range(4)
+        ]).json()['created']
+        self.assert_consistent()
+
+        response = self.send('patch', [
+            {'id': created[0], 'author': self.authors[1].pk, 'genre': 'history'},
+            {'id': created[1], 'isbn': '9780000000001'},  # taken
+            {'id': 0, 'title': 'Missing'},
+            {'id': created[2], 'title': 'Renamed', 'is_available': False},
+        ])
+        body = response.json()
+        self.assertEqual(body['updated'], [created[0], created[2]])
+        self.assertEqual([error['index'] for error in body['errors']], [1, 2])
+        self.assert_consistent()
+
+        # One QuerySet.delete(): its post_delete receivers leave the rows to rows_deleted
+        response = self.send('delete', {'ids': [created[0], created[1], 0]})
+        body = response.json()
+        self.assertEqual(sorted(body['deleted']), sorted(created[:2]))
+        self.assertEqual([error['id'] for error in body['errors']], [0])
+        self.assertFalse(Book.objects.filter(pk__in=created[:2]).exists())
+        self.assert_consistent()
+
+    def test_authors_with_books_are_not_deleted(self):
+        response = self.client.delete(
+            '/api/authors/bulk/', {'ids': [author.pk for author in self.authors]}, content_type='application/json',
+        )
+        body = response.json()
+        self.assertEqual(body['deleted'], [self.authors[1].pk])
+        self.assertEqual([error['id'] for error in body['errors']], [self.authors[0].pk])
+        self.assert_consistent()
@@ -7,6 +7,7 @@ Registers which model fields are translatable. Modeltranslation will create
 language (set by Accept-Language middleware).
 """
 from modeltranslation.translator import TranslationOptions, register
+from .localization import install_descriptors
 from .models import Author, Book
 
 
@@ -20,3 +21,8 @@ class AuthorTranslationOptions(TranslationOptions):
 class BookTranslationOptions(TranslationOptions):
     fields = ('title', 'description')
     required_languages = ('en',)
+
+
+# Lets instances loaded with .localized() skip the Python fallback (see localization.py)
+install_descriptors(Author)
+install_descriptors(Book)
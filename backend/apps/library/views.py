@@ -1,17 +1,262 @@
-from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework import serializers, viewsets, status
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Prefetch
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import translation
+from django.views.decorators.http import require_GET
 
-from .models import Author, Book
+from config.middleware import LANGUAGE_QUERY_PARAMETER
+
+from . import caching
+from .caching import CachedResponseMixin
+from .models import AUTHOR_NAME_KEY, Author, Book, TranslationJob
+from .services import bulk, read_model
+from .services import export as catalogue_export
+from .services import statistics as library_statistics
 from .serializers import (
-    AuthorSerializer, AuthorListSerializer,
-    BookSerializer, BookListSerializer, BookCreateUpdateSerializer
+    AuthorSerializer, AuthorListSerializer, AuthorListValuesSerializer, AuthorBulkSerializer,
+    BookSerializer, BookListSerializer, BookListValuesSerializer, BookCreateUpdateSerializer, BookBulkSerializer,
+    TranslationJobSerializer
 )
-from .filters import AuthorFilter, BookFilter
+from .filters import AuthorFilter, BookFilter, TranslationJobFilter
+
+BULK_MAX_ITEMS = getattr(settings, 'LIBRARY_BULK_MAX_ITEMS', 10000)
+VALUES_LIST_SERIALIZERS = getattr(settings, 'LIBRARY_VALUES_LIST_SERIALIZERS', True)
+LOCALIZED_QUERYSETS = getattr(settings, 'LIBRARY_LOCALIZED_QUERYSETS', True)
+
+
+def cursor_fields(view, queryset):
+    """
+    The view's cursor pagination keys that queryset selects: its columns and,
+    when paginating by cursor, the annotated keys (see AuthorViewSet).
+    """
+    model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+    names = (field.lstrip('-') for field in getattr(view, 'cursor_ordering', None) or ())
+    return [name for name in names if name in model_fields or name in queryset.query.annotations]
+
+
+class LocalizedReadMixin:
+    """
+    Load instances for read actions with .localized() (see
+    LocalizedQuerySet), so translated fields come resolved from the database.
+    """
+    localized_actions = ('list', 'retrieve')
+
+    def localize(self, queryset):
+        if not LOCALIZED_QUERYSETS:
+            return queryset
+        # Cursor pagination reads its ordering columns from the instances
+        return queryset.localized(keep=[field.lstrip('-') for field in getattr(self, 'cursor_ordering', None) or ()])
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # The values() list path resolves translations itself
+        if self.action in self.localized_actions and not self.uses_values_serializer():
+            return self.localize(queryset)
+        return queryset
+
+
+class FieldsetMixin:
+    """
+    ?fields=id,title,price keeps only the named fields of list/retrieve
+    responses, ?expand=author_details adds the serializer's expandable
+    fields (see SparseFieldsetMixin); expanding a field that is already
+    there is accepted and changes nothing. The queryset follows: only() the
+    columns the output reads, and prune_queryset() drops or adds relations
+    and annotations.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    fieldset_actions = ('list', 'retrieve')
+    # {output field: model fields it reads}; default: the model field of that name, if any
+    fieldset_columns = {}
+
+    def query_names(self, param):
+        return [
+            name.strip() for value in self.request.query_params.getlist(param)
+            for name in value.split(',') if name.strip()
+        ]
+
+    def get_fieldset(self):
+        """(requested fields or None, expanded fields, output fields or None) of the request"""
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = (None, set(), None)
+            if self.action in self.fieldset_actions:
+                self._fieldset = self.parse_fieldset()
+        return self._fieldset
+
+    def parse_fieldset(self):
+        serializer_class = self.get_serializer_class()
+        default = list(serializer_class().fields)
+        expandable = getattr(serializer_class, 'expandable_fields', {})
+        fields = self.query_names(self.fields_query_param) or None
+        expand = set(self.query_names(self.expand_query_param))
+
+        errors = {}
+        unknown = [name for name in fields or () if name not in default and name not in expandable]
+        if unknown:
+            errors[self.fields_query_param] = [
+                f'Unknown field(s): {", ".join(unknown)}. Available: {", ".join([*default, *expandable])}.'
+            ]
+        # Expanding a field the serializer always includes changes nothing
+        expand -= set(default)
+        unknown = sorted(expand - set(expandable))
+        if unknown:
+            errors[self.expand_query_param] = [
+                f'Cannot expand: {", ".join(unknown)}. Expandable: {", ".join(expandable) or "none"}.'
+            ]
+        if errors:
+            raise serializers.ValidationError(errors)
+        # An expandable field named in ?fields= is expanded
+        expand |= {name for name in fields or () if name in expandable and name not in default}
+        output = set(fields) if fields is not None else {*default, *expand}
+        return (set(fields) if fields is not None else None), expand, output
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fields, expand, _output = self.get_fieldset()
+        context.update(fields=fields, expand=expand)
+        return context
+
+    def uses_values_serializer(self):
+        # Values serializers have no nested objects
+        return super().uses_values_serializer() and not self.get_fieldset()[1]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        output = self.get_fieldset()[2]
+        # The values() list path selects its own columns
+        if output is None or self.uses_values_serializer():
+            return queryset
+        return self.prune_queryset(queryset, output)
+
+    def prune_queryset(self, queryset, output):
+        """Load only the columns the output fields read (plus the cursor pagination key)."""
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = {'pk', *(name for name in cursor_fields(self, queryset) if name in model_fields)}
+        for name in output:
+            columns.update(self.fieldset_columns.get(name, [name] if name in model_fields else []))
+        return queryset.only(*columns)
+
+
+class ValuesListMixin:
+    """
+    Serve the list action from values() rows through values_serializer_class
+    (see ValuesSerializer) instead of model instances and a ModelSerializer.
+    """
+    values_serializer_class = None
+
+    def uses_values_serializer(self):
+        return self.action == 'list' and VALUES_LIST_SERIALIZERS and self.values_serializer_class is not None
+
+    def list(self, request, *args, **kwargs):
+        if not self.uses_values_serializer():
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class(context=self.get_serializer_context())
+        queryset = self.filter_queryset(self.get_queryset())
+        # Cursor pagination reads its ordering fields from the rows.
+        queryset = serializer.select(queryset, extra=cursor_fields(self, queryset))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(queryset))
+
+
+class ReadModelMixin:
+    """
+    Serve list/retrieve from the pre-rendered documents of the read model
+    (see services/read_model.py) when LIBRARY_READ_MODEL is on: the list
+    query selects only the primary keys of the page, then one indexed query
+    fetches their documents in the active language. Requests for other
+    fields (?fields=, ?expand=) are built as usual.
+    """
+    read_model_actions = ('list', 'retrieve')
+
+    def uses_read_model(self):
+        fields, expand, _output = self.get_fieldset()
+        return (
+            read_model.READ_MODEL_ENABLED
+            and self.action in self.read_model_actions
+            and fields is None and not expand
+            and translation.get_language() in read_model.languages()
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.uses_read_model():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Cursor pagination reads its ordering fields from the rows.
+        rows = queryset.raw_values(*dict.fromkeys(['id', *cursor_fields(self, queryset)]))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(read_model.fragments([row['id'] for row in page], 'list'))
+        return Response(read_model.fragments([row['id'] for row in rows], 'list'))
+
+    def retrieve(self, request, *args, **kwargs):
+        # get_object() would apply the filters of other query parameters
+        pk = bulk.parse_pk(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+        if self.uses_read_model() and pk is not None and set(request.query_params) <= {LANGUAGE_QUERY_PARAMETER}:
+            documents = read_model.fragments([pk], 'detail')
+            if documents:
+                return Response(documents[0])
+        return super().retrieve(request, *args, **kwargs)
 
 
-class AuthorViewSet(viewsets.ModelViewSet):
+class BulkWriteMixin:
+    """
+    POST/PATCH/DELETE <collection>/bulk/ for a ModelViewSet.
+
+    POST takes a list of objects to create, PATCH a list of partial objects
+    with "id", DELETE {"ids": [...]}. Valid items are written in one
+    transaction; invalid ones are skipped and listed in "errors" with their
+    index (or id). The response is 400 only when nothing could be written.
+    See services/bulk.py.
+    """
+    bulk_serializer_class = None
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        if request.method == 'DELETE':
+            items = request.data.get('ids') if isinstance(request.data, dict) else None
+        else:
+            items = request.data
+        if not isinstance(items, list):
+            expected = '{"ids": [...]}' if request.method == 'DELETE' else 'a list of objects'
+            return Response({'error': f'Expected {expected}.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BULK_MAX_ITEMS:
+            return Response(
+                {'error': f'At most {BULK_MAX_ITEMS} items per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'POST':
+            objs, errors = bulk.bulk_create(self.bulk_serializer_class, items)
+            result, success = 'created', status.HTTP_201_CREATED
+        elif request.method == 'PATCH':
+            objs, errors = bulk.bulk_update(self.bulk_serializer_class, items)
+            result, success = 'updated', status.HTTP_200_OK
+        else:
+            objs, errors = bulk.bulk_delete(
+                self.bulk_serializer_class.Meta.model, items, blocked=self.bulk_delete_blocked(items)
+            )
+            result, success = 'deleted', status.HTTP_200_OK
+        return Response(
+            {result: [obj.pk for obj in objs], 'errors': errors},
+            status=success if objs or not errors else status.HTTP_400_BAD_REQUEST
+        )
+
+    def bulk_delete_blocked(self, ids):
+        """{pk: message} for rows that must not be deleted."""
+        return {}
+
+
+class AuthorViewSet(
+    BulkWriteMixin, CachedResponseMixin, LocalizedReadMixin, FieldsetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """
     A viewset for viewing and editing author instances.
     
@@ -20,10 +265,41 @@ class AuthorViewSet(viewsets.ModelViewSet):
     
     Additional actions:
     - books: Get all books by a specific author
+    - bulk: Create, update or delete many authors at once
     """
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
     filterset_class = AuthorFilter
+    bulk_serializer_class = AuthorBulkSerializer
+    values_serializer_class = AuthorListValuesSerializer
+    cache_namespace = 'author'
+    cache_list_dependencies = ('author', 'book')
+    # ?pagination=cursor, over AUTHOR_NAME_KEY (annotated by get_queryset): the cursor
+    # holds the first key's value, and the _en columns themselves may be NULL.
+    cursor_ordering = (*AUTHOR_NAME_KEY, 'id')
+    fieldset_columns = {'full_name': ['first_name', 'last_name'], 'books_count': ['cached_books_count']}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and self.paginator.use_cursor(self.request, self):
+            queryset = queryset.annotate(**AUTHOR_NAME_KEY)
+        output = self.get_fieldset()[2]
+        if (
+            getattr(settings, 'LIBRARY_DENORMALIZED_BOOKS_COUNT', False)
+            # AuthorListValuesSerializer selects its own count
+            or self.uses_values_serializer()
+            or (output is not None and 'books_count' not in output)
+        ):
+            return queryset
+        # One COUNT per page instead of one per author (see Author.books_count)
+        return queryset.annotate(annotated_books_count=Count('books'))
+
+    def prune_queryset(self, queryset, output):
+        queryset = super().prune_queryset(queryset, output)
+        if 'books' in output:
+            books = self.localize(Book.objects.only('id', 'title', 'author'))
+            queryset = queryset.prefetch_related(Prefetch('books', queryset=books))
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -34,7 +310,7 @@ class AuthorViewSet(viewsets.ModelViewSet):
     def books(self, request, pk=None):
         """Get all books by this author"""
         author = self.get_object()
-        books = author.books.all()
+        books = self.localize(author.books.all())
         serializer = BookListSerializer(books, many=True)
         return Response(serializer.data)
 
@@ -48,11 +324,29 @@ class AuthorViewSet(viewsets.ModelViewSet):
             )
         return super().destroy(request, *args, **kwargs)
 
+    def bulk_delete_blocked(self, ids):
+        """Same rule as destroy(): authors with books are kept"""
+        with_books = Book.objects.filter(author_id__in={bulk.parse_pk(pk) for pk in ids} - {None})
+        return {
+            pk: 'Cannot delete author with existing books. Delete books first.'
+            for pk in with_books.order_by().values_list('author_id', flat=True).distinct()
+        }
 
-class BookViewSet(viewsets.ModelViewSet):
+
+class BookViewSet(
+    BulkWriteMixin, CachedResponseMixin, ReadModelMixin, LocalizedReadMixin, FieldsetMixin, ValuesListMixin,
+    viewsets.ModelViewSet
+):
     queryset = Book.objects.select_related('author').all()
     serializer_class = BookSerializer
     filterset_class = BookFilter
+    bulk_serializer_class = BookBulkSerializer
+    values_serializer_class = BookListValuesSerializer
+    cache_namespace = 'book'
+    cache_list_dependencies = ('book', 'author')
+    cache_detail_dependencies = ('author',)
+    cursor_ordering = ('-created_at', '-id')  # ?pagination=cursor
+    fieldset_columns = {'author_name': ['author'], 'author_details': ['author']}
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -61,24 +355,22 @@ class BookViewSet(viewsets.ModelViewSet):
             return BookCreateUpdateSerializer
         return BookSerializer
 
+    def prune_queryset(self, queryset, output):
+        queryset = super().prune_queryset(queryset, output)
+        if 'author_details' in output:
+            # The nested authors with their books_count in one query, not one COUNT per book
+            authors = Author.objects.all()
+            if not getattr(settings, 'LIBRARY_DENORMALIZED_BOOKS_COUNT', False):
+                authors = authors.annotate(annotated_books_count=Count('books'))
+            return queryset.select_related(None).prefetch_related(Prefetch('author', queryset=self.localize(authors)))
+        if 'author_name' not in output:
+            return queryset.select_related(None)
+        return queryset
+
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Return library statistics for dashboard"""
-        book_stats = Book.objects.aggregate(
-            total=Count('id'),
-            available=Count('id', filter=Q(is_available=True)),
-            unavailable=Count('id', filter=Q(is_available=False))
-        )
-        total_authors = Author.objects.count()
-        genre_counts = Book.objects.values('genre').annotate(count=Count('id'))
-        genres_distribution = {item['genre']: item['count'] for item in genre_counts}
-        return Response({
-            'total_authors': total_authors,
-            'total_books': book_stats['total'],
-            'available_books': book_stats['available'],
-            'unavailable_books': book_stats['unavailable'],
-            'genres_distribution': genres_distribution
-        })
+        """Return library statistics for dashboard (materialized, see services/statistics.py)"""
+        return Response(library_statistics.snapshot())
 
     @action(detail=False, methods=['get'])
     def genres(self, request):
@@ -87,3 +379,67 @@ class BookViewSet(viewsets.ModelViewSet):
             {'value': choice[0], 'label': choice[1]}
             for choice in Book.GENRE_CHOICES
         ])
+
+
+class TranslationJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status of queued auto-translations.
+
+    Filter by object to see whether its Hindi/Tamil fields are ready, e.g.
+    /api/translation-jobs/?model_label=library.book&object_id=3
+
+    Additional actions:
+    - summary: Number of jobs per status
+    """
+    queryset = TranslationJob.objects.all()
+    serializer_class = TranslationJobSerializer
+    filterset_class = TranslationJobFilter
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Return job counts per status"""
+        counts = self.filter_queryset(self.get_queryset()).order_by().values('status').annotate(count=Count('id'))
+        summary = {choice[0]: 0 for choice in TranslationJob.STATUS_CHOICES}
+        summary.update({item['status']: item['count'] for item in counts})
+        return Response(summary)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """Response cache hit/miss counters of this process, per namespace; staff only"""
+    return Response(caching.stats())
+
+
+@require_GET
+def export_books(request):
+    """
+    Stream the whole (optionally filtered) catalogue:
+    /api/books/export/?format=ndjson|csv&lang=hi&all_languages=true&genre=...
+
+    A plain Django view: DRF would treat ?format= as a renderer override.
+    Streams in constant memory under WSGI and ASGI alike (see services/export.py).
+    """
+    fmt = request.GET.get('format', 'ndjson')
+    lang = request.GET.get('lang') or translation.get_language()
+    if fmt not in catalogue_export.FORMATS:
+        return JsonResponse({'error': f'format must be one of {", ".join(catalogue_export.FORMATS)}.'}, status=400)
+    if lang not in settings.MODELTRANSLATION_LANGUAGES:
+        return JsonResponse(
+            {'error': f'lang must be one of {", ".join(settings.MODELTRANSLATION_LANGUAGES)}.'}, status=400
+        )
+    filterset = BookFilter(request.GET, queryset=Book.objects.all())
+    if not filterset.is_valid():
+        return JsonResponse(filterset.errors, status=400)
+
+    names, rows = catalogue_export.export_rows(
+        filterset.qs, lang=lang, all_languages=request.GET.get('all_languages') in ('true', '1'),
+    )
+    blocks = catalogue_export.render(fmt, names, rows)
+    if isinstance(request, ASGIRequest):
+        blocks = catalogue_export.aiterate(blocks)
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(blocks, content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="books.{fmt}"'
+    return response
+
@@ -0,0 +1,13 @@
+"""
+ASGI entry point, e.g. `uvicorn config.asgi:application` or
+`daphne config.asgi:application`.
+
+The async read endpoints under /api/async/ (apps/library/async_views.py)
+run on the event loop, so one process serves many concurrent, slow clients.
+The DRF viewsets stay synchronous and are run in a thread by Django.
+"""
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+application = get_asgi_application()
@@ -0,0 +1,44 @@
+"""
+Per-connection database tuning.
+
+SQLite's defaults suit an embedded, single-user database: a rollback
+journal that blocks readers while a writer commits, an fsync per commit,
+and an immediate "database is locked" when two connections write at once.
+Every new SQLite connection runs settings.SQLITE_PRAGMAS instead (WAL,
+synchronous=NORMAL, a busy timeout, a larger page cache, memory-mapped
+reads, temporary tables in memory). journal_mode=WAL is stored in the
+database file; the other pragmas last for the connection, which
+CONN_MAX_AGE keeps open across requests.
+
+Installed by LibraryConfig.ready(), so it also applies to management
+commands and the translation worker.
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PRAGMA_VALUE = re.compile(r'-?\w+')
+
+
+def sqlite_pragmas():
+    """The configured pragmas as (name, value), validated: they are interpolated into SQL."""
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    for name, value in pragmas.items():
+        if not PRAGMA_VALUE.fullmatch(str(name)) or not PRAGMA_VALUE.fullmatch(str(value)):
+            raise ImproperlyConfigured(f'Invalid SQLITE_PRAGMAS entry {name!r}: {value!r}')
+    return list(pragmas.items())
+
+
+def apply_sqlite_pragmas(connection, pragmas):
+    with connection.cursor() as cursor:
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def _tune_on_connect(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        apply_sqlite_pragmas(connection, sqlite_pragmas())
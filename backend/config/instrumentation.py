@@ -0,0 +1,263 @@
+"""
+Per-request instrumentation: number and time of SQL queries, time spent in
+the view outside SQL (for the API views this is mostly serialization),
+response rendering time and total time.
+
+InstrumentationMiddleware measures a sampled share of the requests
+(INSTRUMENTATION_SAMPLE_RATE), adds a Server-Timing header to them (shown by
+the browser's network panel) and records them per endpoint, e.g.
+'GET book-list', and active language. /api/metrics/ returns the p50/p95/p99
+of the last INSTRUMENTATION_WINDOW requests of each, for this process.
+
+Timings and query counts tell how the site is built and used, so only staff
+users can read /api/metrics/, and Server-Timing is only sent with DEBUG on
+or to staff users.
+
+Views that do not return a DRF/template response (e.g. the streaming
+export) only get db and total, and a streamed body is produced after the
+middleware has returned, so its time is not included.
+
+Queries are counted by an execute wrapper installed on every database
+connection, which reports to the timer of the current request (a context
+variable). This also works under ASGI, where the async ORM runs the queries
+in another thread than the one handling the request.
+"""
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils import translation
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+SAMPLE_RATE = getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 1.0)
+SERVER_TIMING = getattr(settings, 'INSTRUMENTATION_SERVER_TIMING', True)
+WINDOW = getattr(settings, 'INSTRUMENTATION_WINDOW', 1000)
+METRICS = ('queries', 'db_ms', 'serialize_ms', 'render_ms', 'total_ms')
+PERCENTILES = (50, 95, 99)
+
+_lock = threading.Lock()
+_endpoints = {}
+_current_timer = ContextVar('instrumentation_timer', default=None)
+
+
+class RequestTimer:
+    """Measurements of one request; also the connection.execute_wrapper() hook counting its queries."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.endpoint = 'unresolved'
+        self.lang = None
+        self.view_started = self.view_ended = None
+        self.view_db = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += time.perf_counter() - started
+
+    def start_view(self, request):
+        match = request.resolver_match
+        self.endpoint = f'{request.method} {match.url_name or match.view_name}'
+        self.lang = translation.get_language()
+        self.view_db = self.db
+        self.view_started = time.perf_counter()
+
+    def end_view(self):
+        self.view_db = self.db - self.view_db
+        self.view_ended = time.perf_counter()
+
+    def timings(self):
+        """{metric: value}; serialize/render are None when the view end is unknown."""
+        ended = time.perf_counter()
+        serialize = render = None
+        if self.view_started is not None and self.view_ended is not None:
+            serialize = (self.view_ended - self.view_started - self.view_db) * 1000
+            render = (ended - self.view_ended) * 1000
+        return {
+            'queries': self.queries,
+            'db_ms': self.db * 1000,
+            'serialize_ms': serialize,
+            'render_ms': render,
+            'total_ms': (ended - self.started) * 1000,
+        }
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install(connection):
+    """Count the queries of connection for the requests being measured."""
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+@receiver(connection_created)
+def _install_on_connect(sender, connection, **kwargs):
+    install(connection)
+
+
+def server_timing(timings):
+    """Server-Timing header value, e.g. 'db;dur=3.2;desc="4 queries", total;dur=11.0'"""
+    entries = [f'db;dur={timings["db_ms"]:.1f};desc="{timings["queries"]} queries"']
+    for name in ('serialize', 'render', 'total'):
+        if timings[f'{name}_ms'] is not None:
+            entries.append(f'{name};dur={timings[f"{name}_ms"]:.1f}')
+    return ', '.join(entries)
+
+
+def shows_server_timing(request):
+    """Server-Timing only in DEBUG or for staff users (AuthenticationMiddleware runs after this one)."""
+    if not SERVER_TIMING:
+        return False
+    if settings.DEBUG:
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+def record(endpoint, lang, timings):
+    with _lock:
+        samples = _endpoints.setdefault((endpoint, lang), {
+            'count': 0, **{metric: deque(maxlen=WINDOW) for metric in METRICS},
+        })
+        samples['count'] += 1
+        for metric in METRICS:
+            if timings[metric] is not None:
+                samples[metric].append(timings[metric])
+
+
+def _summary(values):
+    if not values:
+        return None
+    values = sorted(values)
+    summary = {f'p{p}': round(values[min(len(values) - 1, len(values) * p // 100)], 2) for p in PERCENTILES}
+    summary['max'] = round(values[-1], 2)
+    return summary
+
+
+def snapshot():
+    """{endpoint: {lang: {'count': n, metric: {'p50', 'p95', 'p99', 'max'}}}} of this process."""
+    with _lock:
+        copied = {key: {name: list(value) if name != 'count' else value for name, value in samples.items()}
+                  for key, samples in _endpoints.items()}
+    result = {}
+    for (endpoint, lang), samples in sorted(copied.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+        result.setdefault(endpoint, {})[lang or '-'] = {
+            'count': samples['count'],
+            **{metric: _summary(samples[metric]) for metric in METRICS},
+        }
+    return result
+
+
+def reset():
+    with _lock:
+        _endpoints.clear()
+
+
+class InstrumentationMiddleware:
+    """
+    Measure sampled requests (see the module docstring). Put it first in
+    MIDDLEWARE so the total includes the other middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Coroutine hooks, or the handler runs each of them in a thread
+            self.process_view = self._aprocess_view
+            self.process_template_response = self._aprocess_template_response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timer = self.start(request)
+        if timer is None:
+            return self.get_response(request)
+        token = _current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, timer, response)
+
+    async def __acall__(self, request):
+        timer = self.start(request)
+        if timer is None:
+            return await self.get_response(request)
+        token = _current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, timer, response)
+
+    def start(self, request):
+        """The timer of a sampled request, else None."""
+        if SAMPLE_RATE <= 0 or random.random() >= SAMPLE_RATE:
+            return None
+        request._instrumentation = RequestTimer()
+        return request._instrumentation
+
+    def finish(self, request, timer, response):
+        timings = timer.timings()
+        record(timer.endpoint, timer.lang, timings)
+        if shows_server_timing(request):
+            response['Server-Timing'] = server_timing(timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.view_started(request)
+
+    def process_template_response(self, request, response):
+        # Called when the view has returned a DRF/template response, before it is rendered
+        self.view_ended(request)
+        return response
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.view_started(request)
+
+    async def _aprocess_template_response(self, request, response):
+        self.view_ended(request)
+        return response
+
+    def view_started(self, request):
+        timer = getattr(request, '_instrumentation', None)
+        if timer is not None:
+            timer.start_view(request)
+
+    def view_ended(self, request):
+        timer = getattr(request, '_instrumentation', None)
+        if timer is not None:
+            timer.end_view()
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """Latency and query percentiles per endpoint and language (this process); staff only"""
+    return Response({'sample_rate': SAMPLE_RATE, 'window': WINDOW, 'endpoints': snapshot()})
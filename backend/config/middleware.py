@@ -1,49 +1,151 @@
 """
-Middleware to set Django's active language from the Accept-Language header.
+Middleware to set Django's active language for each request.
 
 API responses then return translated fields (from django-modeltranslation)
 according to the client's preferred language. No serializer or viewset changes
 needed — the backend serves the right language automatically.
+
+The language is, in order: the ?lang= query parameter (e.g. for links and
+exports), the best supported language of the Accept-Language header by
+q-weight, or DEFAULT_LANGUAGE. This is the only language middleware (it
+replaces django.middleware.locale.LocaleMiddleware, which parsed the header
+again for nothing). Parsed headers are memoized: real traffic only sends a
+handful of distinct Accept-Language values.
 """
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
 from django.utils import translation
+from django.utils.cache import patch_vary_headers
+
+# Languages we support, in settings order; LANGUAGE_CODE is the default
+SUPPORTED_LANGUAGES = tuple(code for code, _name in settings.LANGUAGES)
+DEFAULT_LANGUAGE = settings.LANGUAGE_CODE
+LANGUAGE_QUERY_PARAMETER = getattr(settings, 'LANGUAGE_QUERY_PARAMETER', 'lang')
+ACCEPT_LANGUAGE_CACHE_SIZE = getattr(settings, 'ACCEPT_LANGUAGE_CACHE_SIZE', 256)
+# Same limit as Django: longer headers are cut at the last complete entry
+ACCEPT_LANGUAGE_MAX_LENGTH = 500
+
+
+def supported_language(code):
+    """Supported language for a code such as 'hi', 'hi-IN' or 'HI_in', or None."""
+    code = code.strip().lower().replace('_', '-')
+    if code in SUPPORTED_LANGUAGES:
+        return code
+    primary = code.split('-', 1)[0]
+    return primary if primary in SUPPORTED_LANGUAGES else None
 
-# Languages we support; first is default
-SUPPORTED_LANGUAGES = {'en', 'hi', 'ta'}
-DEFAULT_LANGUAGE = 'en'
+
+def _weighted(header_value):
+    """(tag, q) of each entry of the header; entries with an invalid q are skipped."""
+    for part in header_value.split(','):
+        tag, _, params = part.partition(';')
+        tag = tag.strip()
+        if not tag:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = None
+                break
+        if q is not None and 0 <= q <= 1:
+            yield tag, q
 
 
+@lru_cache(maxsize=ACCEPT_LANGUAGE_CACHE_SIZE)
 def parse_accept_language(header_value):
     """
-    Parse Accept-Language (e.g. "hi-IN,hi;q=0.9,en;q=0.8") and return
-    the first matching supported language code or None.
+    Parse Accept-Language (e.g. "hi-IN,hi;q=0.9,en;q=0.8") and return the
+    supported language code with the highest q-weight (the first listed on
+    a tie), or None.
+
+    A language takes the weight of the entry naming it exactly ("en"), else
+    the highest of its regional variants ("en-US", "en-GB"). '*' weighs the
+    supported languages no entry names (DEFAULT_LANGUAGE first); q=0
+    excludes a language.
     """
     if not header_value or not header_value.strip():
         return None
-    for part in header_value.split(','):
-        part = part.strip().split(';')[0].strip()
-        if '-' in part:
-            lang = part.split('-')[0].lower()
-        else:
-            lang = part.lower()
-        if lang in SUPPORTED_LANGUAGES:
-            return lang
-    return None
+    if len(header_value) > ACCEPT_LANGUAGE_MAX_LENGTH:
+        header_value = header_value[:ACCEPT_LANGUAGE_MAX_LENGTH].rpartition(',')[0]
+    # {lang: (q, position in the header)}
+    exact, variants, wildcard = {}, {}, None
+    for position, (tag, q) in enumerate(_weighted(header_value)):
+        if tag == '*':
+            if wildcard is None:
+                wildcard = (q, position)
+            continue
+        lang = supported_language(tag)
+        if lang is None:
+            continue
+        if tag.lower().replace('_', '-') == lang:
+            exact.setdefault(lang, (q, position))
+        elif lang not in variants or q > variants[lang][0]:
+            variants[lang] = (q, position)
+    weights = {**variants, **exact}
+    if wildcard is not None:
+        for lang in (DEFAULT_LANGUAGE, *SUPPORTED_LANGUAGES):
+            weights.setdefault(lang, wildcard)
+    acceptable = [lang for lang, (q, _position) in weights.items() if q > 0]
+    if not acceptable:
+        return None
+    # Highest q, then the client's order; min() keeps the first of equal keys
+    return min(acceptable, key=lambda lang: (-weights[lang][0], weights[lang][1]))
+
+
+def get_language_from_request(request):
+    """?lang= if supported, else the Accept-Language choice, else DEFAULT_LANGUAGE."""
+    requested = request.GET.get(LANGUAGE_QUERY_PARAMETER)
+    if requested:
+        lang = supported_language(requested)
+        if lang:
+            return lang, False
+    return parse_accept_language(request.META.get('HTTP_ACCEPT_LANGUAGE', '')) or DEFAULT_LANGUAGE, True
 
 
 class AcceptLanguageMiddleware:
     """
-    Activate Django language from Accept-Language so modeltranslation
-    and any gettext use the correct language for this request.
+    Activate Django language from ?lang= or Accept-Language so
+    modeltranslation and any gettext use the correct language for this
+    request. Sets request.LANGUAGE_CODE, Content-Language and, unless ?lang=
+    chose the language, Vary: Accept-Language.
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        lang = parse_accept_language(request.META.get('HTTP_ACCEPT_LANGUAGE', ''))
-        if lang:
-            translation.activate(lang)
-        else:
-            translation.activate(DEFAULT_LANGUAGE)
+        if self.async_mode:
+            return self.__acall__(request)
+        lang, from_header = self.activate(request)
         response = self.get_response(request)
         translation.deactivate()
+        return self.finish(response, lang, from_header)
+
+    async def __acall__(self, request):
+        lang, from_header = self.activate(request)
+        response = await self.get_response(request)
+        translation.deactivate()
+        return self.finish(response, lang, from_header)
+
+    def activate(self, request):
+        lang, from_header = get_language_from_request(request)
+        translation.activate(lang)
+        request.LANGUAGE_CODE = lang
+        return lang, from_header
+
+    def finish(self, response, lang, from_header):
+        if from_header:
+            patch_vary_headers(response, ['Accept-Language'])
+        response.headers.setdefault('Content-Language', lang)
         return response
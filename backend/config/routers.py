@@ -0,0 +1,134 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the primary ('default'). Reads of the library models go
+to a replica only inside a replica-read context: ReplicaRoutingMiddleware
+opens one for each GET/HEAD/OPTIONS request, read_from_replica() for code
+outside requests. Everything else reads from the primary too, so it never
+acts on rows older than its own writes: the signals and services run by a
+write request, management commands (backfill_translations, the translation
+worker, imports), and reads inside a transaction on the primary. Other apps
+(sessions, auth) always use the primary: a session created a moment ago
+must be found.
+
+Replicas are the DATABASE_REPLICA_ALIASES (see settings.py), taken in turn,
+one per request so its count and its page come from the same copy. After a
+client writes, a cookie keeps its reads on the primary for
+DATABASE_REPLICA_STICKY_SECONDS, so it sees its own changes while the
+replicas catch up. Locally, replicas can be SQLite copies of the primary
+refreshed by `python manage.py sync_sqlite_replicas`.
+"""
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIASES = tuple(getattr(settings, 'DATABASE_REPLICA_ALIASES', ()))
+STICKY_SECONDS = getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10)
+STICKY_COOKIE = 'primary_reads'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICATED_APPS = {'library'}
+
+# Replica alias the reads of the current request or block go to; None = primary
+_read_alias = ContextVar('read_alias', default=None)
+_turn = itertools.count()
+
+
+def next_replica():
+    """The next replica alias in turn, or None when there are none."""
+    if not REPLICA_ALIASES:
+        return None
+    return REPLICA_ALIASES[next(_turn) % len(REPLICA_ALIASES)]
+
+
+def current_replica():
+    """The replica the current context reads from, or None."""
+    return _read_alias.get()
+
+
+@contextmanager
+def read_from_replica(alias=None):
+    """Send the library reads of the block to a replica (the next in turn unless alias is given)."""
+    token = _read_alias.set(alias or next_replica())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_may_lag(changed_at_ns):
+    """
+    True when the current context reads from a replica and the data changed
+    (time.time_ns() of the change) within the last STICKY_SECONDS, so what it
+    read may predate the change.
+    """
+    return current_replica() is not None and time.time_ns() - changed_at_ns < STICKY_SECONDS * 1_000_000_000
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or model._meta.app_label not in REPLICATED_APPS:
+            return DEFAULT_DB_ALIAS
+        # Inside a transaction on the primary, read what it has written
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema with the data, from the primary
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read from the next replica during safe-method requests of clients that
+    have not written in the last STICKY_SECONDS; mark writers with the
+    STICKY_COOKIE. Without replicas configured it does nothing.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self.finish(request, response)
+
+    def start(self, request):
+        replica = request.method in SAFE_METHODS and STICKY_COOKIE not in request.COOKIES
+        return _read_alias.set(next_replica() if replica else None)
+
+    def finish(self, request, response):
+        if REPLICA_ALIASES and request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=STICKY_SECONDS, httponly=True, samesite='Lax')
+        return response
@@ -1,5 +1,5 @@
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -33,11 +33,12 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'config.instrumentation.InstrumentationMiddleware',  # Query count/latency per endpoint (first: times the rest)
+    'config.routers.ReplicaRoutingMiddleware',  # Safe-method requests read from a replica
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.locale.LocaleMiddleware',  # Enables translation.activate()
-    'config.middleware.AcceptLanguageMiddleware',  # API: set language from Accept-Language (overrides session)
+    'config.middleware.AcceptLanguageMiddleware',  # Language from ?lang= or Accept-Language (q-weighted)
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -64,12 +65,79 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
-# Database
-DATABASES = {
+# Database: DATABASE_PROFILE=sqlite (default, one file next to manage.py) or postgres
+# (driver: psycopg, in requirements.txt). Django 4.2 has no connection pool: each worker
+# keeps its own connections for DATABASE_CONN_MAX_AGE. To pool connections between
+# workers and processes, PgBouncer is required: point POSTGRES_HOST/POSTGRES_PORT at it,
+# in transaction mode, and set POSTGRES_PGBOUNCER=True.
+DATABASE_PROFILE = config('DATABASE_PROFILE', default='sqlite')
+# Seconds a connection is reused across requests (0 = reconnect per request).
+DATABASE_CONN_MAX_AGE = config('DATABASE_CONN_MAX_AGE', default=60, cast=int)
+
+if DATABASE_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('POSTGRES_DB', default='library'),
+            'USER': config('POSTGRES_USER', default='library'),
+            'PASSWORD': config('POSTGRES_PASSWORD', default=''),
+            'HOST': config('POSTGRES_HOST', default='localhost'),
+            'PORT': config('POSTGRES_PORT', default=5432, cast=int),
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # Set when connecting through PgBouncer in transaction mode: server-side
+            # cursors do not survive from one transaction to the next there.
+            'DISABLE_SERVER_SIDE_CURSORS': config('POSTGRES_PGBOUNCER', default=False, cast=bool),
+            'OPTIONS': {'connect_timeout': config('POSTGRES_CONNECT_TIMEOUT', default=5, cast=int)},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+
+# Read replicas (config/routers.py): comma-separated SQLite files with the sqlite profile
+# (e.g. copies kept by `manage.py sync_sqlite_replicas`) or hosts with the postgres one.
+# Safe-method requests read the library tables from them in turn; the rest uses default.
+DATABASE_REPLICAS = config('DATABASE_REPLICAS', default='', cast=Csv())
+DATABASE_REPLICA_ALIASES = [f'replica_{index}' for index in range(1, len(DATABASE_REPLICAS) + 1)]
+for alias, location in zip(DATABASE_REPLICA_ALIASES, DATABASE_REPLICAS):
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if DATABASE_PROFILE == 'postgres' else 'NAME': location,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['config.routers.PrimaryReplicaRouter']
+# Seconds a client's reads stay on the primary after it writes, so it sees its own changes
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+# PRAGMAs run on every new SQLite connection (config/database.py). WAL lets readers
+# work while one writer commits; busy_timeout makes a writer wait for the lock
+# (milliseconds) instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='wal'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='normal'),  # durable in WAL mode except on power loss
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+    'cache_size': config('SQLITE_CACHE_SIZE', default=-65536, cast=int),  # negative = KiB (64 MiB)
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=268435456, cast=int),  # bytes (256 MiB)
+    'temp_store': config('SQLITE_TEMP_STORE', default='memory'),
+}
+
+# Cache (API response cache). locmem is per process; point CACHE_BACKEND/CACHE_LOCATION
+# at a shared backend (e.g. FileBasedCache or Redis) to share entries between processes.
+# The version stamps that invalidate entries and make ETags are kept in the database;
+# clear a shared cache when pointing it at another (or a recreated) database.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='library-api'),
     }
 }
 
@@ -100,8 +168,10 @@ LANGUAGES = [
     ('en', 'English'),
     ('hi', 'Hindi'),
     ('ta', 'Tamil'),
-    
+
 ]
+# Distinct Accept-Language headers whose parsed language is memoized (per process)
+ACCEPT_LANGUAGE_CACHE_SIZE = config('ACCEPT_LANGUAGE_CACHE_SIZE', default=256, cast=int)
 
 # django-modeltranslation: languages and fallback (APIs never return empty; fallback to en)
 MODELTRANSLATION_LANGUAGES = ('en', 'hi', 'ta')
@@ -118,10 +188,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.library.pagination.LibraryPagination',  # ?count=false, ?pagination=cursor
     'PAGE_SIZE': 20,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.library.renderers.LibraryJSONRenderer',  # JSONRenderer that splices read-model documents
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
@@ -147,4 +217,56 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Auto-translate (deep-translator) on save: fill *_hi and *_ta from *_en when empty.
 # Set to False in tests or if you don't want external API calls.
-AUTO_TRANSLATE_ENABLED = config('AUTO_TRANSLATE_ENABLED', default=True, cast=bool)
\ No newline at end of file
+AUTO_TRANSLATE_ENABLED = config('AUTO_TRANSLATE_ENABLED', default=True, cast=bool)
+
+# Queue translations as TranslationJob rows instead of translating inside the save request.
+# Run `python manage.py process_translation_jobs` to process the queue.
+AUTO_TRANSLATE_ASYNC = config('AUTO_TRANSLATE_ASYNC', default=True, cast=bool)
+# Translator backend (dotted path). Use apps.library.services.translators.StubTranslatorBackend offline.
+AUTO_TRANSLATE_BACKEND = config(
+    'AUTO_TRANSLATE_BACKEND', default='apps.library.services.translators.GoogleTranslatorBackend'
+)
+TRANSLATION_JOB_MAX_ATTEMPTS = config('TRANSLATION_JOB_MAX_ATTEMPTS', default=5, cast=int)
+
+# Translation memory: reuse earlier translations of identical text before calling the backend.
+TRANSLATION_MEMORY_ENABLED = config('TRANSLATION_MEMORY_ENABLED', default=True, cast=bool)
+TRANSLATION_MEMORY_LRU_SIZE = config('TRANSLATION_MEMORY_LRU_SIZE', default=2048, cast=int)  # per process
+TRANSLATION_MEMORY_TTL = config('TRANSLATION_MEMORY_TTL', default=0, cast=int)  # seconds, 0 = never expire
+TRANSLATION_MEMORY_MAX_ENTRIES = config('TRANSLATION_MEMORY_MAX_ENTRIES', default=0, cast=int)  # 0 = unlimited
+
+# Serve Author.books_count from the signal-maintained cached_books_count column
+# instead of COUNT(books). Useful for authors with very many books.
+LIBRARY_DENORMALIZED_BOOKS_COUNT = config('LIBRARY_DENORMALIZED_BOOKS_COUNT', default=False, cast=bool)
+
+# Language-aware cache of list/detail API responses, invalidated by model signals.
+API_CACHE_ENABLED = config('API_CACHE_ENABLED', default=True, cast=bool)
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)  # seconds
+# ETag / Last-Modified from the same version stamps; If-None-Match is answered with 304.
+API_CONDITIONAL_GET_ENABLED = config('API_CONDITIONAL_GET_ENABLED', default=True, cast=bool)
+
+# Search backend for the `search` filter: 'auto' uses the full-text index (SQLite FTS5 or
+# PostgreSQL tsvector, see apps/library/search.py); 'basic' uses icontains on the active language.
+LIBRARY_SEARCH_BACKEND = config('LIBRARY_SEARCH_BACKEND', default='auto')
+
+# Largest batch accepted by POST/PATCH/DELETE /api/books/bulk/ and /api/authors/bulk/
+LIBRARY_BULK_MAX_ITEMS = config('LIBRARY_BULK_MAX_ITEMS', default=10000, cast=int)
+
+# Serve book/author list pages from values() rows (ValuesSerializer) instead of
+# model instances and ModelSerializers. Same JSON.
+LIBRARY_VALUES_LIST_SERIALIZERS = config('LIBRARY_VALUES_LIST_SERIALIZERS', default=True, cast=bool)
+
+# Load books/authors for reads with .localized(): translated fields resolved in
+# SQL for the active language, per-language columns not fetched.
+LIBRARY_LOCALIZED_QUERYSETS = config('LIBRARY_LOCALIZED_QUERYSETS', default=True, cast=bool)
+
+# Materialized read model (apps/library/services/read_model.py): keep every book rendered
+# per language in BookDocument and serve book list/detail from it. Build the table with
+# `python manage.py rebuild_read_model` after turning it on.
+LIBRARY_READ_MODEL = config('LIBRARY_READ_MODEL', default=False, cast=bool)
+
+# Request instrumentation (config/instrumentation.py): share of requests measured,
+# Server-Timing header on them (DEBUG or staff only), and samples kept per endpoint
+# for /api/metrics/ (staff only).
+INSTRUMENTATION_SAMPLE_RATE = config('INSTRUMENTATION_SAMPLE_RATE', default=1.0 if DEBUG else 0.01, cast=float)
+INSTRUMENTATION_SERVER_TIMING = config('INSTRUMENTATION_SERVER_TIMING', default=True, cast=bool)
+INSTRUMENTATION_WINDOW = config('INSTRUMENTATION_WINDOW', default=1000, cast=int)
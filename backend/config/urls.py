@@ -1,15 +1,27 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from apps.library.views import AuthorViewSet, BookViewSet
+from apps.library import async_views
+from apps.library.views import AuthorViewSet, BookViewSet, TranslationJobViewSet, cache_stats, export_books
+from config.instrumentation import metrics_view
 
 # Create a router and register our viewsets
 router = DefaultRouter()
 router.register(r'authors', AuthorViewSet)
 router.register(r'books', BookViewSet)
+router.register(r'translation-jobs', TranslationJobViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/cache-stats/', cache_stats, name='cache-stats'),
+    path('api/metrics/', metrics_view, name='metrics'),
+    path('api/books/export/', export_books, name='book-export'),
+    # Async read endpoints (same JSON as the GETs below), for ASGI
+    path('api/async/books/', async_views.book_list, name='async-book-list'),
+    path('api/async/books/statistics/', async_views.book_statistics, name='async-book-statistics'),
+    path('api/async/books/<int:pk>/', async_views.book_detail, name='async-book-detail'),
+    path('api/async/authors/', async_views.author_list, name='async-author-list'),
+    path('api/async/authors/<int:pk>/', async_views.author_detail, name='async-author-detail'),
     path('api/', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),  # Login/logout for browsable API
 ]
\ No newline at end of file